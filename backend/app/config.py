@@ -22,4 +22,55 @@ class Settings:
     GOOGLE_CLIENT_SECRET: Path = BASE_DIR / "client_secret.json"
     GOOGLE_TOKEN_PICKLE: Path = BASE_DIR / "token.pickle"
 
+    # Touched by sync jobs when they finish so API workers can drop cached data
+    SYNC_STAMP_FILE: Path = BASE_DIR / ".last_sync"
+
+    # Cross-worker coordination (leader election and sync locks; see services/leader.py)
+    LOCK_DIR: Path = Path(os.getenv("LOCK_DIR", str(BASE_DIR / ".locks")))
+    LEADER_RETRY_SECONDS: int = int(os.getenv("LEADER_RETRY_SECONDS", "15"))  # How often followers try to take over
+    CRM_SYNC_INTERVAL_SECONDS: int = int(os.getenv("CRM_SYNC_INTERVAL_SECONDS", "0"))  # Scheduled CRM sync on the leader; 0 = off
+
+    # Custom field / workflow definitions cache
+    METADATA_CHECK_SECONDS: float = float(os.getenv("METADATA_CHECK_SECONDS", "5"))  # How often a worker re-reads the version stamp
+
+    # Active-job classification (closed statuses also come from WorkflowStatus.is_closed)
+    ACTIVE_JOB_STATUSES: str = os.getenv("ACTIVE_JOB_STATUSES", "In Progress,Scheduled,Materials Ordered,Started,Pending,Approved,Production")
+    CLOSED_JOB_STATUSES: str = os.getenv("CLOSED_JOB_STATUSES", "Paid & Closed,Cancelled,Lost,Void")
+    ACTIVE_JOB_SIGNED_DAYS: int = int(os.getenv("ACTIVE_JOB_SIGNED_DAYS", "14"))  # Recently signed jobs count as active
+    ACTIVE_JOB_SWEEP_SECONDS: int = int(os.getenv("ACTIVE_JOB_SWEEP_SECONDS", "3600"))
+
+    # Job timeline milestones (due dates are whole days in this zone)
+    TIMELINE_TIMEZONE: str = os.getenv("TIMELINE_TIMEZONE", "UTC")
+
+    # Authenticated user cache (per worker; other workers see role/password changes within the TTL)
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+    AUTH_USER_CACHE_TTL_SECONDS: int = int(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+
+    # Password hashing pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # Hashes computed at once per worker
+    PASSWORD_HASH_MAX_QUEUE: int = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))  # Waiting beyond this gets a 503
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "auto")  # "auto", "thread" or "process"
+
+    # CompanyCam mirror
+    COMPANY_CAM_SYNC_SECONDS: int = int(os.getenv("COMPANY_CAM_SYNC_SECONDS", "300"))  # Max age before a background re-sync
+    COMPANY_CAM_PHOTOS_PER_PROJECT: int = int(os.getenv("COMPANY_CAM_PHOTOS_PER_PROJECT", "50"))
+    THUMBNAIL_CACHE_DIR: Path = BASE_DIR / ".cache" / "thumbnails"
+    THUMBNAIL_CACHE_MAX_MB: int = int(os.getenv("THUMBNAIL_CACHE_MAX_MB", "512"))
+
+    # Geocoding for the map
+    GEOCODER_BACKEND: str = os.getenv("GEOCODER_BACKEND", "google")  # "google" or "stub"
+    GEOCODER_CONCURRENCY: int = int(os.getenv("GEOCODER_CONCURRENCY", "5"))
+
+    # AI co-pilot
+    AI_MODEL_NAME: str = os.getenv("AI_MODEL_NAME", "gemini-2.0-flash-exp")
+    AI_MODEL_BACKEND: str = os.getenv("AI_MODEL_BACKEND", "vertex")  # "vertex" or "fake"
+    AI_CONTEXT_TTL_SECONDS: int = int(os.getenv("AI_CONTEXT_TTL_SECONDS", "300"))
+    AI_MAX_CONCURRENCY: int = int(os.getenv("AI_MAX_CONCURRENCY", "4"))  # Model calls in flight per worker
+    AI_MAX_QUEUE_PER_USER: int = int(os.getenv("AI_MAX_QUEUE_PER_USER", "3"))
+    AI_REQUEST_DEADLINE_SECONDS: float = float(os.getenv("AI_REQUEST_DEADLINE_SECONDS", "60"))
+    AI_CACHE_SIZE: int = int(os.getenv("AI_CACHE_SIZE", "256"))
+    AI_CACHE_TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL_SECONDS", "600"))
+    AI_RETRIEVAL_TOP_K: int = int(os.getenv("AI_RETRIEVAL_TOP_K", "8"))
+    AI_RETRIEVAL_TOKEN_BUDGET: int = int(os.getenv("AI_RETRIEVAL_TOKEN_BUDGET", "600"))  # Max prompt tokens spent on records
+
 settings = Settings()
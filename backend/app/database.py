@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from backend.app.config import settings
@@ -20,3 +20,29 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def upgrade_schema(metadata):
+    """
+    Bring existing tables up to date with the models: create_all only creates
+    missing tables, so add nullable columns and indexes declared since.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns or column.primary_key:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+def ensure_schema(metadata):
+    """Create missing tables, then upgrade existing ones (run once per process at startup)."""
+    metadata.create_all(bind=engine)
+    upgrade_schema(metadata)
@@ -1,23 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from backend.app.config import settings
-from backend.app.routers import google, reports, calendar, crm, auth, ai, tasks, workflows, custom_fields, financials
+from backend.app.routers import google, reports, calendar, crm, auth, ai, tasks, workflows, custom_fields, financials, exports, companycam, geo, timeline
 from backend.app.services.jobnimbus import jn_client
 from backend.app.services.companycam import cc_client
+from backend.app.services.leader import leader_elector, hold_lock
+from backend.app.services.password_hasher import password_hasher
 from backend.app.database import get_db as get_sqlalchemy_db
 from backend.app.models import Job, Base
 from sqlalchemy.orm import Session
 from fastapi import Depends
-import os
-import pickle
 from datetime import datetime
-from backend.app.database import engine
-from backend.app.models import Base
+from backend.app.database import engine, ensure_schema
+import os
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker process. With a preloaded app (gunicorn --preload) the
+    # engine was created in the master, so drop any inherited pool connections.
+    engine.dispose(close=False)
+    # Create tables, then add columns/indexes declared after a table was created.
+    # Done here rather than at import so importing the app (tests, scripts, reloads) stays cheap;
+    # workers booting together take turns so the DDL doesn't race.
+    with hold_lock("schema"):
+        ensure_schema(Base.metadata)
+    await startup_event()
+    try:
+        yield
+    finally:
+        await shutdown_event()
 
-app = FastAPI(title="Lecla Dashboard API")
+app = FastAPI(title="Lecla Dashboard API", lifespan=lifespan)
 
 # Include Routers
 app.include_router(google.router, prefix="/api/google", tags=["google"])
@@ -30,6 +44,10 @@ app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 app.include_router(workflows.router, prefix="/api/workflows", tags=["workflows"])
 app.include_router(custom_fields.router, prefix="/api/custom-fields", tags=["custom-fields"])
 app.include_router(financials.router, prefix="/api/financials", tags=["financials"])
+app.include_router(exports.router, prefix="/api/exports", tags=["exports"])
+app.include_router(companycam.router, prefix="/api", tags=["companycam"])
+app.include_router(geo.router, prefix="/api/geo", tags=["geo"])
+app.include_router(timeline.router, prefix="/api/timeline", tags=["timeline"])
 
 # Configure CORS
 origins = [
@@ -47,7 +65,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
 async def startup_event():
     print("🚀 Starting Lecla Dashboard API...")
     print("✅ Job Nimbus API Token loaded" if settings.JOB_NIMBUS_TOKEN else "❌ Job Nimbus Token missing")
@@ -60,15 +77,27 @@ async def startup_event():
         print("⚠️ Google Token (OAuth) NOT found. Run google_auth_flow.py")
         
     print("✅ Google Sheet ID configured" if settings.GOOGLE_SHEET_ID else "❌ Google Sheet ID missing")
+    # Periodic jobs (active-job sweep, Google token refresh, scheduled CRM sync) run on one elected worker only
+    leader_elector.start()
     print("🚀 API fully initialized and ready to serve.")
 
+async def shutdown_event():
+    leader_elector.stop()
+    password_hasher.shutdown()
+    await cc_client.close()
+
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "Lecla Dashboard API is running"}
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "worker_pid": os.getpid(),
+        "leader": leader_elector.is_leader,
+    }
 
 @app.get("/api/config")
 async def get_config():
@@ -93,18 +122,3 @@ async def proxy_jobs(limit: int = 50, db: Session = Depends(get_sqlalchemy_db)):
     except Exception as e:
         print(f"Proxy Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/api/projects")
-async def proxy_projects(limit: int = 25):
-    """Fetch active projects from CompanyCam."""
-    return await cc_client.get_projects(per_page=limit)
-
-@app.get("/api/photos")
-async def proxy_photos(project_id: str = None, limit: int = 20):
-    """Fetch recent photos from CompanyCam projects."""
-    if project_id:
-        return await cc_client.get_project_photos(project_id, per_page=limit)
-    
-    # If no project ID, get latest projects and their photos? 
-    # For now, let's just support project-specific or return empty
-    return []
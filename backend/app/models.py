@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey, JSON, Text
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, JSON, Text, Index
 from sqlalchemy.orm import relationship
 from backend.app.database import Base
 
@@ -40,12 +40,21 @@ class Job(Base):
     is_repeat_customer = Column(Integer, default=0)  # SQLite boolean (0/1)
     warranty_and_permit_closed = Column(Integer, default=0)  # Job fully closed
     
+    # Maintained by services/active_jobs.py (sync + periodic sweep)
+    is_active = Column(Integer, default=0)
+    active_until = Column(Integer)  # Set when active only because of a recent signing
+    
     # System fields
     date_created = Column(Integer)
     date_updated = Column(Integer)
     data = Column(JSON)  # Full JobNimbus JSON for reference
     
     contact = relationship("Contact", back_populates="jobs")
+    
+    __table_args__ = (
+        Index("ix_jobs_status_updated", "status_name", "date_updated", "lecla_id"),  # Kanban columns
+        Index("ix_jobs_active_updated", "is_active", "date_updated"),  # /api/crm/jobs/active
+    )
 
 class Contact(Base):
     __tablename__ = "contacts"
@@ -123,6 +132,7 @@ class User(Base):
     password_hash = Column(String)
     full_name = Column(String)
     role = Column(String, default="sales")
+    token_version = Column(Integer, default=0)  # Bumped on role/password changes; older tokens stop working
     date_created = Column(Integer)
 
 class Task(Base):
@@ -143,6 +153,13 @@ class Task(Base):
     date_created = Column(Integer)
     date_updated = Column(Integer)
     data = Column(JSON)  # Additional metadata
+    
+    # Each list filter ends in (due_date, lecla_id), the keyset pagination order
+    __table_args__ = (
+        Index("ix_tasks_assignee_status_due", "assigned_to", "status", "due_date", "lecla_id"),
+        Index("ix_tasks_related_status_due", "related_to_type", "related_to_id", "status", "due_date", "lecla_id"),
+        Index("ix_tasks_status_due", "status", "due_date", "lecla_id"),
+    )
 
 class Workflow(Base):
     """Custom workflow templates (e.g., 'Residential Roof', 'Commercial Siding')"""
@@ -154,6 +171,11 @@ class Workflow(Base):
     is_active = Column(Integer, default=1)  # SQLite uses INTEGER for boolean
     display_order = Column(Integer)
     date_created = Column(Integer)
+    
+    statuses = relationship(
+        "WorkflowStatus", back_populates="workflow",
+        order_by="WorkflowStatus.display_order", cascade="all, delete-orphan"
+    )
 
 class WorkflowStatus(Base):
     """Statuses within a workflow (e.g., 'Lead', 'Quoted', 'Sold')"""
@@ -166,7 +188,7 @@ class WorkflowStatus(Base):
     display_order = Column(Integer)
     is_closed = Column(Integer, default=0)  # Terminal status
     
-    workflow = relationship("Workflow")
+    workflow = relationship("Workflow", back_populates="statuses")
 
 class CustomField(Base):
     """User-defined custom fields with automation capabilities"""
@@ -212,3 +234,215 @@ class FieldValue(Base):
     updated_by = Column(String, ForeignKey("users.id"))
     
     custom_field = relationship("CustomField")
+
+class CalendarEvent(Base):
+    """Local copy of Google Calendar events, kept current by incremental sync"""
+    __tablename__ = "calendar_events"
+    
+    id = Column(String, primary_key=True)  # Google event ID (instance ID for recurring events)
+    calendar_id = Column(String, nullable=False)
+    summary = Column(String)
+    location = Column(String)
+    status = Column(String)  # "confirmed", "tentative"
+    start_ts = Column(Integer)  # Unix timestamp
+    end_ts = Column(Integer)  # Unix timestamp
+    all_day = Column(Integer, default=0)
+    updated = Column(String)  # Google's RFC3339 'updated' value
+    data = Column(JSON)  # Full Google event JSON, returned as-is to the frontend
+    
+    __table_args__ = (
+        Index("ix_calendar_events_window", "calendar_id", "start_ts", "end_ts"),
+    )
+
+class CalendarSyncState(Base):
+    """Incremental sync token per calendar"""
+    __tablename__ = "calendar_sync_state"
+    
+    calendar_id = Column(String, primary_key=True)
+    sync_token = Column(String)
+    last_synced_at = Column(Integer)
+
+class ReportingRow(Base):
+    """Typed copy of the 'Reporting Data' sheet tab (columns A-K)"""
+    __tablename__ = "reporting_rows"
+    
+    row_number = Column(Integer, primary_key=True)  # Sheet row number (data starts at 2)
+    row_hash = Column(String)  # Hash of the raw cells, for incremental re-ingest
+    status = Column(String)  # Column C
+    date_created = Column(Integer)  # Column H, Unix timestamp
+    date_signed = Column(Integer)  # Column I, Unix timestamp
+    budget_amount = Column(Float)  # Column J
+    invoice_amount = Column(Float)  # Column K
+    revenue = Column(Float)  # max(budget, invoice)
+    effective_date = Column(Integer)  # Signed date, falling back to created date
+    effective_year = Column(Integer)
+    cell_count = Column(Integer)  # Cells in the sheet row; the API drops trailing blanks
+    raw = Column(JSON)  # Original cell values
+    
+    __table_args__ = (
+        Index("ix_reporting_rows_year_revenue", "effective_year", "revenue"),
+        Index("ix_reporting_rows_effective_date", "effective_date"),
+    )
+
+class SheetIngestError(Base):
+    """Cells that could not be parsed during the last ingest of a sheet row"""
+    __tablename__ = "sheet_ingest_errors"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    sheet_key = Column(String, index=True)  # e.g. "reporting_data"
+    row_number = Column(Integer)
+    column = Column(String)
+    raw_value = Column(String)
+    error = Column(String)
+    revision = Column(String)
+
+class SheetIngestState(Base):
+    """Last ingested revision per sheet tab"""
+    __tablename__ = "sheet_ingest_state"
+    
+    sheet_key = Column(String, primary_key=True)
+    spreadsheet_id = Column(String)
+    revision = Column(String)
+    row_count = Column(Integer)
+    error_count = Column(Integer)
+    ingested_at = Column(Integer)
+
+class CompanyCamProject(Base):
+    """Local mirror of CompanyCam projects"""
+    __tablename__ = "companycam_projects"
+    
+    id = Column(String, primary_key=True)  # CompanyCam project ID
+    name = Column(String)
+    city = Column(String)
+    state = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    photo_count = Column(Integer)
+    updated_at = Column(Integer, index=True)  # CompanyCam updated_at (Unix timestamp)
+    photos_synced_at = Column(Integer)  # updated_at value when photos were last pulled
+    data = Column(JSON)  # Full CompanyCam project JSON
+
+class CompanyCamSyncState(Base):
+    """Project sync watermark, advanced only after a complete pass"""
+    __tablename__ = "companycam_sync_state"
+    
+    id = Column(Integer, primary_key=True)  # Single row, id 1
+    projects_modified_since = Column(Integer)  # Newest updated_at of the last complete pass
+    synced_at = Column(Integer)
+
+class CompanyCamPhoto(Base):
+    """Local mirror of CompanyCam photo metadata (image bytes live in the thumbnail cache)"""
+    __tablename__ = "companycam_photos"
+    
+    id = Column(String, primary_key=True)  # CompanyCam photo ID
+    project_id = Column(String, ForeignKey("companycam_projects.id"))
+    captured_at = Column(Integer)  # Unix timestamp
+    thumbnail_url = Column(String)
+    web_url = Column(String)
+    data = Column(JSON)  # Full CompanyCam photo JSON
+    
+    __table_args__ = (
+        Index("ix_companycam_photos_project_captured", "project_id", "captured_at"),
+        Index("ix_companycam_photos_captured", "captured_at"),
+    )
+
+class GeocodeCache(Base):
+    """Every address ever geocoded, including misses, so none is looked up twice"""
+    __tablename__ = "geocode_cache"
+    
+    address_key = Column(String, primary_key=True)  # Normalized address
+    address = Column(String)  # As first seen
+    latitude = Column(Float)
+    longitude = Column(Float)
+    status = Column(String)  # "ok", "not_found"
+    provider = Column(String)  # "google", "stub"
+    date_created = Column(Integer)
+
+class GeoPoint(Base):
+    """Mappable entities (CompanyCam projects, jobs) with coordinates"""
+    __tablename__ = "geo_points"
+    
+    id = Column(String, primary_key=True)  # "<kind>:<ref_id>"
+    kind = Column(String)  # "project", "job"
+    ref_id = Column(String)
+    label = Column(String)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    date_updated = Column(Integer)
+    
+    __table_args__ = (
+        Index("ix_geo_points_lat_lng", "latitude", "longitude"),
+    )
+
+class MetadataVersion(Base):
+    """Version counters for cached definitions, bumped on every write so all workers reload"""
+    __tablename__ = "metadata_versions"
+    
+    name = Column(String, primary_key=True)  # "custom_fields", "workflows"
+    version = Column(Integer, default=0)
+    date_updated = Column(Integer)
+
+class JobStatusChange(Base):
+    """Append-only log of job status transitions, written by the CRM sync"""
+    __tablename__ = "job_status_changes"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String)  # Job.jnid
+    from_status = Column(String)  # None when the job was first seen
+    to_status = Column(String)
+    sales_rep = Column(String)
+    changed_at = Column(Integer)
+    seconds_in_previous = Column(Integer)  # Time spent in from_status, if its start is known
+    
+    __table_args__ = (
+        Index("ix_job_status_changes_job", "job_id", "changed_at"),
+    )
+
+class JobStatusDailyStat(Base):
+    """Materialized per-day, per-status, per-rep transition counts and time in status"""
+    __tablename__ = "job_status_daily_stats"
+    
+    day = Column(String, primary_key=True)  # "YYYY-MM-DD" (UTC) of the transition
+    status_name = Column(String, primary_key=True)
+    sales_rep = Column(String, primary_key=True)  # "" when unassigned
+    entered = Column(Integer, default=0)  # Jobs that moved into the status
+    exited = Column(Integer, default=0)  # Jobs that moved out of it with a known start
+    exited_seconds = Column(Integer, default=0)  # Their total time in the status
+
+class JobStatusStatsState(Base):
+    """How far job_status_daily_stats has been rolled up"""
+    __tablename__ = "job_status_stats_state"
+    
+    id = Column(Integer, primary_key=True)  # Single row, id 1
+    last_change_id = Column(Integer, default=0)
+    refreshed_at = Column(Integer)
+
+class JobTimeline(Base):
+    """Which timeline template a job's milestones were computed from, and from what inputs"""
+    __tablename__ = "job_timelines"
+    
+    job_id = Column(String, primary_key=True)  # Job.jnid
+    template_id = Column(String)  # Key of services.timeline.TIMELINE_TEMPLATES
+    pinned = Column(Integer, default=0)  # 1 when a user chose the template (otherwise picked from job type)
+    signature = Column(String)  # Template + anchor/related field values the milestones reflect
+    computed_at = Column(Integer)
+
+class JobMilestone(Base):
+    """Materialized timeline milestones for active jobs, maintained by services/timeline.py"""
+    __tablename__ = "job_milestones"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String)  # Job.jnid
+    template_id = Column(String)
+    step_index = Column(Integer)
+    name = Column(String)
+    due_date = Column(String)  # "YYYY-MM-DD" in TIMELINE_TIMEZONE
+    related_field = Column(String)  # Job column that records the step actually happening
+    actual_date = Column(Integer)  # That column's timestamp, when it is one
+    completed = Column(Integer, default=0)
+    is_anchor = Column(Integer, default=0)
+    
+    __table_args__ = (
+        Index("ix_job_milestones_due", "due_date", "id"),  # Date-range queries, keyset order
+        Index("ix_job_milestones_job_step", "job_id", "step_index", unique=True),
+    )
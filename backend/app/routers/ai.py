@@ -1,35 +1,17 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 import httpx
+import json
 import logging
 from pydantic import BaseModel
 from backend.app.config import settings
 from backend.app.db import get_db
-from backend.app.routers.auth import get_current_user
-
-logger = logging.getLogger(__name__)
-import vertexai
-from vertexai.generative_models import GenerativeModel
-from google.oauth2 import service_account
+from backend.app.routers.auth import get_current_user, check_role
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Initialize Vertex AI SDK
-try:
-    if settings.GCP_SERVICE_ACCOUNT_JSON.exists():
-        creds = service_account.Credentials.from_service_account_file(str(settings.GCP_SERVICE_ACCOUNT_JSON))
-        vertexai.init(
-            project=settings.GCP_PROJECT_ID,
-            location=settings.GCP_LOCATION,
-            credentials=creds
-        )
-        logger.info(f"Vertex AI initialized with Service Account for project {settings.GCP_PROJECT_ID}")
-    else:
-        # Fallback to default auth (works in Cloud Run environments)
-        vertexai.init(project=settings.GCP_PROJECT_ID, location=settings.GCP_LOCATION)
-        logger.info(f"Vertex AI initialized with default auth for project {settings.GCP_PROJECT_ID}")
-except Exception as e:
-    logger.error(f"Failed to initialize Vertex AI SDK: {e}")
+# The Vertex AI SDK is imported and initialized by ai_models on the first chat
 
 class ChatRequest(BaseModel):
     message: str
@@ -40,67 +22,114 @@ PERSONAS = {
     "team": "You are a helpful coordinator for the Lecla operations team."
 }
 
-from backend.app.database import SessionLocal
-from backend.app.models import Job, Budget
-from sqlalchemy import func
+from backend.app.services.business_context import business_context as context_cache
+from backend.app.services.retrieval import retrieval_index
+from backend.app.services.ai_gateway import ai_gateway, normalize_prompt, GatewayBusy, GatewayTimeout
+from starlette.concurrency import run_in_threadpool
+
+async def get_context_snapshot():
+    """Return the cached business metrics snapshot for AI context infusion."""
+    snapshot = context_cache.peek()
+    if snapshot is None:
+        # Stale or first use: rebuild off the event loop
+        snapshot = await run_in_threadpool(context_cache.get)
+    return snapshot
 
 async def get_business_context():
-    """Fetch high-level metrics for AI context infusion."""
-    db = SessionLocal()
-    try:
-        # Active Jobs count
-        job_count = db.query(func.count(Job.lecla_id)).scalar() or 0
-        
-        # Total Revenue (sum of budgets)
-        total_rev = db.query(func.sum(Budget.revenue)).scalar() or 0
-        
-        # Sales Rep performance (top 3)
-        top_reps = db.query(
-            Budget.sales_rep, 
-            func.sum(Budget.revenue).label('rev')
-        ).group_by(Budget.sales_rep).order_by(func.sum(Budget.revenue).desc()).limit(3).all()
-        
-        reps_str = ", ".join([f"{r.sales_rep} (${r.rev:,.0f})" for r in top_reps])
-        
-        return f"""
-        BUSINESS CONTEXT:
-        - Active Jobs: {job_count}
-        - Total Budgeted Revenue: ${total_rev:,.2f}
-        - Top Sales Reps: {reps_str}
-        """
-    except Exception as e:
-        logger.error(f"Error fetching business context: {e}")
-        return ""
-    finally:
-        db.close()
+    """Return the cached business metrics block for AI context infusion."""
+    return (await get_context_snapshot()).render()
 
-@router.post("/chat")
-async def chat_with_agent(req: ChatRequest, current_user: dict = Depends(get_current_user)):
+async def get_relevant_records(message: str) -> str:
+    """Top matching CRM records for the message, within the prompt token budget."""
+    if retrieval_index.is_stale():
+        await run_in_threadpool(retrieval_index.refresh)
+    return retrieval_index.context_for(
+        message,
+        k=settings.AI_RETRIEVAL_TOP_K,
+        token_budget=settings.AI_RETRIEVAL_TOKEN_BUDGET
+    )
+
+def build_prompt(message: str, current_user: dict, business_context: str, records: str = "") -> str:
+    # Only the role goes in: everything in the prompt must be covered by cache_key,
+    # and answers are shared between users with the same role
     role = current_user.get("role", "team").lower()
     system_instruction = PERSONAS.get(role, "You are a helpful assistant for Lecla team members.")
-    
+    return f"System Instruction: {system_instruction}\n\n{business_context}{records}\n\nUser Role: {role}\n\nUser Message: {message}"
+
+def cache_key(message: str, current_user: dict, snapshot) -> tuple:
+    """Responses are reusable across users with the same role and the same data (see build_prompt)."""
+    return (normalize_prompt(message), current_user.get("role", "team").lower(), snapshot.version, retrieval_index.version)
+
+def friendly_error(e: Exception) -> str:
+    """Map SDK exceptions to a message the user can act on."""
+    if isinstance(e, GatewayBusy):
+        return "You already have several questions in progress. Please wait for them to finish."
+    if isinstance(e, GatewayTimeout):
+        return "The AI is taking too long to respond right now. Please try again in a moment."
+    # Check for specific permission errors to help the user
+    if "permission" in str(e).lower():
+        return "I'm having trouble connecting to Google Cloud (Permission Denied). Please ensure the 'Vertex AI User' role is granted."
+    return f"I'm sorry, I encountered an error: {str(e)[:100]}"
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Events frame."""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data)}\n\n"
+
+@router.post("/chat")
+async def chat_with_agent(req: ChatRequest, current_user: dict = Depends(get_current_user)):
     # Infuse context
-    business_context = await get_business_context()
-    
-    prompt = f"System Instruction: {system_instruction}\n\n{business_context}\n\nUser Profile: {current_user.get('full_name')} ({role})\n\nUser Message: {req.message}"
+    snapshot = await get_context_snapshot()
+    records = await get_relevant_records(req.message)
+    prompt = build_prompt(req.message, current_user, snapshot.render(), records)
     
     try:
-        # Use Vertex AI SDK
-        model = GenerativeModel("gemini-2.0-flash-exp")
+        # Gateway bounds concurrency, queues fairly per user and serves repeats from cache
+        text = await ai_gateway.generate(current_user["id"], cache_key(req.message, current_user, snapshot), prompt)
         
-        # We run this in a threadpool to avoid blocking the event loop if the SDK is synchronous
-        # although vertexai usually handles its own async if used correctly.
-        # For simplicity in this dashboard, we'll use the basic call.
-        response = model.generate_content(prompt)
-        
-        if response and response.text:
-            return {"response": response.text}
+        if text:
+            return {"response": text}
         else:
             return {"response": "The AI returned an empty response."}
                 
+    except GatewayBusy as e:
+        raise HTTPException(status_code=429, detail=friendly_error(e))
+    except GatewayTimeout as e:
+        raise HTTPException(status_code=504, detail=friendly_error(e))
     except Exception as e:
         logger.error(f"Vertex AI SDK Exception: {e}")
-        # Check for specific permission errors to help the user
-        if "permission" in str(e).lower():
-            return {"response": "I'm having trouble connecting to Google Cloud (Permission Denied). Please ensure the 'Vertex AI User' role is granted."}
-        return {"response": f"I'm sorry, I encountered an error: {str(e)[:100]}"}
+        return {"response": friendly_error(e)}
+
+@router.post("/chat/stream")
+async def stream_chat_with_agent(req: ChatRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Stream the AI response as Server-Sent Events.
+
+    Emits `data: {"text": ...}` frames as tokens arrive, then a final
+    `event: done` frame. Errors are sent as `event: error` so the client can
+    show them inline.
+    """
+    snapshot = await get_context_snapshot()
+    records = await get_relevant_records(req.message)
+    prompt = build_prompt(req.message, current_user, snapshot.render(), records)
+    key = cache_key(req.message, current_user, snapshot)
+
+    async def event_stream():
+        try:
+            async for text in ai_gateway.stream(current_user["id"], key, prompt):
+                yield sse_event({"text": text})
+            yield sse_event({}, event="done")
+        except Exception as e:
+            logger.error(f"Vertex AI SDK Exception (stream): {e}")
+            yield sse_event({"text": friendly_error(e)}, event="error")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/gateway/stats")
+async def get_gateway_stats(current_user: dict = Depends(check_role(["admin"]))):
+    """Queue depth, cache hit rate and timeout counters for this worker."""
+    return ai_gateway.stats()
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from backend.app.database import get_db as get_sqlalchemy_db
 from backend.app.models import User
 from sqlalchemy.orm import Session
-from backend.app.services.security import verify_password, get_password_hash, create_access_token, SECRET_KEY, ALGORITHM
+from backend.app.services.security import create_access_token, SECRET_KEY, ALGORITHM
+from backend.app.services.password_hasher import password_hasher, HasherBusy
+from backend.app.services.user_cache import user_cache, token_claims, revoke_tokens
 from pydantic import BaseModel
 import uuid
 import time
@@ -30,6 +33,27 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class RoleUpdate(BaseModel):
+    role: str
+
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
+USER_ROLES = ("owner", "admin", "production", "sales", "bookkeeper")
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Too many sign-in attempts in progress, try again shortly", headers={"Retry-After": "2"})
+
+async def get_password_hash(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again shortly", headers={"Retry-After": "2"})
+
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate, db: Session = Depends(get_sqlalchemy_db)):
     db_user = db.query(User).filter(User.email == user.email).first()
@@ -37,7 +61,7 @@ async def register(user: UserCreate, db: Session = Depends(get_sqlalchemy_db)):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     user_id = str(uuid.uuid4())
-    hashed_pwd = get_password_hash(user.password)
+    hashed_pwd = await get_password_hash(user.password)
     
     new_user = User(
         id=user_id,
@@ -57,17 +81,21 @@ async def register(user: UserCreate, db: Session = Depends(get_sqlalchemy_db)):
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_sqlalchemy_db)):
     user = db.query(User).filter(User.email == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await verify_password(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": user.email, "id": user.id})
+    access_token = create_access_token(data=token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_sqlalchemy_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    The token's user, from the per-worker user cache (no query for recently
+    seen users). Tokens issued before a role/password change are rejected.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -75,20 +103,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+        user_id: str = payload.get("id")
+        if user_id is None or payload.get("sub") is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
         
-    user = db.query(User).filter(User.email == email).first()
+    user = user_cache.peek(user_id)
     if user is None:
+        # Cache miss: the database query runs in the threadpool, not on the event loop
+        user = await run_in_threadpool(user_cache.get, user_id)
+    if user is None or user["email"] != payload["sub"] or user["token_version"] != payload.get("ver", 0):
         raise credentials_exception
     return {
-        "id": user.id,
-        "email": user.email,
-        "full_name": user.full_name,
-        "role": user.role
+        "id": user["id"],
+        "email": user["email"],
+        "full_name": user["full_name"],
+        # The signed role is current as long as the token version matches
+        "role": payload.get("role") or user["role"]
     }
 
 def check_role(allowed_roles: List[str]):
@@ -104,3 +136,40 @@ def check_role(allowed_roles: List[str]):
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: dict = Depends(get_current_user)):
     return current_user
+
+@router.put("/me/password")
+async def change_password(change: PasswordChange, current_user: dict = Depends(get_current_user), db: Session = Depends(get_sqlalchemy_db)):
+    """Change your password; signs out your other sessions."""
+    user = db.get(User, current_user["id"])
+    if user is None or not await verify_password(change.current_password, user.password_hash):
+        raise HTTPException(status_code=400, detail="Current password is incorrect")
+    user.password_hash = await get_password_hash(change.new_password)
+    revoke_tokens(db, user)
+    db.commit()
+    return {"access_token": create_access_token(data=token_claims(user)), "token_type": "bearer"}
+
+@router.put("/users/{user_id}/role", response_model=UserResponse)
+async def update_user_role(
+    user_id: str,
+    update: RoleUpdate,
+    db: Session = Depends(get_sqlalchemy_db),
+    current_user: dict = Depends(check_role(["admin"]))
+):
+    """Change a user's role; their existing tokens stop working."""
+    if update.role not in USER_ROLES:
+        raise HTTPException(status_code=400, detail=f"role must be one of {', '.join(USER_ROLES)}")
+    user = db.get(User, user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if (user.role == "owner" or update.role == "owner") and current_user["role"] != "owner":
+        raise HTTPException(status_code=403, detail="Only an owner can grant or change the owner role")
+    user.role = update.role
+    revoke_tokens(db, user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+@router.get("/hashing/stats")
+async def get_hashing_stats(current_user: dict = Depends(check_role(["admin"]))):
+    """Password hashing pool load: queue times, run times, rejections."""
+    return password_hasher.stats()
@@ -1,29 +1,74 @@
-from fastapi import APIRouter, HTTPException
-from backend.app.routers.google import get_google_creds
-from googleapiclient.discovery import build
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from sqlalchemy.orm import Session
+from typing import Optional
+from backend.app.database import get_db, SessionLocal
+from backend.app.routers.google import get_google_service
+from backend.app.routers.auth import check_role
+from backend.app.services.calendar_store import calendar_store
+from backend.app.services.leader import try_lock
 from datetime import datetime, UTC
 
 router = APIRouter()
 
+def parse_window_bound(value: Optional[str], name: str) -> Optional[int]:
+    """ISO date or datetime -> unix timestamp."""
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp())
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected an ISO date or datetime")
+
+def sync_calendar_in_background(calendar_id: str = 'primary'):
+    """Incremental sync after the response has been sent (skipped if another worker is mid-sync)."""
+    with try_lock("calendar_sync") as acquired:
+        if not acquired:
+            return
+        db = SessionLocal()
+        try:
+            calendar_store.sync(get_google_service('calendar', 'v3'), db, calendar_id)
+        except Exception as e:
+            print(f"Google Calendar background sync error: {str(e)}")
+        finally:
+            db.close()
+
 @router.get("/events")
-def get_events():
-    """Fetch upcoming events from the user's primary Google Calendar."""
-    creds = get_google_creds()
+def get_events(
+    background_tasks: BackgroundTasks,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = 50,
+    db: Session = Depends(get_db)
+):
+    """
+    Events from the local calendar store overlapping [start, end).
+    Defaults to the next 50 events from now. The store is synced from Google
+    inline only on first use; afterwards changes are pulled in the background.
+    """
+    start_ts = parse_window_bound(start, 'start') or int(datetime.now(UTC).timestamp())
+    end_ts = parse_window_bound(end, 'end')
+
+    if not calendar_store.has_synced(db):
+        try:
+            calendar_store.sync(get_google_service('calendar', 'v3'), db)
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Google Calendar Error: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+    elif calendar_store.needs_sync():
+        background_tasks.add_task(sync_calendar_in_background)
+
+    return calendar_store.events_between(db, start_ts, end_ts, limit=limit)
+
+@router.post("/sync")
+def sync_events(db: Session = Depends(get_db), current_user: dict = Depends(check_role(["admin"]))):
+    """Pull changes from Google Calendar now."""
     try:
-        service = build('calendar', 'v3', credentials=creds)
-        
-        # Call the Calendar API
-        now = datetime.now(UTC).isoformat().replace('+00:00', 'Z')
-        events_result = service.events().list(
-            calendarId='primary', 
-            timeMin=now,
-            maxResults=50, 
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        return events_result.get('items', [])
-        
+        changed = calendar_store.sync(get_google_service('calendar', 'v3'), db)
+        return {"status": "ok", "changed": changed}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Google Calendar Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,135 @@
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.responses import FileResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+import asyncio
+from backend.app.database import get_db, SessionLocal
+from backend.app.routers.auth import check_role
+from backend.app.services.companycam import cc_client
+from backend.app.services.companycam_sync import companycam_mirror
+from backend.app.services.photo_feed import photo_feed
+from backend.app.services.thumbnail_cache import thumbnail_cache
+from backend.app.services.geo_index import rebuild_geo_points
+from backend.app.services.leader import try_lock
+
+router = APIRouter()
+
+# Photos never change once captured, so browsers may keep them for a year
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_thumbnail_downloads = {}  # photo_id -> future shared by concurrent misses
+
+async def sync_in_background():
+    with try_lock("companycam_sync") as acquired:
+        if not acquired:
+            return  # Another worker is already refreshing the mirror
+        db = SessionLocal()
+        try:
+            result = await companycam_mirror.sync(db)
+        except Exception as e:
+            print(f"CompanyCam background sync error: {str(e)}")
+            return
+        finally:
+            db.close()
+        if result and result.get("projects"):
+            await rebuild_geo_points()
+
+async def ensure_mirror(db: Session, background_tasks: BackgroundTasks):
+    """Sync inline only when the mirror is empty; otherwise refresh after responding."""
+    if not await run_in_threadpool(companycam_mirror.has_data, db):
+        await companycam_mirror.sync(db)
+    elif companycam_mirror.is_stale() and not companycam_mirror.is_syncing():
+        background_tasks.add_task(sync_in_background)
+
+def image_media_type(content: bytes) -> str:
+    if content.startswith(b"\x89PNG"):
+        return "image/png"
+    if content[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/jpeg"
+
+def cached_thumbnail(photo_id: str):
+    """(path, media type) of a cached thumbnail, or None. Blocking disk I/O."""
+    path = thumbnail_cache.get(photo_id)
+    if path is None:
+        return None
+    with open(path, "rb") as f:
+        return path, image_media_type(f.read(12))
+
+@router.get("/projects")
+async def get_projects(background_tasks: BackgroundTasks, limit: int = 25, db: Session = Depends(get_db)):
+    """Most recently updated CompanyCam projects, from the local mirror."""
+    await ensure_mirror(db, background_tasks)
+    return await run_in_threadpool(companycam_mirror.list_projects, db, limit=limit)
+
+@router.get("/photos")
+async def get_photos(background_tasks: BackgroundTasks, project_id: str = None, limit: int = 20, db: Session = Depends(get_db)):
+    """Recent photos for a project, from the local mirror."""
+    if not project_id:
+        return []
+    await ensure_mirror(db, background_tasks)
+    return await run_in_threadpool(companycam_mirror.project_photos, db, project_id, limit=limit)
+
+@router.get("/photos/feed")
+async def get_photo_feed(
+    background_tasks: BackgroundTasks,
+    projects: int = 8,
+    per_project: int = 4,
+    limit: int = 32,
+    db: Session = Depends(get_db)
+):
+    """Latest photos across the most recently updated projects, newest first."""
+    projects = min(max(projects, 1), 50)
+    per_project = min(max(per_project, 1), 50)
+    await ensure_mirror(db, background_tasks)
+    return await photo_feed.get(projects=projects, per_project=per_project, limit=limit)
+
+def photo_source(photo_id: str):
+    db = SessionLocal()
+    try:
+        return companycam_mirror.photo_source(db, photo_id)
+    finally:
+        db.close()
+
+async def download_thumbnail(photo_id: str) -> bytes:
+    """Look up, download and cache one thumbnail; shared by concurrent misses."""
+    source = await run_in_threadpool(photo_source, photo_id)
+    if not source:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    content = await cc_client.download(source)
+    await run_in_threadpool(thumbnail_cache.put, photo_id, content)
+    return content
+
+@router.get("/photos/{photo_id}/thumbnail")
+async def get_photo_thumbnail(photo_id: str):
+    """Serve a photo thumbnail from the disk cache, downloading it once on a miss."""
+    # Disk and database work runs in the threadpool so a slow disk doesn't stall the event loop
+    cached = await run_in_threadpool(cached_thumbnail, photo_id)
+    if cached is not None:
+        path, media_type = cached
+        return FileResponse(path, media_type=media_type, headers={"Cache-Control": THUMBNAIL_CACHE_CONTROL})
+
+    shared = _thumbnail_downloads.get(photo_id)
+    if shared is None:
+        # Registered before the first await so concurrent misses join this download
+        shared = asyncio.ensure_future(download_thumbnail(photo_id))
+        _thumbnail_downloads[photo_id] = shared
+        shared.add_done_callback(lambda _: _thumbnail_downloads.pop(photo_id, None))
+
+    try:
+        content = await asyncio.shield(shared)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"CompanyCam thumbnail error: {str(e)}")
+        raise HTTPException(status_code=502, detail="Could not fetch photo from CompanyCam")
+
+    return Response(content=content, media_type=image_media_type(content[:12]), headers={"Cache-Control": THUMBNAIL_CACHE_CONTROL})
+
+@router.post("/companycam/sync")
+async def sync_companycam(background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: dict = Depends(check_role(["admin"]))):
+    """Pull CompanyCam changes now; map points are rebuilt after responding."""
+    result = await companycam_mirror.sync(db)
+    if result and result.get("projects"):
+        background_tasks.add_task(rebuild_geo_points)
+    return {"status": "ok", **(result or {}), "thumbnails": thumbnail_cache.stats()}
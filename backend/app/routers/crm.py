@@ -4,9 +4,11 @@ from pydantic import BaseModel
 from backend.app.database import get_db as get_sqlalchemy_db
 from backend.app.models import Contact, Job, Budget
 from backend.app.routers.auth import get_current_user, check_role
+from backend.app.services.leader import start_crm_sync
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 import os
+import time
 
 router = APIRouter()
 
@@ -60,32 +62,15 @@ async def get_active_jobs(db: Session = Depends(get_sqlalchemy_db)):
     """
     Get truly active jobs (15-25 expected)
     
-    Criteria:
+    Criteria (maintained in jobs.is_active by services/active_jobs.py):
     - Estimates signed in last 14 days
     - Status in active states
     - Exclude completed/closed jobs
     """
-    from datetime import datetime, timedelta
-    
-    fourteen_days_ago = int((datetime.now() - timedelta(days=14)).timestamp())
-    
-    # Active statuses that indicate work in progress
-    active_statuses = [
-        'In Progress',
-        'Scheduled', 
-        'Materials Ordered',
-        'Started',
-        'Pending',
-        'Approved',
-        'Production'
-    ]
-    
-    # Build query for active jobs
+    now = int(time.time())
     query = db.query(Job).filter(
-        (Job.status_name.in_(active_statuses)) |
-        (Job.first_estimate_signed_date >= fourteen_days_ago)
-    ).filter(
-        Job.status_name.notin_(['Paid & Closed', 'Cancelled', 'Lost', 'Void'])
+        Job.is_active == 1,
+        (Job.active_until.is_(None)) | (Job.active_until >= now)
     )
     
     jobs = query.order_by(Job.date_updated.desc()).limit(50).all()
@@ -119,19 +104,12 @@ async def get_sales_audit(db: Session = Depends(get_sqlalchemy_db), current_user
 
 @router.post("/sync", tags=["sync"])
 async def trigger_sync():
-    """Trigger manual sync with JobNimbus in the background."""
-    import subprocess
-    import os
-    
-    # Run crm_sync.py in the background
+    """
+    Trigger manual sync with JobNimbus in the background.
+    Only one sync runs at a time across all workers; triggering while one is
+    running returns status "already_running" instead of starting another.
+    """
     try:
-        # Get path to current python
-        import sys
-        python_exe = sys.executable
-        script_path = os.path.join(os.getcwd(), "backend", "crm_sync.py")
-        
-        # We start it as a background process
-        subprocess.Popen([python_exe, script_path])
-        return {"status": "Sync started in background"}
+        return start_crm_sync()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
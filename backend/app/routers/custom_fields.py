@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends
 from backend.app.database import get_db
-from backend.app.models import CustomField, FieldValue, Invoice, Job
+from backend.app.models import CustomField, FieldValue
+from backend.app.services.formulas import FieldGraph, FormulaError, validate_field_graph, load_entity_values
+from backend.app.services.metadata_cache import metadata_cache, bump_version, snapshot, CUSTOM_FIELDS
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List, Any
@@ -52,20 +54,22 @@ def get_custom_fields(
     db: Session = Depends(get_db)
 ):
     """Get all custom field definitions"""
-    query = db.query(CustomField)
+    fields = field_definitions(db)["fields"]
     
     if entity_type:
-        query = query.filter(CustomField.entity_type == entity_type)
+        fields = [f for f in fields if f.entity_type == entity_type]
     if is_active is not None:
-        query = query.filter(CustomField.is_active == (1 if is_active else 0))
+        fields = [f for f in fields if f.is_active == (1 if is_active else 0)]
     
-    return query.order_by(CustomField.display_order.asc()).all()
+    return fields
 
 @router.post("/custom-fields", response_model=CustomFieldResponse)
 def create_custom_field(field_data: CustomFieldCreate, db: Session = Depends(get_db)):
     """Create a new custom field definition"""
     now = int(datetime.now().timestamp())
     
+    existing = db.query(CustomField).filter(CustomField.entity_type == field_data.entity_type).all()
+    
     field = CustomField(
         id=f"CF-{uuid.uuid4().hex[:8].upper()}",
         entity_type=field_data.entity_type,
@@ -87,52 +91,136 @@ def create_custom_field(field_data: CustomFieldCreate, db: Session = Depends(get
         date_updated=now
     )
     
+    # Reject bad formulas and dependency cycles before saving
+    try:
+        validate_field_graph(existing + [field])
+    except FormulaError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     db.add(field)
+    bump_version(db, CUSTOM_FIELDS)
     db.commit()
     db.refresh(field)
     
     return field
 
+# Cached definitions
+def _load_field_definitions(db: Session) -> dict:
+    fields = db.query(CustomField).all()
+    # Same order as ORDER BY display_order ASC in SQLite (NULLs first)
+    fields.sort(key=lambda f: (f.display_order is not None, f.display_order or 0))
+    return {"fields": [snapshot(f) for f in fields], "graphs": {}}
+
+def field_definitions(db: Session) -> dict:
+    """All custom field definitions plus per-entity-type graphs, from the metadata cache."""
+    return metadata_cache.get(db, CUSTOM_FIELDS, _load_field_definitions)
+
 # Field Value Endpoints
-@router.get("/fields/{entity_type}/{entity_id}")
-def get_entity_field_values(entity_type: str, entity_id: str, db: Session = Depends(get_db)):
-    """Get all custom field values for an entity"""
-    
-    # Get field definitions
-    fields = db.query(CustomField).filter(
-        CustomField.entity_type == entity_type,
-        CustomField.is_active == 1
-    ).all()
-    
-    # Get stored values
+def load_field_graph(entity_type: str, db: Session) -> FieldGraph:
+    """Dependency graph of the active fields for an entity type, built once per definitions version."""
+    definitions = field_definitions(db)
+    graph = definitions["graphs"].get(entity_type)
+    if graph is None:
+        graph = FieldGraph([f for f in definitions["fields"] if f.entity_type == entity_type and f.is_active == 1])
+        definitions["graphs"][entity_type] = graph
+    return graph
+
+def load_value_rows(entity_type: str, entity_id: str, db: Session) -> dict:
+    """Stored FieldValue rows for one entity, keyed by field id."""
     values = db.query(FieldValue).filter(
         FieldValue.entity_type == entity_type,
         FieldValue.entity_id == entity_id
     ).all()
+    return {v.custom_field_id: v for v in values}
+
+def entity_values_for(graph: FieldGraph, field_ids, entity_type: str, entity_id: str, db: Session) -> dict:
+    """Entity columns, loaded only if one of these formulas reads a name that isn't a custom field."""
+    for field_id in field_ids:
+        if any(name not in graph.by_key for name in graph.formulas[field_id].names):
+            return load_entity_values(db, entity_type, entity_id)
+    return {}
+
+def store_value(rows: dict, field_id: str, entity_type: str, entity_id: str, value, now: int, db: Session):
+    """Update the loaded FieldValue row or add a new one (no commit)."""
+    text = str(value) if value is not None else None
+    field_value = rows.get(field_id)
+    if field_value:
+        field_value.value = text
+        field_value.date_updated = now
+    else:
+        field_value = FieldValue(
+            id=f"FV-{uuid.uuid4().hex[:8].upper()}",
+            custom_field_id=field_id,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            value=text,
+            date_updated=now
+        )
+        db.add(field_value)
+        rows[field_id] = field_value
+
+class BulkFieldValuesRequest(BaseModel):
+    entity_ids: Optional[List[str]] = None
+    filter: Optional[dict] = None  # column -> value on the entity table, used when entity_ids is omitted
+    display: Optional[str] = None  # "details", "timeline", "reports" or "kanban"
+    field_ids: Optional[List[str]] = None
+    limit: int = 500
+
+DISPLAY_FLAGS = {
+    "details": "display_in_details",
+    "timeline": "display_in_timeline",
+    "reports": "display_in_reports",
+    "kanban": "display_in_kanban",
+}
+
+@router.post("/fields/{entity_type}/bulk")
+def get_bulk_field_values(entity_type: str, request: BulkFieldValuesRequest, db: Session = Depends(get_db)):
+    """
+    Custom field values for many entities at once (list, kanban and report views).
+    Returns a matrix: values[i][j] is entity_ids[i]'s value for fields[j].
+    """
+    if request.display and request.display not in DISPLAY_FLAGS:
+        raise HTTPException(status_code=400, detail=f"display must be one of: {', '.join(DISPLAY_FLAGS)}")
+    # Imported here: field_matrix pulls in pandas, which isn't worth paying for at startup
+    from backend.app.services.field_matrix import build_value_matrix, resolve_entity_ids
+    
+    if request.entity_ids is not None:
+        entity_ids = request.entity_ids
+    else:
+        try:
+            entity_ids = resolve_entity_ids(db, entity_type, request.filter, request.limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    graph = load_field_graph(entity_type, db)
+    field_ids = set(request.field_ids) if request.field_ids is not None else None
+    if request.display:
+        flag = DISPLAY_FLAGS[request.display]
+        shown = {f.id for f in graph.fields.values() if getattr(f, flag)}
+        field_ids = shown if field_ids is None else field_ids & shown
+    
+    return build_value_matrix(db, graph, entity_type, entity_ids, field_ids)
+
+@router.get("/fields/{entity_type}/{entity_id}")
+def get_entity_field_values(entity_type: str, entity_id: str, db: Session = Depends(get_db)):
+    """Get all custom field values for an entity"""
+    graph = load_field_graph(entity_type, db)
+    rows = load_value_rows(entity_type, entity_id, db)
+    value_map = {field_id: row.value for field_id, row in rows.items()}
     
-    value_map = {v.custom_field_id: v.value for v in values}
+    # Evaluate every calculated field in dependency order
+    entity_values = entity_values_for(graph, graph.order, entity_type, entity_id, db)
+    calculated = graph.evaluate(graph.order, dict(value_map), entity_values)
     
-    # Calculate calculated fields
     result = {}
-    for field in fields:
-        if field.is_calculated:
-            # Calculate value based on formula
-            calculated_value = calculate_field_value(field, entity_type, entity_id, value_map, db)
-            result[field.id] = {
-                "field_id": field.id,
-                "field_name": field.field_name,
-                "field_type": field.field_type,
-                "value": calculated_value,
-                "is_calculated": True
-            }
-        else:
-            result[field.id] = {
-                "field_id": field.id,
-                "field_name": field.field_name,
-                "field_type": field.field_type,
-                "value": value_map.get(field.id),
-                "is_calculated": False
-            }
+    for field in graph.fields.values():
+        result[field.id] = {
+            "field_id": field.id,
+            "field_name": field.field_name,
+            "field_type": field.field_type,
+            "value": calculated.get(field.id) if field.is_calculated else value_map.get(field.id),
+            "is_calculated": bool(field.is_calculated)
+        }
     
     return result
 
@@ -145,42 +233,23 @@ def update_field_value(
     db: Session = Depends(get_db)
 ):
     """Update a custom field value"""
-    field = db.query(CustomField).filter(CustomField.id == field_id).first()
+    graph = load_field_graph(entity_type, db)
+    field = graph.fields.get(field_id)
     if not field:
         raise HTTPException(status_code=404, detail="Field not found")
     
     if field.is_calculated:
         raise HTTPException(status_code=400, detail="Cannot manually update calculated field")
     
-    # Find or create field value
-    field_value = db.query(FieldValue).filter(
-        FieldValue.custom_field_id == field_id,
-        FieldValue.entity_type == entity_type,
-        FieldValue.entity_id == entity_id
-    ).first()
-    
     now = int(datetime.now().timestamp())
+    rows = load_value_rows(entity_type, entity_id, db)
+    store_value(rows, field_id, entity_type, entity_id, value, now, db)
     
-    if field_value:
-        field_value.value = str(value)
-        field_value.date_updated = now
-    else:
-        field_value = FieldValue(
-            id=f"FV-{uuid.uuid4().hex[:8].upper()}",
-            custom_field_id=field_id,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            value=str(value),
-            date_updated=now
-        )
-        db.add(field_value)
-    
+    # Recalculate dependent fields in the same transaction
+    recalculated = recalculate_fields(graph, [field_id], entity_type, entity_id, rows, now, db)
     db.commit()
     
-    # Trigger recalculation of dependent fields
-    recalculate_dependent_fields(field_id, entity_type, entity_id, db)
-    
-    return {"status": "updated", "value": value}
+    return {"status": "updated", "value": value, "recalculated": recalculated}
 
 # Auto-population trigger
 @router.post("/auto-populate/{entity_type}/{entity_id}")
@@ -191,17 +260,18 @@ def trigger_auto_population(
     db: Session = Depends(get_db)
 ):
     """Trigger auto-population for fields based on an event"""
+    graph = load_field_graph(entity_type, db)
     
     # Find fields that should auto-populate for this trigger
-    fields = db.query(CustomField).filter(
-        CustomField.entity_type == entity_type,
-        CustomField.auto_populate == 1,
-        CustomField.auto_populate_trigger == trigger_event,
-        CustomField.is_active == 1
-    ).all()
+    fields = [
+        f for f in graph.fields.values()
+        if f.auto_populate == 1 and f.auto_populate_trigger == trigger_event
+    ]
     
     now = int(datetime.now().timestamp())
     updated_fields = []
+    changed_ids = []
+    rows = None
     
     for field in fields:
         # Auto-populate based on trigger
@@ -214,29 +284,14 @@ def trigger_auto_population(
             value = now
         
         if value is not None:
-            # Store the value
-            field_value = db.query(FieldValue).filter(
-                FieldValue.custom_field_id == field.id,
-                FieldValue.entity_type == entity_type,
-                FieldValue.entity_id == entity_id
-            ).first()
-            
-            if field_value:
-                field_value.value = str(value)
-                field_value.date_updated = now
-            else:
-                field_value = FieldValue(
-                    id=f"FV-{uuid.uuid4().hex[:8].upper()}",
-                    custom_field_id=field.id,
-                    entity_type=entity_type,
-                    entity_id=entity_id,
-                    value=str(value),
-                    date_updated=now
-                )
-                db.add(field_value)
-            
+            if rows is None:
+                rows = load_value_rows(entity_type, entity_id, db)
+            store_value(rows, field.id, entity_type, entity_id, value, now, db)
+            changed_ids.append(field.id)
             updated_fields.append(field.field_name)
     
+    if changed_ids:
+        recalculate_fields(graph, changed_ids, entity_type, entity_id, rows, now, db)
     db.commit()
     
     return {"status": "auto-populated", "fields_updated": updated_fields}
@@ -244,88 +299,39 @@ def trigger_auto_population(
 # Helper functions
 def calculate_field_value(field: CustomField, entity_type: str, entity_id: str, value_map: dict, db: Session):
     """Calculate a field's value based on its formula"""
-    
     if not field.calculation_formula:
         return None
     
-    formula = field.calculation_formula
+    graph = load_field_graph(entity_type, db)
+    if field.id not in graph.formulas:
+        return None
     
-    # Special handling for invoice net calculation
-    # Formula: "total - permit_fee - financing_fee"
-    if entity_type == "invoice" and field.field_type == "currency":
-        # Get the invoice
-        invoice = db.query(Invoice).filter(Invoice.jnid == entity_id).first()
-        if not invoice:
-            return None
-        
-        total = invoice.total or 0
-        
-        # Get permit fee and financing fee from custom fields
-        permit_fee = 0
-        financing_fee = 0
-        
-        for field_id, value in value_map.items():
-            custom_field = db.query(CustomField).filter(CustomField.id == field_id).first()
-            if custom_field and custom_field.jn_field_key == "permit_fee":
-                try:
-                    permit_fee = float(value) if value else 0
-                except:
-                    permit_fee = 0
-            elif custom_field and custom_field.jn_field_key == "financing_fee":
-                try:
-                    financing_fee = float(value) if value else 0
-                except:
-                    financing_fee = 0
-        
-        # Calculate net amount
-        net_amount = total - permit_fee - financing_fee
-        return net_amount
+    # Upstream calculated fields first, so chained formulas see fresh inputs
+    upstream = [fid for fid in graph.order if fid != field.id and fid in graph.formulas]
+    entity_values = entity_values_for(graph, graph.order, entity_type, entity_id, db)
+    values = dict(value_map)
+    graph.evaluate(upstream, values, entity_values)
+    return graph.evaluate([field.id], values, entity_values)[field.id]
+
+def recalculate_fields(graph: FieldGraph, changed_ids, entity_type: str, entity_id: str, rows: dict, now: int, db: Session) -> dict:
+    """Recompute the calculated fields downstream of changed_ids and stage their values (no commit)."""
+    affected = graph.downstream(changed_ids)
+    if not affected:
+        return {}
     
-    return None
+    value_map = {field_id: row.value for field_id, row in rows.items()}
+    entity_values = entity_values_for(graph, affected, entity_type, entity_id, db)
+    results = graph.evaluate(affected, value_map, entity_values)
+    
+    # Store calculated values (for caching)
+    for field_id, new_value in results.items():
+        store_value(rows, field_id, entity_type, entity_id, new_value, now, db)
+    return results
 
 def recalculate_dependent_fields(changed_field_id: str, entity_type: str, entity_id: str, db: Session):
     """Recalculate any fields that depend on this field"""
-    
-    # Find fields that depend on the changed field
-    all_fields = db.query(CustomField).filter(
-        CustomField.entity_type == entity_type,
-        CustomField.is_calculated == 1
-    ).all()
-    
-    for field in all_fields:
-        if field.depends_on_fields:
-            depends_on = json.loads(field.depends_on_fields) if isinstance(field.depends_on_fields, str) else field.depends_on_fields
-            if changed_field_id in depends_on:
-                # Recalculate this field
-                values = db.query(FieldValue).filter(
-                    FieldValue.entity_type == entity_type,
-                    FieldValue.entity_id == entity_id
-                ).all()
-                value_map = {v.custom_field_id: v.value for v in values}
-                
-                new_value = calculate_field_value(field, entity_type, entity_id, value_map, db)
-                
-                # Store calculated value (for caching)
-                field_value = db.query(FieldValue).filter(
-                    FieldValue.custom_field_id == field.id,
-                    FieldValue.entity_type == entity_type,
-                    FieldValue.entity_id == entity_id
-                ).first()
-                
-                now = int(datetime.now().timestamp())
-                
-                if field_value:
-                    field_value.value = str(new_value) if new_value is not None else None
-                    field_value.date_updated = now
-                else:
-                    field_value = FieldValue(
-                        id=f"FV-{uuid.uuid4().hex[:8].upper()}",
-                        custom_field_id=field.id,
-                        entity_type=entity_type,
-                        entity_id=entity_id,
-                        value=str(new_value) if new_value is not None else None,
-                        date_updated=now
-                    )
-                    db.add(field_value)
-                
-                db.commit()
+    graph = load_field_graph(entity_type, db)
+    rows = load_value_rows(entity_type, entity_id, db)
+    now = int(datetime.now().timestamp())
+    recalculate_fields(graph, [changed_field_id], entity_type, entity_id, rows, now, db)
+    db.commit()
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from backend.app.models import Job, Budget, Contact, Estimate, Invoice, Task
+from backend.app.routers.auth import get_current_user, check_role
+from backend.app.routers.reports import CLOSED_STATUSES
+from backend.app.services.exports import export_response
+from sqlalchemy import select, func, case
+from datetime import datetime
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+EXPORT_FORMATS = ("csv", "xlsx")
+
+# Raw tables that can be dumped as-is (admin only)
+RAW_TABLES = {
+    "jobs": Job,
+    "contacts": Contact,
+    "budgets": Budget,
+    "estimates": Estimate,
+    "invoices": Invoice,
+    "tasks": Task,
+}
+
+def _check_format(fmt: str) -> str:
+    fmt = fmt.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{fmt}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+def _year_bounds(year: int):
+    return int(datetime(year, 1, 1).timestamp()), int(datetime(year + 1, 1, 1).timestamp())
+
+@router.get("/sales-by-rep")
+def export_sales_by_rep(request: Request, year: int = 2025, format: str = "csv", current_user: dict = Depends(get_current_user)):
+    """
+    Export per-rep sales totals for a year (same basis as /api/reports/sales-by-rep).
+    """
+    fmt = _check_format(format)
+    start_time, end_time = _year_bounds(year)
+
+    rep = func.coalesce(Budget.sales_rep, "Unknown")
+    stmt = select(
+        rep.label("sales_rep"),
+        func.round(func.sum(Budget.revenue), 2).label("revenue"),
+        func.count(Budget.jnid).label("budget_count"),
+        func.count(Job.lecla_id).label("job_count"),
+        func.sum(case((Job.status_name.in_(CLOSED_STATUSES), 1), else_=0)).label("closed_count"),
+    ).outerjoin(
+        Job, Job.jnid == Budget.related_job_id
+    ).where(
+        Budget.date_updated >= start_time,
+        Budget.date_updated < end_time
+    ).group_by(rep).order_by(func.sum(Budget.revenue).desc())
+
+    return export_response(stmt, f"sales_by_rep_{year}", fmt, request.headers.get("accept-encoding", ""))
+
+@router.get("/jobs-by-rep/{rep_name}")
+def export_jobs_by_rep(rep_name: str, request: Request, year: int = 2025, format: str = "csv", current_user: dict = Depends(get_current_user)):
+    """
+    Export every budgeted job for a sales rep in a year.
+    """
+    fmt = _check_format(format)
+    start_time, end_time = _year_bounds(year)
+
+    stmt = select(
+        Job.jnid,
+        Job.number,
+        Job.name,
+        Job.status_name,
+        Job.total,
+        Budget.number.label("budget_number"),
+        Budget.revenue.label("budget_revenue"),
+        Job.date_created,
+        Job.date_updated,
+    ).join(
+        Budget, Job.jnid == Budget.related_job_id
+    ).where(
+        Budget.sales_rep == rep_name,
+        Budget.date_updated >= start_time,
+        Budget.date_updated < end_time
+    ).order_by(Job.date_updated.desc())
+
+    safe_name = "".join(c if c.isalnum() else "_" for c in rep_name)
+    return export_response(stmt, f"jobs_{safe_name}_{year}", fmt, request.headers.get("accept-encoding", ""))
+
+@router.get("/audit")
+def export_sales_audit(request: Request, format: str = "csv", current_user: dict = Depends(get_current_user)):
+    """
+    Export the full budget vs job discrepancy audit (no row cap, unlike /api/crm/audit).
+    """
+    fmt = _check_format(format)
+
+    stmt = select(
+        Budget.number.label("budget_number"),
+        Budget.sales_rep,
+        Budget.revenue.label("budget_revenue"),
+        Job.name.label("job_name"),
+        Job.total.label("job_total"),
+        Job.jnid.label("related_job_id"),
+        (Budget.revenue - Job.total).label("discrepancy")
+    ).outerjoin(
+        Job, Budget.related_job_id == Job.jnid
+    ).where(
+        func.abs(Budget.revenue - Job.total) > 1.0
+    ).order_by(func.abs(Budget.revenue - Job.total).desc())
+
+    return export_response(stmt, "sales_audit", fmt, request.headers.get("accept-encoding", ""))
+
+@router.get("/tables/{table_name}")
+def export_raw_table(
+    table_name: str,
+    request: Request,
+    format: str = "csv",
+    current_user: dict = Depends(check_role(["admin"]))
+):
+    """
+    Dump a raw CRM table. JSON columns are serialized into a single cell.
+    """
+    fmt = _check_format(format)
+    model = RAW_TABLES.get(table_name)
+    if model is None:
+        raise HTTPException(status_code=404, detail=f"Unknown table '{table_name}'")
+
+    stmt = select(model.__table__)
+    return export_response(stmt, table_name, fmt, request.headers.get("accept-encoding", ""))
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Optional
+from backend.app.database import get_db
+from backend.app.routers.auth import check_role
+from backend.app.services.geo_index import geo_index, refresh_geo_points
+from backend.app.services.geocoding import invalidate_geocode_cache
+
+router = APIRouter()
+
+def parse_bbox(bbox: str):
+    """'west,south,east,north' in degrees (the order Google Maps bounds are usually sent in)."""
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be 'west,south,east,north'")
+    if south > north:
+        raise HTTPException(status_code=400, detail="bbox south must not exceed north")
+    return west, south, east, north
+
+@router.get("/markers")
+async def get_markers(bbox: str, zoom: int, kinds: Optional[str] = None):
+    """
+    Clustered map markers for the viewport.
+    kinds: optional comma-separated filter, e.g. "job" or "project,job".
+    """
+    west, south, east, north = parse_bbox(bbox)
+    kind_filter = [k.strip() for k in kinds.split(",") if k.strip()] if kinds else None
+    markers = await run_in_threadpool(geo_index.query, south, west, north, east, zoom, kind_filter)
+    return {"zoom": zoom, "markers": markers}
+
+@router.post("/refresh")
+async def refresh_points(db: Session = Depends(get_db), current_user: dict = Depends(check_role(["admin"]))):
+    """Re-collect project coordinates and geocode any new job addresses."""
+    return await refresh_geo_points(db)
+
+@router.delete("/geocode-cache")
+def clear_geocode_cache(provider: Optional[str] = None, db: Session = Depends(get_db), current_user: dict = Depends(check_role(["admin"]))):
+    """Forget cached geocodes (e.g. provider=stub after switching to Google); the next refresh re-geocodes them."""
+    return {"deleted": invalidate_geocode_cache(db, provider)}
@@ -1,83 +1,75 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import Session
 from backend.app.config import settings
-import pickle
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
+from backend.app.database import get_db
+from backend.app.models import SheetIngestError
+from backend.app.routers.auth import check_role
+from backend.app.services.google_credentials import google_credentials, GoogleCredentialError
+from backend.app.services.google_services import google_services
+from backend.app.services.google_sheets import workbook_cache
 
 router = APIRouter()
 
 def get_google_creds():
-    creds = None
-    token_path = settings.GOOGLE_TOKEN_PICKLE
-    
-    if token_path.exists():
-        try:
-            with open(token_path, 'rb') as token:
-                creds = pickle.load(token)
-        except Exception as e:
-            print(f"Error loading google tokens: {e}")
-            raise HTTPException(status_code=500, detail="Could not load Google tokens")
-            
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            try:
-                # This is a blocking network call. 
-                # Since this function is called inside synchronous route handlers, 
-                # FastAPI will run them in a thread pool, which is fine.
-                creds.refresh(Request())
-            except Exception as e:
-                print(f"Error refreshing google tokens: {e}")
-                raise HTTPException(status_code=401, detail=f"Google token refresh failed: {str(e)}")
-        else:
-             raise HTTPException(status_code=401, detail="Google Not Authorized. Server needs to re-authenticate.")
-    return creds
+    """Return in-memory Google credentials (kept fresh by a background thread)."""
+    try:
+        return google_credentials.get()
+    except GoogleCredentialError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+def get_google_service(api: str, version: str):
+    """Shared, pre-built API client for the current credentials."""
+    return google_services.get(api, version, get_google_creds())
 
 @router.get("/sheet")
 def get_sheet_data():
     """
     Fetch all data from the configured Google Sheet.
     Returns a dictionary where keys are sheet titles and values are lists of rows.
+    Served from cache until the Drive file's revision changes.
     """
-    creds = get_google_creds()
-    start_time = None
+    sheets = get_google_service('sheets', 'v4')
+    drive = get_google_service('drive', 'v3')
     
     try:
-        service = build('sheets', 'v4', credentials=creds)
-        
-        # 1. Get Spreadsheet Metadata to find all sheet titles
-        sheet_metadata = service.spreadsheets().get(spreadsheetId=settings.GOOGLE_SHEET_ID).execute()
-        sheets = sheet_metadata.get('sheets', [])
-        
-        result = {}
-        
-        # 2. Iterate over each sheet and fetch data
-        for sheet in sheets:
-            title = sheet['properties']['title']
-            # Fetch all data from this sheet (assuming reasonable size)
-            range_name = f"'{title}'!A1:Z1000" 
-            response = service.spreadsheets().values().get(
-                spreadsheetId=settings.GOOGLE_SHEET_ID,
-                range=range_name
-            ).execute()
-            
-            rows = response.get('values', [])
-            result[title] = rows
-            
-        return result
+        return workbook_cache.get(settings.GOOGLE_SHEET_ID, sheets, drive)
         
     except Exception as e:
         print(f"Google Sheets Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/sheet/reporting-data/ingest")
+def ingest_reporting_sheet(force: bool = False, db: Session = Depends(get_db), current_user: dict = Depends(check_role(["admin"]))):
+    """Load 'Reporting Data' into reporting_rows (no-op if the sheet revision is unchanged)."""
+    # sheet_ingest pulls in pandas; import it when a sheet is actually ingested
+    from backend.app.services.sheet_ingest import ingest_reporting_data
+    sheets = get_google_service('sheets', 'v4')
+    drive = get_google_service('drive', 'v3')
+    try:
+        return ingest_reporting_data(settings.GOOGLE_SHEET_ID, sheets, drive, db, force=force)
+    except Exception as e:
+        print(f"Google Sheets Ingest Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/sheet/reporting-data/errors")
+def get_reporting_sheet_errors(limit: int = 200, db: Session = Depends(get_db), current_user: dict = Depends(check_role(["admin"]))):
+    """Cells that failed to parse during the last ingest."""
+    from backend.app.services.sheet_ingest import REPORTING_SHEET_KEY
+    errors = db.query(SheetIngestError).filter(
+        SheetIngestError.sheet_key == REPORTING_SHEET_KEY
+    ).order_by(SheetIngestError.row_number).limit(limit).all()
+    return [
+        {"row": e.row_number, "column": e.column, "value": e.raw_value, "error": e.error, "revision": e.revision}
+        for e in errors
+    ]
+
 @router.get("/drive")
 def get_drive_folders(query: str = ""):
     """
     Search for folders/files in Google Drive.
     """
-    creds = get_google_creds()
+    service = get_google_service('drive', 'v3')
     try:
-        service = build('drive', 'v3', credentials=creds)
-        
         # Basic search query
         q = "mimeType = 'application/vnd.google-apps.folder' and trashed = false"
         if query:
@@ -93,3 +85,8 @@ def get_drive_folders(query: str = ""):
     except Exception as e:
          print(f"Google Drive Error: {str(e)}")
          raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/services/stats")
+def get_service_stats():
+    """Build counts and timings for the cached Google API clients."""
+    return google_services.stats()
@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from backend.app.database import get_db
 from backend.app.models import Task
+from backend.app.services.pagination import encode_cursor, decode_cursor, CursorError
+from sqlalchemy import or_, and_
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional, List
@@ -27,6 +29,18 @@ class TaskUpdate(BaseModel):
     priority: Optional[str] = None
     status: Optional[str] = None
 
+class TaskBulkUpdate(TaskUpdate):
+    lecla_id: str
+
+class BulkCreateRequest(BaseModel):
+    tasks: List[TaskCreate]
+
+class BulkUpdateRequest(BaseModel):
+    updates: List[TaskBulkUpdate]
+
+class BulkCompleteRequest(BaseModel):
+    task_ids: List[str]
+
 class TaskResponse(BaseModel):
     lecla_id: str
     jnid: Optional[str]
@@ -44,15 +58,48 @@ class TaskResponse(BaseModel):
     
     model_config = {"from_attributes": True}
 
+OPEN_STATUSES = ("pending", "in_progress")
+MAX_PAGE_SIZE = 500
+MAX_BULK_SIZE = 500
+
+def due_order():
+    # NULLS FIRST is SQLite's native ASC order, so the (…, due_date, lecla_id) indexes serve it
+    return (Task.due_date.asc().nulls_first(), Task.lecla_id.asc())
+
+def after_cursor(cursor: str):
+    """Tasks that sort after the cursor in due_order()."""
+    try:
+        due_date, lecla_id = decode_cursor(cursor, 2)
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if due_date is None:
+        return or_(and_(Task.due_date.is_(None), Task.lecla_id > lecla_id), Task.due_date.isnot(None))
+    return or_(Task.due_date > due_date, and_(Task.due_date == due_date, Task.lecla_id > lecla_id))
+
+def page(query, limit: int, response: Response) -> list:
+    """First `limit` rows; X-Next-Cursor is set when there are more."""
+    tasks = query.order_by(*due_order()).limit(limit + 1).all()
+    if len(tasks) > limit:
+        last = tasks[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.due_date, last.lecla_id)
+    return tasks[:limit]
+
 @router.get("/tasks", response_model=List[TaskResponse])
 def get_tasks(
+    response: Response,
     status: Optional[str] = None,
     related_to_type: Optional[str] = None,
     related_to_id: Optional[str] = None,
     assigned_to: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """Get tasks with optional filtering"""
+    """
+    Get tasks with optional filtering, ordered by due date.
+    Paginated: when more tasks match, the X-Next-Cursor response header holds
+    the cursor for the next page.
+    """
     query = db.query(Task)
     
     if status:
@@ -63,8 +110,81 @@ def get_tasks(
         query = query.filter(Task.related_to_id == related_to_id)
     if assigned_to:
         query = query.filter(Task.assigned_to == assigned_to)
+    if cursor:
+        query = query.filter(after_cursor(cursor))
+    
+    return page(query, min(max(limit, 1), MAX_PAGE_SIZE), response)
+
+@router.get("/tasks/due")
+def get_due_tasks(
+    assigned_to: Optional[str] = None,
+    within_hours: int = 48,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """Open tasks that are overdue or due within `within_hours`, soonest first"""
+    now = int(datetime.now().timestamp())
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    
+    query = db.query(Task).filter(Task.status.in_(OPEN_STATUSES), Task.due_date.isnot(None))
+    if assigned_to:
+        query = query.filter(Task.assigned_to == assigned_to)
     
-    return query.order_by(Task.due_date.asc()).all()
+    overdue = query.filter(Task.due_date < now).order_by(*due_order()).limit(limit).all()
+    due_soon = query.filter(Task.due_date >= now, Task.due_date <= now + within_hours * 3600).order_by(*due_order()).limit(limit).all()
+    return {
+        "now": now,
+        "overdue": [TaskResponse.model_validate(t) for t in overdue],
+        "due_soon": [TaskResponse.model_validate(t) for t in due_soon],
+    }
+
+# Bulk endpoints (each runs in a single transaction)
+def check_bulk_size(count: int):
+    if count > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_SIZE} tasks per request")
+
+@router.post("/tasks/bulk", response_model=List[TaskResponse])
+def create_tasks(request: BulkCreateRequest, db: Session = Depends(get_db)):
+    """Create many tasks at once"""
+    check_bulk_size(len(request.tasks))
+    now = int(datetime.now().timestamp())
+    
+    tasks = [new_task(task_data, now) for task_data in request.tasks]
+    db.add_all(tasks)
+    # Serialize before commit expires the rows (avoids a reload per task)
+    created = [TaskResponse.model_validate(t) for t in tasks]
+    db.commit()
+    return created
+
+@router.patch("/tasks/bulk", response_model=List[TaskResponse])
+def update_tasks(request: BulkUpdateRequest, db: Session = Depends(get_db)):
+    """Update many tasks at once; nothing is saved if any task is missing"""
+    check_bulk_size(len(request.updates))
+    ids = [u.lecla_id for u in request.updates]
+    tasks = {t.lecla_id: t for t in db.query(Task).filter(Task.lecla_id.in_(ids))}
+    missing = [task_id for task_id in ids if task_id not in tasks]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Tasks not found: {', '.join(missing)}")
+    
+    now = int(datetime.now().timestamp())
+    for task_data in request.updates:
+        apply_task_update(tasks[task_data.lecla_id], task_data, now)
+    updated = [TaskResponse.model_validate(tasks[task_id]) for task_id in dict.fromkeys(ids)]
+    db.commit()
+    return updated
+
+@router.post("/tasks/bulk/complete")
+def complete_tasks(request: BulkCompleteRequest, db: Session = Depends(get_db)):
+    """Mark many tasks completed in one statement"""
+    check_bulk_size(len(request.task_ids))
+    now = int(datetime.now().timestamp())
+    
+    completed = db.query(Task).filter(
+        Task.lecla_id.in_(request.task_ids),
+        Task.status != "completed"
+    ).update({Task.status: "completed", Task.completed_at: now, Task.date_updated: now}, synchronize_session=False)
+    db.commit()
+    return {"status": "completed", "completed": completed, "requested": len(set(request.task_ids))}
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
 def get_task(task_id: str, db: Session = Depends(get_db)):
@@ -74,12 +194,8 @@ def get_task(task_id: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Task not found")
     return task
 
-@router.post("/tasks", response_model=TaskResponse)
-def create_task(task_data: TaskCreate, db: Session = Depends(get_db)):
-    """Create a new task"""
-    now = int(datetime.now().timestamp())
-    
-    task = Task(
+def new_task(task_data: TaskCreate, now: int) -> Task:
+    return Task(
         lecla_id=f"T-{uuid.uuid4().hex[:8].upper()}",
         title=task_data.title,
         description=task_data.description,
@@ -92,20 +208,9 @@ def create_task(task_data: TaskCreate, db: Session = Depends(get_db)):
         date_created=now,
         date_updated=now
     )
-    
-    db.add(task)
-    db.commit()
-    db.refresh(task)
-    return task
 
-@router.put("/tasks/{task_id}", response_model=TaskResponse)
-def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends(get_db)):
-    """Update an existing task"""
-    task = db.query(Task).filter(Task.lecla_id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Update fields if provided
+def apply_task_update(task: Task, task_data: TaskUpdate, now: int):
+    """Copy the provided fields onto task"""
     if task_data.title is not None:
         task.title = task_data.title
     if task_data.description is not None:
@@ -119,9 +224,31 @@ def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends(get_d
     if task_data.status is not None:
         task.status = task_data.status
         if task_data.status == "completed":
-            task.completed_at = int(datetime.now().timestamp())
+            task.completed_at = now
+    
+    task.date_updated = now
+
+@router.post("/tasks", response_model=TaskResponse)
+def create_task(task_data: TaskCreate, db: Session = Depends(get_db)):
+    """Create a new task"""
+    now = int(datetime.now().timestamp())
     
-    task.date_updated = int(datetime.now().timestamp())
+    task = new_task(task_data, now)
+    
+    db.add(task)
+    db.commit()
+    db.refresh(task)
+    return task
+
+@router.put("/tasks/{task_id}", response_model=TaskResponse)
+def update_task(task_id: str, task_data: TaskUpdate, db: Session = Depends(get_db)):
+    """Update an existing task"""
+    task = db.query(Task).filter(Task.lecla_id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    # Update fields if provided
+    apply_task_update(task, task_data, int(datetime.now().timestamp()))
     
     db.commit()
     db.refresh(task)
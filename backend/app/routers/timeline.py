@@ -0,0 +1,145 @@
+from fastapi import APIRouter, HTTPException, Depends
+from backend.app.database import get_db
+from backend.app.models import Job, JobMilestone, JobTimeline
+from backend.app.routers.auth import check_role
+from backend.app.services.pagination import encode_cursor, decode_cursor, CursorError
+from backend.app.services.timeline import TIMELINE_TEMPLATES, refresh_milestones, pin_template, milestone_status, today
+from sqlalchemy import or_, and_
+from sqlalchemy.orm import Session
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+router = APIRouter()
+
+class TemplateChoice(BaseModel):
+    template_id: str
+
+MILESTONE_STATUSES = ("pending", "today", "overdue", "completed")
+MAX_PAGE_SIZE = 1000
+
+def parse_day(value: Optional[str], name: str) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be YYYY-MM-DD")
+
+def milestone_dict(milestone, current_day: str) -> dict:
+    steps = TIMELINE_TEMPLATES.get(milestone.template_id, {"steps": []})["steps"]
+    return {
+        "id": milestone.id,
+        "job_id": milestone.job_id,
+        "template_id": milestone.template_id,
+        "step_index": milestone.step_index,
+        "name": milestone.name,
+        "description": steps[milestone.step_index].get("description") if milestone.step_index < len(steps) else None,
+        "due_date": milestone.due_date,
+        "actual_date": milestone.actual_date,
+        "related_field": milestone.related_field,
+        "is_anchor": bool(milestone.is_anchor),
+        "status": milestone_status(milestone.due_date, milestone.completed, current_day),
+    }
+
+@router.get("/templates")
+def get_templates():
+    """The timeline templates milestones are computed from."""
+    return list(TIMELINE_TEMPLATES.values())
+
+@router.get("/milestones")
+def get_milestones(
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    status: Optional[str] = None,
+    sales_rep: Optional[str] = None,
+    name: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 200,
+    db: Session = Depends(get_db)
+):
+    """
+    Milestones across all active jobs, ordered by due date.
+    start/end: inclusive YYYY-MM-DD bounds on the due date.
+    status: pending, today, overdue or completed.
+    """
+    start, end = parse_day(start, "start"), parse_day(end, "end")
+    if status is not None and status not in MILESTONE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(MILESTONE_STATUSES)}")
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    current_day = today()
+
+    query = db.query(
+        JobMilestone, Job.number, Job.name.label("job_name"), Job.status_name, Job.sales_rep
+    ).join(Job, Job.jnid == JobMilestone.job_id)
+    if start:
+        query = query.filter(JobMilestone.due_date >= start)
+    if end:
+        query = query.filter(JobMilestone.due_date <= end)
+    if status == "completed":
+        query = query.filter(JobMilestone.completed == 1)
+    elif status is not None:
+        query = query.filter(JobMilestone.completed == 0)
+        if status == "overdue":
+            query = query.filter(JobMilestone.due_date < current_day)
+        elif status == "today":
+            query = query.filter(JobMilestone.due_date == current_day)
+        else:
+            query = query.filter(JobMilestone.due_date > current_day)
+    if sales_rep is not None:
+        query = query.filter(Job.sales_rep == sales_rep)
+    if name is not None:
+        query = query.filter(JobMilestone.name == name)
+    if cursor:
+        try:
+            due_date, milestone_id = decode_cursor(cursor, 2)
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.filter(or_(
+            JobMilestone.due_date > due_date,
+            and_(JobMilestone.due_date == due_date, JobMilestone.id > milestone_id),
+        ))
+
+    rows = query.order_by(JobMilestone.due_date, JobMilestone.id).limit(limit + 1).all()
+    milestones = []
+    for row in rows[:limit]:
+        milestone = milestone_dict(row.JobMilestone, current_day)
+        milestone.update(job_number=row.number, job_name=row.job_name, job_status=row.status_name, sales_rep=row.sales_rep)
+        milestones.append(milestone)
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1].JobMilestone
+        next_cursor = encode_cursor(last.due_date, last.id)
+    return {"today": current_day, "milestones": milestones, "next_cursor": next_cursor}
+
+@router.get("/jobs/{job_id}")
+def get_job_timeline(job_id: str, db: Session = Depends(get_db)):
+    """One job's milestones (job_id is the JobNimbus jnid)."""
+    timeline = db.get(JobTimeline, job_id)
+    if timeline is None:
+        raise HTTPException(status_code=404, detail="No timeline for this job")
+    milestones = db.query(JobMilestone).filter(JobMilestone.job_id == job_id).order_by(JobMilestone.step_index).all()
+    current_day = today()
+    return {
+        "job_id": job_id,
+        "template_id": timeline.template_id,
+        "pinned": bool(timeline.pinned),
+        "milestones": [milestone_dict(m, current_day) for m in milestones],
+    }
+
+@router.put("/jobs/{job_id}/template")
+def set_job_template(job_id: str, choice: TemplateChoice, db: Session = Depends(get_db)):
+    """Pin a template for a job and recompute its milestones."""
+    if choice.template_id not in TIMELINE_TEMPLATES:
+        raise HTTPException(status_code=400, detail="Unknown template")
+    if not db.query(Job.jnid).filter(Job.jnid == job_id).first():
+        raise HTTPException(status_code=404, detail="Job not found")
+    pin_template(db, job_id, choice.template_id)
+    db.commit()
+    refresh_milestones(db, [job_id])
+    return get_job_timeline(job_id, db)
+
+@router.post("/refresh")
+def refresh_timelines(force: bool = False, db: Session = Depends(get_db), current_user: dict = Depends(check_role(["admin"]))):
+    """Recompute milestones for jobs whose anchor/related fields changed (all of them with force)."""
+    return refresh_milestones(db, force=force)
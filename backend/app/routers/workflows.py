@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from backend.app.database import get_db
 from backend.app.models import Workflow, WorkflowStatus
-from sqlalchemy.orm import Session
+from backend.app.services.metadata_cache import metadata_cache, bump_version, snapshot, WORKFLOWS
+from backend.app.services.workflow_board import build_board, column_page
+from backend.app.services.pagination import CursorError
+from backend.app.services.status_history import refresh_status_stats, status_analytics
+from backend.app.services.active_jobs import active_job_sweeper
+from sqlalchemy.orm import Session, joinedload
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
@@ -47,6 +52,16 @@ class WorkflowResponse(BaseModel):
     
     model_config = {"from_attributes": True}
 
+# Cached definitions
+def _load_workflow_definitions(db: Session) -> list:
+    # Statuses come back in the same query, already ordered by the relationship
+    workflows = db.query(Workflow).options(joinedload(Workflow.statuses)).order_by(Workflow.display_order.asc()).all()
+    return [snapshot(w, statuses=[snapshot(status) for status in w.statuses]) for w in workflows]
+
+def workflow_definitions(db: Session) -> list:
+    """All workflows with their statuses, from the metadata cache."""
+    return metadata_cache.get(db, WORKFLOWS, _load_workflow_definitions)
+
 # Workflow endpoints
 @router.get("/workflows", response_model=List[WorkflowResponse])
 def get_workflows(
@@ -55,38 +70,101 @@ def get_workflows(
     db: Session = Depends(get_db)
 ):
     """Get all workflows with optional filtering"""
-    query = db.query(Workflow)
+    workflows = workflow_definitions(db)
     
     if entity_type:
-        query = query.filter(Workflow.entity_type == entity_type)
+        workflows = [w for w in workflows if w.entity_type == entity_type]
     if is_active is not None:
-        query = query.filter(Workflow.is_active == (1 if is_active else 0))
-    
-    workflows = query.order_by(Workflow.display_order.asc()).all()
-    
-    # Load statuses for each workflow
-    for workflow in workflows:
-        workflow.statuses = db.query(WorkflowStatus).filter(
-            WorkflowStatus.workflow_id == workflow.id
-        ).order_by(WorkflowStatus.display_order.asc()).all()
+        workflows = [w for w in workflows if w.is_active == (1 if is_active else 0)]
     
     return workflows
 
 @router.get("/workflows/{workflow_id}", response_model=WorkflowResponse)
 def get_workflow(workflow_id: str, db: Session =Depends(get_db)):
     """Get a single workflow by ID"""
-    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
+    workflow = next((w for w in workflow_definitions(db) if w.id == workflow_id), None)
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    workflow.statuses = db.query(WorkflowStatus).filter(
-        WorkflowStatus.workflow_id == workflow_id
-    ).order_by(WorkflowStatus.display_order.asc()).all()
-    
     return workflow
 
+def board_workflow(workflow_id: str, db: Session):
+    workflow = next((w for w in workflow_definitions(db) if w.id == workflow_id), None)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    if workflow.entity_type != "job":
+        raise HTTPException(status_code=400, detail="Boards are only available for job workflows")
+    return workflow
+
+# Kanban board endpoints
+@router.get("/{workflow_id}/board")
+def get_workflow_board(workflow_id: str, limit: int = 20, db: Session = Depends(get_db)):
+    """Every status column with its job count and first page of cards"""
+    workflow = board_workflow(workflow_id, db)
+    limit = min(max(limit, 1), 100)
+    return {
+        "workflow_id": workflow.id,
+        "name": workflow.name,
+        "columns": build_board(db, workflow.statuses, limit),
+    }
+
+@router.get("/{workflow_id}/board/{status_id}")
+def get_workflow_board_column(
+    workflow_id: str,
+    status_id: str,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    db: Session = Depends(get_db)
+):
+    """Next page of cards for one column (pass the column's next_cursor)"""
+    workflow = board_workflow(workflow_id, db)
+    status = next((s for s in workflow.statuses if s.id == status_id), None)
+    if not status:
+        raise HTTPException(status_code=404, detail="Status not found")
+    
+    try:
+        page = column_page(db, status.name, cursor, min(max(limit, 1), 100))
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status_id": status.id, **page}
+
+# Status analytics
+def parse_day(value: Optional[str], name: str) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be YYYY-MM-DD")
+
+@router.get("/{workflow_id}/status-analytics")
+def get_status_analytics(
+    workflow_id: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    sales_rep: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Time in status and funnel conversion for a workflow's statuses.
+    start/end: inclusive YYYY-MM-DD (UTC) bounds on when transitions happened.
+    """
+    workflow = board_workflow(workflow_id, db)
+    start, end = parse_day(start, "start"), parse_day(end, "end")
+    
+    # Roll up any transitions recorded since the last refresh (cheap when there are none)
+    refresh_status_stats(db)
+    
+    return {
+        "workflow_id": workflow.id,
+        "start": start,
+        "end": end,
+        "sales_rep": sales_rep,
+        "statuses": status_analytics(db, [s.name for s in workflow.statuses], start, end, sales_rep),
+    }
+
 @router.post("/workflows", response_model=WorkflowResponse)
-def create_workflow(workflow_data: WorkflowCreate, db: Session = Depends(get_db)):
+def create_workflow(workflow_data: WorkflowCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Create a new workflow with statuses"""
     now = int(datetime.now().timestamp())
     
@@ -103,7 +181,6 @@ def create_workflow(workflow_data: WorkflowCreate, db: Session = Depends(get_db)
     db.flush()  # Get workflow ID before adding statuses
     
     # Create statuses
-    statuses = []
     for status_data in workflow_data.statuses:
         status = WorkflowStatus(
             id=f"WS-{uuid.uuid4().hex[:8].upper()}",
@@ -114,11 +191,11 @@ def create_workflow(workflow_data: WorkflowCreate, db: Session = Depends(get_db)
             is_closed=1 if status_data.is_closed else 0
         )
         db.add(status)
-        statuses.append(status)
     
+    bump_version(db, WORKFLOWS)
+    background_tasks.add_task(active_job_sweeper.sweep)  # Closed statuses may have changed
     db.commit()
     db.refresh(workflow)
-    workflow.statuses = statuses
     
     return workflow
 
@@ -136,32 +213,30 @@ def update_workflow(workflow_id: str, workflow_data: WorkflowUpdate, db: Session
     if workflow_data.display_order is not None:
         workflow.display_order = workflow_data.display_order
     
+    bump_version(db, WORKFLOWS)
     db.commit()
     db.refresh(workflow)
     
-    workflow.statuses = db.query(WorkflowStatus).filter(
-        WorkflowStatus.workflow_id == workflow_id
-    ).order_by(WorkflowStatus.display_order.asc()).all()
-    
     return workflow
 
 @router.delete("/workflows/{workflow_id}")
-def delete_workflow(workflow_id: str, db: Session = Depends(get_db)):
+def delete_workflow(workflow_id: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Delete a workflow and its statuses"""
     workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
-    # Delete associated statuses
-    db.query(WorkflowStatus).filter(WorkflowStatus.workflow_id == workflow_id).delete()
+    # Statuses are deleted with it (delete-orphan cascade)
     db.delete(workflow)
+    bump_version(db, WORKFLOWS)
+    background_tasks.add_task(active_job_sweeper.sweep)  # Closed statuses may have changed
     db.commit()
     
     return {"status": "deleted", "workflow_id": workflow_id}
 
 # Status endpoints
 @router.post("/workflows/{workflow_id}/statuses", response_model=WorkflowStatusResponse)
-def create_status(workflow_id: str, status_data: WorkflowStatusCreate, db: Session = Depends(get_db)):
+def create_status(workflow_id: str, status_data: WorkflowStatusCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Add a new status to a workflow"""
     workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
     if not workflow:
@@ -177,13 +252,15 @@ def create_status(workflow_id: str, status_data: WorkflowStatusCreate, db: Sessi
     )
     
     db.add(status)
+    bump_version(db, WORKFLOWS)
+    background_tasks.add_task(active_job_sweeper.sweep)  # Closed statuses may have changed
     db.commit()
     db.refresh(status)
     
     return status
 
 @router.put("/statuses/{status_id}", response_model=WorkflowStatusResponse)
-def update_status(status_id: str, status_data: WorkflowStatusCreate, db: Session = Depends(get_db)):
+def update_status(status_id: str, status_data: WorkflowStatusCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Update a status"""
     status = db.query(WorkflowStatus).filter(WorkflowStatus.id == status_id).first()
     if not status:
@@ -194,19 +271,23 @@ def update_status(status_id: str, status_data: WorkflowStatusCreate, db: Session
     status.display_order = status_data.display_order
     status.is_closed = 1 if status_data.is_closed else 0
     
+    bump_version(db, WORKFLOWS)
+    background_tasks.add_task(active_job_sweeper.sweep)  # Closed statuses may have changed
     db.commit()
     db.refresh(status)
     
     return status
 
 @router.delete("/statuses/{status_id}")
-def delete_status(status_id: str, db: Session = Depends(get_db)):
+def delete_status(status_id: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """Delete a status"""
     status = db.query(WorkflowStatus).filter(WorkflowStatus.id == status_id).first()
     if not status:
         raise HTTPException(status_code=404, detail="Status not found")
     
     db.delete(status)
+    bump_version(db, WORKFLOWS)
+    background_tasks.add_task(active_job_sweeper.sweep)  # Closed statuses may have changed
     db.commit()
     
     return {"status": "deleted", "status_id": status_id}
@@ -0,0 +1,142 @@
+"""
+Active Job Classification
+
+"Active" (the dashboard's first tile) used to be computed per request with
+status IN/NOT IN lists and a 14-day signed-date window over the whole jobs
+table. It is now a maintained, indexed column:
+1. A job is active when its status isn't closed and either its status is in
+   the active list or its first estimate was signed within the window
+2. Closed statuses are CLOSED_JOB_STATUSES plus every WorkflowStatus marked
+   is_closed; active statuses come from ACTIVE_JOB_STATUSES
+3. The sync classifies each job it writes; jobs active only because of the
+   signing window get active_until, and a periodic sweep reclassifies
+   everything (expiring those and applying changed status settings)
+4. The sweep then refreshes timeline milestones, which follow the active set
+Reads filter is_active = 1 AND (active_until IS NULL OR active_until >= now),
+an index range scan on (is_active, date_updated).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from sqlalchemy.orm import Session
+from backend.app.config import settings
+from backend.app.database import SessionLocal
+from backend.app.models import Job, WorkflowStatus
+from backend.app.services.timeline import refresh_milestones
+import logging
+
+logger = logging.getLogger(__name__)
+
+IN_CHUNK = 900  # Stay under SQLite's bound-parameter limit
+
+
+def _names(value: str) -> frozenset:
+    return frozenset(name.strip() for name in value.split(",") if name.strip())
+
+
+@dataclass(frozen=True)
+class ActiveJobRules:
+    active_statuses: frozenset
+    closed_statuses: frozenset
+    window_seconds: int
+
+    def classify(self, status_name, signed_date, now: int):
+        """(is_active, active_until) for one job."""
+        # Jobs without a status never matched the old NOT IN filter either
+        if status_name is None or status_name in self.closed_statuses:
+            return 0, None
+        if status_name in self.active_statuses:
+            return 1, None
+        if signed_date and signed_date + self.window_seconds >= now:
+            return 1, signed_date + self.window_seconds
+        return 0, None
+
+
+def load_rules(db: Session) -> ActiveJobRules:
+    closed = db.query(WorkflowStatus.name).filter(WorkflowStatus.is_closed == 1).distinct()
+    return ActiveJobRules(
+        active_statuses=_names(settings.ACTIVE_JOB_STATUSES),
+        closed_statuses=_names(settings.CLOSED_JOB_STATUSES) | {row[0] for row in closed},
+        window_seconds=settings.ACTIVE_JOB_SIGNED_DAYS * 86400,
+    )
+
+
+def apply_active_flags(job: Job, rules: ActiveJobRules, now: int = None):
+    """Classify an ORM job in place (for sync writers that hold the row)."""
+    job.is_active, job.active_until = rules.classify(
+        job.status_name, job.first_estimate_signed_date, now or int(time.time())
+    )
+
+
+def refresh_active_flags(db: Session, jnids=None) -> int:
+    """
+    Reclassify all jobs (or only `jnids`), writing just the rows whose flags
+    changed. Commits; returns the number of rows updated.
+    """
+    now = int(time.time())
+    rules = load_rules(db)
+    columns = (Job.lecla_id, Job.status_name, Job.first_estimate_signed_date, Job.is_active, Job.active_until)
+
+    if jnids is None:
+        rows = db.query(*columns).all()
+    else:
+        jnids = list(jnids)
+        rows = []
+        for i in range(0, len(jnids), IN_CHUNK):
+            rows.extend(db.query(*columns).filter(Job.jnid.in_(jnids[i:i + IN_CHUNK])).all())
+
+    updates = []
+    for row in rows:
+        is_active, active_until = rules.classify(row.status_name, row.first_estimate_signed_date, now)
+        if row.is_active != is_active or row.active_until != active_until:
+            updates.append({"lecla_id": row.lecla_id, "is_active": is_active, "active_until": active_until})
+    if updates:
+        db.bulk_update_mappings(Job, updates)
+    db.commit()
+    return len(updates)
+
+
+class ActiveJobSweeper:
+    """Background thread that periodically runs refresh_active_flags()."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sweep(self) -> int:
+        db = SessionLocal()
+        try:
+            changed = refresh_active_flags(db)
+            refresh_milestones(db)
+        finally:
+            db.close()
+        if changed:
+            logger.info(f"Active job sweep updated {changed} jobs")
+        return changed
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Active job sweep failed: {e}")
+            self._stop.wait(settings.ACTIVE_JOB_SWEEP_SECONDS)
+
+    def start(self):
+        """Start the sweeper (idempotent); the first sweep runs immediately."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="active-job-sweep", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance
+active_job_sweeper = ActiveJobSweeper()
@@ -0,0 +1,254 @@
+"""
+AI Gateway
+
+Sits between the chat endpoints and the model so a burst of questions can't
+overwhelm Vertex AI or starve individual users:
+1. Bounded concurrency: at most N model calls in flight per worker
+2. Fair queueing: waiting requests are served round-robin across users
+3. Deadlines: requests give up (queued or generating) once their budget runs out
+4. Response cache: LRU + TTL, keyed by normalized prompt, role and context version
+5. Single-flight: identical questions arriving together share one model call
+"""
+
+import asyncio
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from backend.app.config import settings
+from backend.app.services.ai_models import get_chat_model
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayBusy(Exception):
+    """The user already has the maximum number of requests queued."""
+
+
+class GatewayTimeout(Exception):
+    """The request's deadline passed before the model finished."""
+
+
+def normalize_prompt(message: str) -> str:
+    """Canonical form of a question for cache lookups."""
+    text = re.sub(r"\s+", " ", message.strip().lower())
+    return text.rstrip("?!. ")
+
+
+class TTLCache:
+    """Small LRU cache whose entries also expire after ttl_seconds."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value):
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class AIGateway:
+    """Per-worker concurrency limiter, fair scheduler and cache for chat calls."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue_per_user: int,
+        deadline_seconds: float,
+        cache_size: int,
+        cache_ttl_seconds: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue_per_user = max_queue_per_user
+        self.deadline_seconds = deadline_seconds
+        self.cache = TTLCache(cache_size, cache_ttl_seconds)
+        self._active = 0
+        self._waiting = OrderedDict()  # user_id -> deque of futures, in round-robin order
+        self._inflight = {}  # cache key -> future shared by identical requests
+        self.timeouts = 0
+        self.rejected = 0
+
+    # --- Scheduling ---
+
+    async def _acquire(self, user_id: str, deadline: float):
+        if self._active < self.max_concurrency and not self._waiting:
+            self._active += 1
+            return
+
+        queue = self._waiting.setdefault(user_id, deque())
+        if len(queue) >= self.max_queue_per_user:
+            if not queue:
+                del self._waiting[user_id]
+            self.rejected += 1
+            raise GatewayBusy()
+
+        granted = asyncio.get_running_loop().create_future()
+        queue.append(granted)
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), timeout=max(deadline - time.monotonic(), 0))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if granted.done() and not granted.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                granted.cancel()
+                self._discard(user_id, granted)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+                raise GatewayTimeout() from None
+            raise
+
+    def _discard(self, user_id: str, granted):
+        queue = self._waiting.get(user_id)
+        if queue is None:
+            return
+        try:
+            queue.remove(granted)
+        except ValueError:
+            pass
+        if not queue:
+            del self._waiting[user_id]
+
+    def _release(self):
+        # Hand the slot straight to the next user in round-robin order
+        while self._waiting:
+            user_id, queue = next(iter(self._waiting.items()))
+            granted = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(user_id)
+            else:
+                del self._waiting[user_id]
+            if not granted.done():
+                granted.set_result(True)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, user_id: str, deadline: float):
+        """Hold one of the model slots for the duration of the block."""
+        await self._acquire(user_id, deadline)
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _deadline(self) -> float:
+        return time.monotonic() + self.deadline_seconds
+
+    # --- Public API ---
+
+    async def generate(self, user_id: str, cache_key, prompt: str) -> str:
+        """Return a (possibly cached) full response for the prompt."""
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        shared = self._inflight.get(cache_key)
+        if shared is not None:
+            return await asyncio.shield(shared)
+
+        deadline = self._deadline()
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = shared
+        try:
+            async with self.slot(user_id, deadline):
+                try:
+                    text = await asyncio.wait_for(
+                        get_chat_model().generate(prompt),
+                        timeout=max(deadline - time.monotonic(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    raise GatewayTimeout() from None
+            if text:
+                self.cache.set(cache_key, text)
+            shared.set_result(text)
+            return text
+        except Exception as e:
+            if not shared.done():
+                shared.set_exception(e)
+                shared.exception()  # Mark retrieved so an unshared failure isn't logged twice
+            raise
+        except asyncio.CancelledError:
+            shared.cancel()
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def stream(self, user_id: str, cache_key, prompt: str):
+        """Yield response chunks; cache hits are replayed as a single chunk."""
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        deadline = self._deadline()
+        parts = []
+        async with self.slot(user_id, deadline):
+            chunks = get_chat_model().stream(prompt).__aiter__()
+            try:
+                while True:
+                    try:
+                        text = await asyncio.wait_for(
+                            chunks.__anext__(),
+                            timeout=max(deadline - time.monotonic(), 0)
+                        )
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        self.timeouts += 1
+                        raise GatewayTimeout() from None
+                    parts.append(text)
+                    yield text
+            finally:
+                await chunks.aclose()
+
+        if parts:
+            self.cache.set(cache_key, "".join(parts))
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queued": sum(len(q) for q in self._waiting.values()),
+            "queued_users": len(self._waiting),
+            "inflight_keys": len(self._inflight),
+            "cache_entries": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+
+# Global instance
+ai_gateway = AIGateway(
+    max_concurrency=settings.AI_MAX_CONCURRENCY,
+    max_queue_per_user=settings.AI_MAX_QUEUE_PER_USER,
+    deadline_seconds=settings.AI_REQUEST_DEADLINE_SECONDS,
+    cache_size=settings.AI_CACHE_SIZE,
+    cache_ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,126 @@
+"""
+AI Chat Models
+
+Shared, reusable model clients for the AI co-pilot. Every backend exposes the
+same async interface so the router never blocks the event loop:
+- generate(prompt) -> full response text
+- stream(prompt) -> async iterator of text chunks
+
+VertexChatModel is used in production; FakeChatModel answers locally with no
+network access (set AI_MODEL_BACKEND=fake) for development and testing.
+The Vertex AI SDK takes seconds to import, so it is only loaded (and
+vertexai.init() run) when the first chat needs the model, on a worker thread
+so other requests keep being served meanwhile.
+"""
+
+import asyncio
+import threading
+from starlette.concurrency import run_in_threadpool
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def init_vertex():
+    """Import the Vertex AI SDK and point it at our project."""
+    import vertexai
+    try:
+        if settings.GCP_SERVICE_ACCOUNT_JSON.exists():
+            from google.oauth2 import service_account
+            creds = service_account.Credentials.from_service_account_file(str(settings.GCP_SERVICE_ACCOUNT_JSON))
+            vertexai.init(
+                project=settings.GCP_PROJECT_ID,
+                location=settings.GCP_LOCATION,
+                credentials=creds
+            )
+            logger.info(f"Vertex AI initialized with Service Account for project {settings.GCP_PROJECT_ID}")
+        else:
+            # Fallback to default auth (works in Cloud Run environments)
+            vertexai.init(project=settings.GCP_PROJECT_ID, location=settings.GCP_LOCATION)
+            logger.info(f"Vertex AI initialized with default auth for project {settings.GCP_PROJECT_ID}")
+    except Exception as e:
+        logger.error(f"Failed to initialize Vertex AI SDK: {e}")
+
+
+class VertexChatModel:
+    """Gemini on Vertex AI. The GenerativeModel is built once and reused."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load_model(self):
+        # Runs in the threadpool; concurrent first chats wait here, not on the event loop
+        with self._lock:
+            if self._model is None:
+                init_vertex()
+                from vertexai.generative_models import GenerativeModel
+                self._model = GenerativeModel(self.model_name)
+                logger.info(f"Vertex AI model {self.model_name} ready")
+        return self._model
+
+    async def _get_model(self):
+        if self._model is not None:
+            return self._model
+        return await run_in_threadpool(self._load_model)
+
+    async def generate(self, prompt: str) -> str:
+        model = await self._get_model()
+        response = await model.generate_content_async(prompt)
+        return response.text if response else ""
+
+    async def stream(self, prompt: str):
+        model = await self._get_model()
+        responses = await model.generate_content_async(prompt, stream=True)
+        async for chunk in responses:
+            try:
+                text = chunk.text
+            except ValueError:
+                # Chunks without text parts (e.g. safety/finish metadata)
+                continue
+            if text:
+                yield text
+
+
+class FakeChatModel:
+    """Deterministic local stand-in that echoes the user's message."""
+
+    model_name = "fake"
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def _answer(self, prompt: str) -> str:
+        message = prompt.rsplit("User Message:", 1)[-1].strip()
+        return f"[fake model] You asked: {message}"
+
+    async def generate(self, prompt: str) -> str:
+        await asyncio.sleep(self.delay)
+        return self._answer(prompt)
+
+    async def stream(self, prompt: str):
+        for word in self._answer(prompt).split(" "):
+            await asyncio.sleep(self.delay)
+            yield word + " "
+
+
+_chat_model = None
+
+
+def get_chat_model():
+    """Return the process-wide chat model, creating it on first use."""
+    global _chat_model
+    if _chat_model is None:
+        if settings.AI_MODEL_BACKEND == "fake":
+            _chat_model = FakeChatModel()
+        else:
+            _chat_model = VertexChatModel(settings.AI_MODEL_NAME)
+    return _chat_model
+
+
+def set_chat_model(model):
+    """Swap the chat model (e.g. a FakeChatModel in tests). Pass None to reset."""
+    global _chat_model
+    _chat_model = model
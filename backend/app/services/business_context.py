@@ -0,0 +1,195 @@
+"""
+Business Context Snapshot
+
+Precomputes the metrics the AI co-pilot gets as grounding and keeps them in
+memory, shared by every chat request in the worker:
+1. Headline totals (jobs, budgeted revenue)
+2. Per-rep and per-status breakdowns
+3. Open pipeline and recent activity
+
+The snapshot is rebuilt when a CRM sync finishes (signalled through a stamp
+file so it works across processes) or when it is older than the TTL.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from sqlalchemy import func, case
+from backend.app.config import settings
+from backend.app.database import SessionLocal
+from backend.app.models import Job, Budget, Task
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Statuses that no longer count towards the open pipeline
+PIPELINE_EXCLUDED_STATUSES = ['Paid & Closed', 'Job Completed', 'Cancelled', 'Lost', 'Void']
+RECENT_ACTIVITY_DAYS = 7
+
+
+def mark_sync_complete():
+    """Touch the sync stamp so every worker rebuilds its snapshot on next use."""
+    stamp = settings.SYNC_STAMP_FILE
+    stamp.touch()
+    logger.info("Sync stamp updated; business context snapshots will refresh")
+
+
+def _sync_stamp_mtime() -> float:
+    try:
+        return settings.SYNC_STAMP_FILE.stat().st_mtime
+    except FileNotFoundError:
+        return 0.0
+
+
+@dataclass(frozen=True)
+class ContextSnapshot:
+    """Immutable set of business metrics at a point in time."""
+    version: int = 0
+    built_at: float = 0.0
+    job_count: int = 0
+    total_revenue: float = 0.0
+    reps: list = field(default_factory=list)  # [{name, revenue, budgets}]
+    statuses: list = field(default_factory=list)  # [{status, jobs}]
+    pipeline_jobs: int = 0
+    pipeline_value: float = 0.0
+    recent_jobs_updated: int = 0
+    recent_budgets: int = 0
+    recent_budget_revenue: float = 0.0
+    open_tasks: int = 0
+    overdue_tasks: int = 0
+
+    def render(self, top_reps: int = 5, top_statuses: int = 8) -> str:
+        """Format the snapshot as a prompt block."""
+        reps_str = ", ".join(
+            f"{r['name']} (${r['revenue']:,.0f}, {r['budgets']} budgets)" for r in self.reps[:top_reps]
+        ) or "n/a"
+        status_str = ", ".join(
+            f"{s['status']}: {s['jobs']}" for s in self.statuses[:top_statuses]
+        ) or "n/a"
+
+        return f"""
+        BUSINESS CONTEXT:
+        - Active Jobs: {self.job_count}
+        - Total Budgeted Revenue: ${self.total_revenue:,.2f}
+        - Top Sales Reps: {reps_str}
+        - Jobs by Status: {status_str}
+        - Open Pipeline: {self.pipeline_jobs} jobs worth ${self.pipeline_value:,.2f}
+        - Last {RECENT_ACTIVITY_DAYS} Days: {self.recent_jobs_updated} jobs updated, {self.recent_budgets} budgets (${self.recent_budget_revenue:,.2f})
+        - Tasks: {self.open_tasks} open, {self.overdue_tasks} overdue
+        """
+
+
+class BusinessContextCache:
+    """Process-wide holder for the current ContextSnapshot."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot = None
+        self._stamp_seen = 0.0
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, snapshot) -> bool:
+        if snapshot is None:
+            return False
+        if time.time() - snapshot.built_at > self.ttl_seconds:
+            return False
+        return _sync_stamp_mtime() <= self._stamp_seen
+
+    def peek(self):
+        """Return the current snapshot if it is still fresh, else None (never hits the DB)."""
+        snapshot = self._snapshot
+        return snapshot if self._is_fresh(snapshot) else None
+
+    def get(self) -> ContextSnapshot:
+        """Return a fresh snapshot, rebuilding it (once, under a lock) if stale."""
+        snapshot = self.peek()
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have rebuilt it while we waited
+            snapshot = self.peek()
+            if snapshot is not None:
+                return snapshot
+            try:
+                return self.refresh()
+            except Exception as e:
+                logger.error(f"Error building business context snapshot: {e}")
+                # Serve the stale snapshot rather than nothing
+                return self._snapshot or ContextSnapshot()
+
+    def invalidate(self):
+        """Drop the snapshot so the next get() rebuilds it."""
+        self._snapshot = None
+
+    def refresh(self) -> ContextSnapshot:
+        """Run the aggregate queries and swap in a new snapshot."""
+        stamp = _sync_stamp_mtime()
+        now = int(time.time())
+        recent_cutoff = now - RECENT_ACTIVITY_DAYS * 24 * 60 * 60
+
+        db = SessionLocal()
+        try:
+            job_count = db.query(func.count(Job.lecla_id)).scalar() or 0
+            total_revenue = db.query(func.sum(Budget.revenue)).scalar() or 0
+
+            rep_rows = db.query(
+                Budget.sales_rep,
+                func.sum(Budget.revenue).label('rev'),
+                func.count(Budget.jnid).label('budgets')
+            ).group_by(Budget.sales_rep).order_by(func.sum(Budget.revenue).desc()).all()
+
+            status_rows = db.query(
+                Job.status_name,
+                func.count(Job.lecla_id).label('jobs')
+            ).group_by(Job.status_name).order_by(func.count(Job.lecla_id).desc()).all()
+
+            pipeline_jobs, pipeline_value = db.query(
+                func.count(Job.lecla_id),
+                func.sum(Job.total)
+            ).filter(Job.status_name.notin_(PIPELINE_EXCLUDED_STATUSES)).one()
+
+            recent_jobs_updated = db.query(func.count(Job.lecla_id)).filter(
+                Job.date_updated >= recent_cutoff
+            ).scalar() or 0
+
+            recent_budgets, recent_budget_revenue = db.query(
+                func.count(Budget.jnid),
+                func.sum(Budget.revenue)
+            ).filter(Budget.date_updated >= recent_cutoff).one()
+
+            open_tasks, overdue_tasks = db.query(
+                func.count(Task.lecla_id),
+                func.sum(case((Task.due_date < now, 1), else_=0))
+            ).filter(Task.status.in_(['pending', 'in_progress'])).one()
+        finally:
+            db.close()
+
+        self._version += 1
+        snapshot = ContextSnapshot(
+            version=self._version,
+            built_at=time.time(),
+            job_count=job_count,
+            total_revenue=float(total_revenue),
+            reps=[
+                {"name": r.sales_rep or "Unknown", "revenue": float(r.rev or 0), "budgets": r.budgets}
+                for r in rep_rows
+            ],
+            statuses=[{"status": s.status_name or "Unknown", "jobs": s.jobs} for s in status_rows],
+            pipeline_jobs=pipeline_jobs or 0,
+            pipeline_value=float(pipeline_value or 0),
+            recent_jobs_updated=recent_jobs_updated,
+            recent_budgets=recent_budgets or 0,
+            recent_budget_revenue=float(recent_budget_revenue or 0),
+            open_tasks=open_tasks or 0,
+            overdue_tasks=int(overdue_tasks or 0),
+        )
+        self._snapshot = snapshot
+        self._stamp_seen = stamp
+        logger.info(f"Business context snapshot v{snapshot.version} built ({job_count} jobs)")
+        return snapshot
+
+
+# Global instance
+business_context = BusinessContextCache(settings.AI_CONTEXT_TTL_SECONDS)
@@ -0,0 +1,166 @@
+"""
+Google Calendar Event Store
+
+Mirrors a Google Calendar into the calendar_events table so schedule views read
+local data instead of calling Google on every page load:
+1. The first sync pulls every event and stores the nextSyncToken
+2. Later syncs send the syncToken and receive only events changed since then
+   (cancelled events come back with status "cancelled" and are deleted)
+3. A 410 Gone response means the token expired; the calendar is re-synced in full
+4. Reads are time-window queries against the (calendar_id, start_ts, end_ts) index
+
+The Calendar service is passed in, so a fake API can be used for testing.
+"""
+
+import threading
+import time
+from datetime import datetime
+from sqlalchemy.orm import Session
+from backend.app.models import CalendarEvent, CalendarSyncState
+import logging
+
+logger = logging.getLogger(__name__)
+
+SYNC_INTERVAL_SECONDS = 60  # Minimum gap between incremental syncs
+PAGE_SIZE = 2500  # Calendar API maximum
+
+
+def _to_timestamp(value: dict):
+    """Google start/end object -> (unix timestamp, is_all_day)."""
+    if not value:
+        return None, False
+    if value.get("dateTime"):
+        return int(datetime.fromisoformat(value["dateTime"]).timestamp()), False
+    if value.get("date"):
+        # All-day events carry a bare date; treat it as local midnight
+        return int(datetime.fromisoformat(value["date"]).timestamp()), True
+    return None, False
+
+
+def _is_gone(error: Exception) -> bool:
+    resp = getattr(error, "resp", None)
+    return getattr(resp, "status", None) == 410
+
+
+class CalendarStore:
+    """Incremental syncToken mirror of Google calendars in SQL."""
+
+    def __init__(self, sync_interval: float = SYNC_INTERVAL_SECONDS):
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._last_attempt = {}  # calendar_id -> time.time() of last sync
+
+    # --- Sync ---
+
+    def needs_sync(self, calendar_id: str = "primary") -> bool:
+        return time.time() - self._last_attempt.get(calendar_id, 0) >= self.sync_interval
+
+    def has_synced(self, db: Session, calendar_id: str = "primary") -> bool:
+        state = db.get(CalendarSyncState, calendar_id)
+        return state is not None and state.sync_token is not None
+
+    def _apply(self, db: Session, calendar_id: str, items) -> int:
+        # The session doesn't autoflush, so db.get() can't see rows added earlier in this
+        # page; keep only the last copy of each event id (_pull flushes between pages)
+        latest = {}
+        for item in items:
+            latest[item["id"]] = item
+        changed = 0
+        for item in latest.values():
+            event = db.get(CalendarEvent, item["id"])
+            if item.get("status") == "cancelled":
+                if event is not None:
+                    db.delete(event)
+                    changed += 1
+                continue
+
+            start_ts, all_day = _to_timestamp(item.get("start"))
+            end_ts, _ = _to_timestamp(item.get("end"))
+            if event is None:
+                event = CalendarEvent(id=item["id"], calendar_id=calendar_id)
+                db.add(event)
+            event.summary = item.get("summary")
+            event.location = item.get("location")
+            event.status = item.get("status")
+            event.start_ts = start_ts
+            event.end_ts = end_ts if end_ts is not None else start_ts
+            event.all_day = 1 if all_day else 0
+            event.updated = item.get("updated")
+            event.data = item
+            changed += 1
+        return changed
+
+    def _pull(self, service, db: Session, calendar_id: str, sync_token: str = None):
+        """Page through events.list; returns (changed count, nextSyncToken)."""
+        changed = 0
+        page_token = None
+        while True:
+            params = {
+                "calendarId": calendar_id,
+                "singleEvents": True,
+                "maxResults": PAGE_SIZE,
+                "pageToken": page_token,
+            }
+            if sync_token:
+                params["syncToken"] = sync_token
+                params["showDeleted"] = True
+            response = service.events().list(**params).execute()
+            changed += self._apply(db, calendar_id, response.get("items", []))
+            db.flush()
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return changed, response.get("nextSyncToken")
+
+    def sync(self, service, db: Session, calendar_id: str = "primary") -> int:
+        """Bring the local copy up to date; returns the number of events changed."""
+        with self._lock:
+            self._last_attempt[calendar_id] = time.time()
+            started = time.perf_counter()
+            state = db.get(CalendarSyncState, calendar_id)
+            if state is None:
+                state = CalendarSyncState(calendar_id=calendar_id)
+                db.add(state)
+
+            try:
+                try:
+                    changed, next_token = self._pull(service, db, calendar_id, state.sync_token)
+                    full = state.sync_token is None
+                except Exception as e:
+                    if not (state.sync_token and _is_gone(e)):
+                        raise
+                    logger.warning(f"Calendar sync token for {calendar_id} expired, running full sync")
+                    db.rollback()
+                    db.query(CalendarEvent).filter(CalendarEvent.calendar_id == calendar_id).delete()
+                    state = db.get(CalendarSyncState, calendar_id) or CalendarSyncState(calendar_id=calendar_id)
+                    db.add(state)
+                    changed, next_token = self._pull(service, db, calendar_id)
+                    full = True
+
+                state.sync_token = next_token
+                state.last_synced_at = int(time.time())
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            logger.info(f"Calendar {calendar_id}: {'full' if full else 'incremental'} sync, {changed} events changed in {time.perf_counter() - started:.2f}s")
+            return changed
+
+    # --- Queries ---
+
+    def events_between(self, db: Session, start_ts: int, end_ts: int = None, calendar_id: str = "primary", limit: int = None):
+        """Events overlapping [start_ts, end_ts), ordered by start time."""
+        query = db.query(CalendarEvent.data).filter(
+            CalendarEvent.calendar_id == calendar_id,
+            CalendarEvent.end_ts > start_ts
+        )
+        if end_ts is not None:
+            query = query.filter(CalendarEvent.start_ts < end_ts)
+        query = query.order_by(CalendarEvent.start_ts)
+        if limit:
+            query = query.limit(limit)
+        return [row.data for row in query]
+
+
+# Global instance
+calendar_store = CalendarStore()
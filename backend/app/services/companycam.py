@@ -12,33 +12,55 @@ class CompanyCamClient:
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json"
         }
+        self._client = None
 
-    async def get_projects(self, per_page: int = 50):
-        url = f"{self.base_url}/projects?per_page={per_page}"
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.get(url, headers=self.headers, timeout=30.0)
-                if resp.status_code == 200:
-                    return resp.json()
-                else:
-                    logger.error(f"CC Error {resp.status_code}: {resp.text}")
-                    return []
-            except Exception as e:
-                logger.error(f"CC Exception (Projects): {e}")
-                return []
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared connection pool, created on first use inside the running event loop."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_projects(self, per_page: int = 50, page: int = 1, modified_since: int = None):
+        """One page of projects; [] past the last page, None if the request failed."""
+        params = {"per_page": per_page, "page": page}
+        if modified_since:
+            params["modified_since"] = modified_since
+        try:
+            resp = await self.client.get(f"{self.base_url}/projects", params=params, headers=self.headers)
+            if resp.status_code == 200:
+                return resp.json()
+            else:
+                logger.error(f"CC Error {resp.status_code}: {resp.text}")
+                return None
+        except Exception as e:
+            logger.error(f"CC Exception (Projects): {e}")
+            return None
 
     async def get_project_photos(self, project_id: str, per_page: int = 10):
-        url = f"{self.base_url}/projects/{project_id}/photos?per_page={per_page}"
-        async with httpx.AsyncClient() as client:
-            try:
-                resp = await client.get(url, headers=self.headers, timeout=30.0)
-                if resp.status_code == 200:
-                    return resp.json()
-                else:
-                    logger.error(f"CC Error {resp.status_code}: {resp.text}")
-                    return []
-            except Exception as e:
-                logger.error(f"CC Exception (Photos): {e}")
+        try:
+            resp = await self.client.get(f"{self.base_url}/projects/{project_id}/photos", params={"per_page": per_page}, headers=self.headers)
+            if resp.status_code == 200:
+                return resp.json()
+            else:
+                logger.error(f"CC Error {resp.status_code}: {resp.text}")
                 return []
+        except Exception as e:
+            logger.error(f"CC Exception (Photos): {e}")
+            return []
+
+    async def download(self, url: str) -> bytes:
+        """Fetch image bytes from CompanyCam's CDN (no API token sent)."""
+        resp = await self.client.get(url, follow_redirects=True)
+        resp.raise_for_status()
+        return resp.content
 
 cc_client = CompanyCamClient()
@@ -0,0 +1,206 @@
+"""
+CompanyCam Mirror
+
+Keeps CompanyCam projects and photo metadata in local tables so the Photos page
+and the map render from SQLite instead of calling CompanyCam on every view:
+1. Projects are paged in with modified_since = the watermark in
+   companycam_sync_state, which only moves once a pass has read every page, so
+   an interrupted first sync can't hide older projects
+2. Photos are re-pulled only for projects whose updated_at moved since their
+   last photo sync, a bounded number of projects per run, concurrently
+3. Reads are plain indexed queries; callers trigger a background re-sync once
+   the mirror is older than COMPANY_CAM_SYNC_SECONDS
+"""
+
+import asyncio
+import time
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.app.config import settings
+from backend.app.models import CompanyCamProject, CompanyCamPhoto, CompanyCamSyncState
+from backend.app.services.companycam import cc_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROJECT_PAGE_SIZE = 100
+MAX_PROJECT_PAGES = 200
+PHOTO_PROJECTS_PER_SYNC = 100  # Remaining projects are picked up by the next run
+PHOTO_FETCH_CONCURRENCY = 5
+
+
+def _coordinates(project: dict):
+    coords = project.get("coordinates") or {}
+    lat = coords.get("lat", coords.get("latitude"))
+    lng = coords.get("lon", coords.get("lng", coords.get("longitude")))
+    try:
+        return float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None, None
+
+
+def _photo_urls(photo: dict):
+    """(thumbnail URL, web URL) from a CompanyCam photo payload."""
+    uris = {u.get("type"): u.get("uri") or u.get("url") for u in photo.get("uris") or []}
+    thumbnails = photo.get("thumbnails") or {}
+    web = uris.get("web") or uris.get("original") or photo.get("uri")
+    thumb = uris.get("thumbnail") or thumbnails.get("medium") or web
+    return thumb, web
+
+
+def thumbnail_path(photo_id: str) -> str:
+    return f"/api/photos/{photo_id}/thumbnail"
+
+
+class CompanyCamMirror:
+    """Incremental sync of CompanyCam into companycam_projects/companycam_photos."""
+
+    def __init__(self):
+        self._lock = None
+        self.synced_at = 0.0
+        self.last_result = None
+
+    def _sync_lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def is_syncing(self) -> bool:
+        return self._lock is not None and self._lock.locked()
+
+    def is_stale(self) -> bool:
+        return time.time() - self.synced_at > settings.COMPANY_CAM_SYNC_SECONDS
+
+    def has_data(self, db: Session) -> bool:
+        return db.query(CompanyCamProject.id).first() is not None
+
+    # --- Sync ---
+
+    def _upsert_project(self, db: Session, project: dict):
+        row = db.get(CompanyCamProject, str(project["id"]))
+        if row is None:
+            row = CompanyCamProject(id=str(project["id"]))
+            db.add(row)
+        address = project.get("address") or {}
+        row.name = project.get("name")
+        row.city = address.get("city")
+        row.state = address.get("state")
+        row.latitude, row.longitude = _coordinates(project)
+        row.photo_count = project.get("photo_count")
+        row.updated_at = project.get("updated_at")
+        row.data = project
+
+    def upsert_photos(self, db: Session, project_id: str, photos):
+        for photo in photos:
+            row = db.get(CompanyCamPhoto, str(photo["id"]))
+            if row is None:
+                row = CompanyCamPhoto(id=str(photo["id"]))
+                db.add(row)
+            row.project_id = project_id
+            row.captured_at = photo.get("captured_at") or photo.get("created_at")
+            row.thumbnail_url, row.web_url = _photo_urls(photo)
+            row.data = photo
+
+    async def _pull_projects(self, db: Session) -> int:
+        state = db.get(CompanyCamSyncState, 1)
+        if state is None:
+            state = CompanyCamSyncState(id=1)
+            db.add(state)
+        watermark = state.projects_modified_since
+        newest = watermark
+        pulled = 0
+        complete = False
+        for page in range(1, MAX_PROJECT_PAGES + 1):
+            projects = await cc_client.get_projects(per_page=PROJECT_PAGE_SIZE, page=page, modified_since=watermark)
+            if not isinstance(projects, list):
+                break  # Request failed; the next run repeats this pass
+            for project in projects:
+                self._upsert_project(db, project)
+                updated_at = project.get("updated_at")
+                if isinstance(updated_at, (int, float)) and (newest is None or updated_at > newest):
+                    newest = int(updated_at)
+            db.commit()
+            pulled += len(projects)
+            if len(projects) < PROJECT_PAGE_SIZE:
+                complete = True
+                break
+
+        if complete:
+            state.projects_modified_since = newest
+            state.synced_at = int(time.time())
+            db.commit()
+        else:
+            logger.warning(f"CompanyCam project pass incomplete after {pulled} projects; watermark kept at {watermark}")
+        return pulled
+
+    async def _pull_photos(self, db: Session) -> int:
+        # Projects without updated_at are recorded as 0 so they aren't re-pulled on every sync
+        pending = db.query(CompanyCamProject).filter(
+            (CompanyCamProject.photos_synced_at.is_(None)) |
+            (CompanyCamProject.photos_synced_at != func.coalesce(CompanyCamProject.updated_at, 0))
+        ).order_by(CompanyCamProject.updated_at.desc()).limit(PHOTO_PROJECTS_PER_SYNC).all()
+        if not pending:
+            return 0
+
+        sem = asyncio.Semaphore(PHOTO_FETCH_CONCURRENCY)
+
+        async def fetch(project):
+            async with sem:
+                return await cc_client.get_project_photos(project.id, per_page=settings.COMPANY_CAM_PHOTOS_PER_PROJECT)
+
+        results = await asyncio.gather(*(fetch(p) for p in pending))
+        pulled = 0
+        for project, photos in zip(pending, results):
+            if not isinstance(photos, list):
+                continue
+            self.upsert_photos(db, project.id, photos)
+            project.photos_synced_at = project.updated_at or 0
+            pulled += len(photos)
+        db.commit()
+        return pulled
+
+    async def sync(self, db: Session) -> dict:
+        """Pull changed projects and their photos; concurrent callers share one run."""
+        lock = self._sync_lock()
+        if lock.locked():
+            async with lock:
+                return self.last_result
+        async with lock:
+            started = time.perf_counter()
+            try:
+                projects = await self._pull_projects(db)
+                photos = await self._pull_photos(db)
+            except Exception:
+                db.rollback()
+                raise
+            self.synced_at = time.time()
+            self.last_result = {"projects": projects, "photos": photos, "seconds": round(time.perf_counter() - started, 2)}
+            logger.info(f"CompanyCam sync: {projects} projects, {photos} photos in {self.last_result['seconds']}s")
+            return self.last_result
+
+    # --- Queries ---
+
+    def list_projects(self, db: Session, limit: int = 25):
+        rows = db.query(CompanyCamProject.data).order_by(
+            CompanyCamProject.updated_at.desc()
+        ).limit(limit)
+        return [row.data for row in rows]
+
+    def project_photos(self, db: Session, project_id: str, limit: int = 20):
+        rows = db.query(CompanyCamPhoto.id, CompanyCamPhoto.data).filter(
+            CompanyCamPhoto.project_id == project_id
+        ).order_by(CompanyCamPhoto.captured_at.desc()).limit(limit)
+        return [dict(row.data, thumbnail_path=thumbnail_path(row.id)) for row in rows]
+
+    def photo_source(self, db: Session, photo_id: str):
+        """Upstream image URL for the thumbnail of a mirrored photo."""
+        row = db.query(CompanyCamPhoto.thumbnail_url, CompanyCamPhoto.web_url).filter(
+            CompanyCamPhoto.id == photo_id
+        ).first()
+        if row is None:
+            return None
+        return row.thumbnail_url or row.web_url
+
+
+# Global instance
+companycam_mirror = CompanyCamMirror()
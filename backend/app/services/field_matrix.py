@@ -0,0 +1,142 @@
+"""
+Bulk Custom Field Values
+
+Builds an entity x field matrix of custom field values for list, kanban and
+report views in a fixed number of queries, regardless of how many rows:
+1. Entity IDs come from the request or from one filtered query on the entity table
+2. All stored values for those entities and fields are read in one query and
+   pivoted with pandas
+3. Calculated fields are evaluated column-wise with the compiled formulas'
+   NumPy mode, in dependency order, so chained formulas work across all rows
+"""
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+from backend.app.models import FieldValue
+from backend.app.services.formulas import FieldGraph, ENTITY_MODELS, numeric_columns
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTITIES = 2000
+IN_CHUNK = 900  # Stay under SQLite's bound-parameter limit
+
+
+def resolve_entity_ids(db: Session, entity_type: str, filters: dict, limit: int) -> list:
+    """IDs of entities matching simple column == value filters."""
+    entry = ENTITY_MODELS.get(entity_type)
+    if entry is None:
+        raise ValueError(f"Filtering is not supported for entity type '{entity_type}'")
+    model, key_col = entry
+    query = db.query(key_col)
+    for column, value in (filters or {}).items():
+        if column not in model.__table__.columns:
+            raise ValueError(f"Unknown filter column '{column}'")
+        query = query.filter(getattr(model, column) == value)
+    return [row[0] for row in query.limit(min(limit, MAX_ENTITIES))]
+
+
+def _numeric(series: pd.Series) -> np.ndarray:
+    cleaned = series.astype("string").str.replace(r"[$,]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _entity_columns(db: Session, entity_type: str, entity_ids: list, names) -> dict:
+    """Numeric entity columns referenced by formulas, aligned to entity_ids."""
+    entry = ENTITY_MODELS.get(entity_type)
+    if entry is None:
+        return {}
+    model, key_col = entry
+    columns = [c for c in numeric_columns(model) if c in names]
+    if not columns:
+        return {}
+    rows = []
+    for i in range(0, len(entity_ids), IN_CHUNK):
+        rows.extend(db.query(key_col, *(getattr(model, c) for c in columns)).filter(
+            key_col.in_(entity_ids[i:i + IN_CHUNK])
+        ).all())
+    frame = pd.DataFrame(rows, columns=["entity_id"] + columns).drop_duplicates("entity_id").set_index("entity_id")
+    frame = frame.reindex(entity_ids)
+    return {c: frame[c].to_numpy(dtype=np.float64, na_value=np.nan) for c in columns}
+
+
+def build_value_matrix(db: Session, graph: FieldGraph, entity_type: str, entity_ids: list, field_ids=None) -> dict:
+    """{"fields": [...], "entity_ids": [...], "values": [[value per field] per entity]}."""
+    entity_ids = list(dict.fromkeys(entity_ids))[:MAX_ENTITIES]
+    selected = [f for f in graph.fields.values() if field_ids is None or f.id in field_ids]
+    selected.sort(key=lambda f: (f.display_order or 0, f.field_name))
+
+    # Calculated fields also need the stored fields they (transitively) read
+    needed_calcs = set(f.id for f in selected if f.id in graph.formulas)
+    stack = list(needed_calcs)
+    needed_stored = set(f.id for f in selected if f.id not in graph.formulas)
+    while stack:
+        for source in graph.inputs.get(stack.pop(), ()):
+            if source in graph.formulas and source not in needed_calcs:
+                needed_calcs.add(source)
+                stack.append(source)
+            elif source not in graph.formulas:
+                needed_stored.add(source)
+    for fid in needed_calcs:
+        for name in graph.formulas[fid].names:
+            if name in graph.by_key and graph.by_key[name] not in graph.formulas:
+                needed_stored.add(graph.by_key[name])
+
+    rows = []
+    if entity_ids and needed_stored:
+        stored_ids = list(needed_stored)
+        for i in range(0, len(entity_ids), IN_CHUNK):
+            rows.extend(db.query(FieldValue.entity_id, FieldValue.custom_field_id, FieldValue.value).filter(
+                FieldValue.entity_type == entity_type,
+                FieldValue.entity_id.in_(entity_ids[i:i + IN_CHUNK]),
+                FieldValue.custom_field_id.in_(stored_ids)
+            ).all())
+
+    values = pd.DataFrame(rows, columns=["entity_id", "custom_field_id", "value"], dtype=object)
+    matrix = values.drop_duplicates(["entity_id", "custom_field_id"], keep="last").pivot(
+        index="entity_id", columns="custom_field_id", values="value"
+    ).reindex(index=entity_ids, columns=sorted(needed_stored))
+
+    calculated = {}
+    order = [fid for fid in graph.order if fid in needed_calcs]
+    if order and entity_ids:
+        size = len(entity_ids)
+        names = set().union(*(graph.formulas[fid].names for fid in order))
+        columns = _entity_columns(db, entity_type, entity_ids, names - set(graph.by_key))
+        for key, fid in graph.by_key.items():
+            if fid in matrix.columns:
+                columns[key] = _numeric(matrix[fid])
+        for fid in order:
+            try:
+                result = graph.formulas[fid].evaluate_many(columns, size)
+            except (ArithmeticError, ValueError, TypeError) as e:
+                # Same as a failed scalar evaluation: the field is empty, the rest still render
+                logger.warning(f"Formula for field {fid} failed: {e}")
+                result = np.full(size, np.nan)
+            calculated[fid] = result
+            field = graph.fields[fid]
+            columns[fid] = result
+            if field.jn_field_key:
+                columns[field.jn_field_key] = result
+
+    out_columns = []
+    for f in selected:
+        if f.id in calculated:
+            column = calculated[f.id].astype(object)
+            column[pd.isna(calculated[f.id])] = None
+            out_columns.append(column)
+        elif f.id in matrix.columns:
+            out_columns.append(matrix[f.id].astype(object).where(matrix[f.id].notna(), None).to_numpy())
+        else:
+            out_columns.append(np.full(len(entity_ids), None, dtype=object))
+
+    value_rows = np.column_stack(out_columns).tolist() if out_columns and entity_ids else [[] for _ in entity_ids]
+    return {
+        "fields": [
+            {"field_id": f.id, "field_name": f.field_name, "field_type": f.field_type, "is_calculated": bool(f.is_calculated)}
+            for f in selected
+        ],
+        "entity_ids": entity_ids,
+        "values": value_rows,
+    }
@@ -0,0 +1,344 @@
+"""
+Custom Field Formula Engine
+
+Evaluates calculated custom fields (e.g. "total - permit_fee - financing_fee"):
+1. calculation_formula is parsed once into a whitelisted AST (numbers, names,
+   arithmetic, comparisons and a few functions) and compiled; compiled formulas
+   are cached by field id + date_updated, so edits take effect immediately
+2. Names resolve to other custom fields of the same entity (by jn_field_key or
+   field id) or to numeric columns of the entity itself (e.g. invoice.total)
+3. Fields form a dependency DAG (depends_on_fields plus the fields a formula
+   references); recalculation walks only the downstream fields, in topological
+   order, and cycles are rejected when a field is saved
+4. The same compiled formula runs on scalars (one entity) or NumPy arrays
+   (many entities at once)
+"""
+
+import ast
+import json
+import math
+import threading
+from collections import deque, OrderedDict
+from functools import reduce
+import numpy as np
+from backend.app.models import Job, Invoice, Estimate, Budget, Contact
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class FormulaError(ValueError):
+    """A formula is invalid or the field graph has a cycle."""
+
+
+# entity_type -> (model, column matched against FieldValue.entity_id)
+ENTITY_MODELS = {
+    "job": (Job, Job.jnid),
+    "invoice": (Invoice, Invoice.jnid),
+    "estimate": (Estimate, Estimate.jnid),
+    "budget": (Budget, Budget.jnid),
+    "contact": (Contact, Contact.lecla_id),
+}
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+
+# x ** n needs a literal n no bigger than this (and literals evaluate as floats),
+# so a formula like "9 ** 9 ** 9" can't pin a worker
+MAX_EXPONENT = 10
+
+COMPILED_CACHE_SIZE = 1024
+
+
+def _if(condition, then, otherwise):
+    return then if condition else otherwise
+
+
+def _safe_div(a, b):
+    return a / b if b else 0.0
+
+
+SCALAR_FUNCTIONS = {"min": min, "max": max, "abs": abs, "round": round, "if_": _if, "div": _safe_div}
+
+# function -> (min args, max args); checked at compile time so both modes see the same calls
+FUNCTION_ARITY = {"min": (2, None), "max": (2, None), "abs": (1, 1), "round": (1, 2), "if_": (3, 3), "div": (2, 2)}
+
+
+def _vector_div(a, b):
+    a, b = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64))
+    out = np.zeros_like(a)
+    np.divide(a, b, out=out, where=b != 0)
+    return out
+
+
+def _vector_min(*args):
+    return reduce(np.minimum, args)
+
+
+def _vector_max(*args):
+    return reduce(np.maximum, args)
+
+
+VECTOR_FUNCTIONS = {
+    "min": _vector_min, "max": _vector_max, "abs": np.abs, "round": np.round,
+    "if_": np.where, "div": _vector_div,
+}
+
+
+def _literal_number(node):
+    """Value of a numeric literal (optionally signed), else None."""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _literal_number(node.operand)
+        return None if value is None else (-value if isinstance(node.op, ast.USub) else value)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    return None
+
+
+class _Normalize(ast.NodeTransformer):
+    """
+    Rewrites a validated tree so scalar and vector evaluation agree:
+    numeric literals become floats (no unbounded int arithmetic), and
+    a < b < c becomes (a < b) & (b < c), which works on arrays too.
+    """
+
+    def visit_Constant(self, node):
+        return ast.copy_location(ast.Constant(value=float(node.value)), node)
+
+    def visit_Call(self, node):
+        if node.func.id == "round" and len(node.args) == 2:
+            node.args[0] = self.visit(node.args[0])  # Digits stay an int
+            return node
+        self.generic_visit(node)
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        operands = [node.left] + node.comparators
+        pairs = [
+            ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+            for i, op in enumerate(node.ops)
+        ]
+        return reduce(lambda left, right: ast.BinOp(left=left, op=ast.BitAnd(), right=right), pairs)
+
+
+class CompiledFormula:
+    """A validated, compiled calculation_formula and the names it reads."""
+
+    def __init__(self, source: str):
+        self.source = source
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise FormulaError(f"Invalid formula '{source}': {e.msg}")
+
+        names = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise FormulaError(f"'{type(node).__name__}' is not allowed in formulas")
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+                raise FormulaError("Only numeric constants are allowed in formulas")
+            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+                exponent = _literal_number(node.right)
+                if exponent is None or abs(exponent) > MAX_EXPONENT:
+                    raise FormulaError(f"Exponents must be numbers between -{MAX_EXPONENT} and {MAX_EXPONENT}")
+            if isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in SCALAR_FUNCTIONS or node.keywords:
+                    raise FormulaError(f"Unknown function in formula; allowed: {', '.join(SCALAR_FUNCTIONS)}")
+                low, high = FUNCTION_ARITY[node.func.id]
+                if len(node.args) < low or (high is not None and len(node.args) > high):
+                    raise FormulaError(f"Wrong number of arguments to {node.func.id}()")
+                if node.func.id == "round" and len(node.args) == 2 and not isinstance(_literal_number(node.args[1]), int):
+                    raise FormulaError("round() digits must be a whole number")
+            elif isinstance(node, ast.Name) and node.id not in SCALAR_FUNCTIONS:
+                names.add(node.id)
+
+        self.names = frozenset(names)
+        tree = ast.fix_missing_locations(_Normalize().visit(tree))
+        self._code = compile(tree, f"<formula {source!r}>", "eval")
+
+    def evaluate(self, values: dict):
+        """Scalar evaluation; missing or non-numeric inputs count as 0."""
+        scope = dict(SCALAR_FUNCTIONS)
+        for name in self.names:
+            scope[name] = to_number(values.get(name))
+        try:
+            result = eval(self._code, {"__builtins__": {}}, scope)
+        except (ArithmeticError, ValueError, TypeError) as e:
+            logger.warning(f"Formula '{self.source}' failed: {e}")
+            return None
+        result = float(result)
+        return result if math.isfinite(result) else None
+
+    def evaluate_many(self, columns: dict, size: int):
+        """Vectorized evaluation over float arrays (NaN inputs count as 0)."""
+        scope = dict(VECTOR_FUNCTIONS)
+        for name in self.names:
+            column = columns.get(name)
+            scope[name] = np.zeros(size) if column is None else np.nan_to_num(column, nan=0.0)
+        with np.errstate(all="ignore"):
+            result = np.asarray(eval(self._code, {"__builtins__": {}}, scope), dtype=np.float64)
+        result = np.broadcast_to(result, (size,)).copy()
+        result[~np.isfinite(result)] = np.nan
+        return result
+
+
+def to_number(value) -> float:
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace("$", "").replace(",", ""))
+    except ValueError:
+        return 0.0
+
+
+def depends_on(field) -> list:
+    """depends_on_fields, tolerating both JSON lists and JSON-encoded strings."""
+    raw = field.depends_on_fields
+    if not raw:
+        return []
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return []
+    return list(raw) if isinstance(raw, list) else []
+
+
+_compiled_cache = OrderedDict()  # (field id, date_updated) -> CompiledFormula, least recently used first
+_compiled_cache_lock = threading.Lock()  # Sync routes call in from threadpool workers
+
+
+def compiled_formula(field) -> CompiledFormula:
+    key = (field.id, field.date_updated)
+    with _compiled_cache_lock:
+        formula = _compiled_cache.get(key)
+        if formula is not None:
+            _compiled_cache.move_to_end(key)
+            return formula
+    # Compiled outside the lock; two threads may both compile a new formula, which is harmless
+    formula = CompiledFormula(field.calculation_formula)
+    with _compiled_cache_lock:
+        _compiled_cache[key] = formula
+        while len(_compiled_cache) > COMPILED_CACHE_SIZE:
+            _compiled_cache.popitem(last=False)
+    return formula
+
+
+class FieldGraph:
+    """Calculated fields of one entity type, with their dependency DAG."""
+
+    def __init__(self, fields):
+        self.fields = {f.id: f for f in fields}
+        self.by_key = {}
+        for f in fields:
+            self.by_key[f.id] = f.id
+            if f.jn_field_key:
+                self.by_key.setdefault(f.jn_field_key, f.id)
+
+        self.formulas = {}
+        self.inputs = {}  # calculated field id -> field ids it reads
+        for f in fields:
+            if not (f.is_calculated and f.calculation_formula):
+                continue
+            try:
+                formula = compiled_formula(f)
+            except FormulaError as e:
+                logger.warning(f"Skipping calculated field {f.id}: {e}")
+                continue
+            self.formulas[f.id] = formula
+            referenced = {self.by_key[n] for n in formula.names if n in self.by_key}
+            self.inputs[f.id] = referenced | set(depends_on(f))
+
+        self.dependents = {}  # field id -> calculated fields that read it
+        for field_id, inputs in self.inputs.items():
+            for source in inputs:
+                self.dependents.setdefault(source, set()).add(field_id)
+
+        self.order, self.cyclic = self._topological_order()
+
+    def _topological_order(self):
+        pending = {fid: len([i for i in inputs if i in self.formulas]) for fid, inputs in self.inputs.items()}
+        ready = deque(sorted(fid for fid, n in pending.items() if n == 0))
+        order = []
+        while ready:
+            fid = ready.popleft()
+            order.append(fid)
+            for dependent in sorted(self.dependents.get(fid, ())):
+                if dependent in pending:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        ready.append(dependent)
+        cyclic = set(self.formulas) - set(order)
+        if cyclic:
+            logger.warning(f"Custom field formulas have a cycle; not evaluating: {sorted(cyclic)}")
+        return order, cyclic
+
+    def downstream(self, changed_ids) -> list:
+        """Calculated fields affected by changed_ids, in evaluation order."""
+        affected = set()
+        queue = deque(changed_ids)
+        while queue:
+            for dependent in self.dependents.get(queue.popleft(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+        return [fid for fid in self.order if fid in affected]
+
+    def scope(self, value_map: dict, entity_values: dict) -> dict:
+        """Names visible to formulas: entity columns, then custom fields by key and id."""
+        values = dict(entity_values)
+        for key, field_id in self.by_key.items():
+            if field_id in value_map:
+                values[key] = value_map[field_id]
+        return values
+
+    def evaluate(self, field_ids, value_map: dict, entity_values: dict) -> dict:
+        """Evaluate field_ids in order, feeding each result into later formulas."""
+        results = {}
+        for field_id in field_ids:
+            value = self.formulas[field_id].evaluate(self.scope(value_map, entity_values))
+            value_map[field_id] = value
+            results[field_id] = value
+        return results
+
+
+def validate_field_graph(fields):
+    """Raise FormulaError if any formula is invalid or the fields form a cycle."""
+    for f in fields:
+        if f.is_calculated and f.calculation_formula:
+            CompiledFormula(f.calculation_formula)
+    graph = FieldGraph(fields)
+    if graph.cyclic:
+        names = ", ".join(sorted(graph.fields[fid].field_name for fid in graph.cyclic))
+        raise FormulaError(f"Calculated fields depend on each other in a cycle: {names}")
+    return graph
+
+
+def numeric_columns(model) -> list:
+    columns = []
+    for column in model.__table__.columns:
+        try:
+            if column.type.python_type in (int, float):
+                columns.append(column.key)
+        except NotImplementedError:
+            continue
+    return columns
+
+
+def load_entity_values(db, entity_type: str, entity_id: str) -> dict:
+    """Numeric columns of the entity row, for formulas such as invoice 'total'."""
+    entry = ENTITY_MODELS.get(entity_type)
+    if entry is None:
+        return {}
+    model, key_col = entry
+    columns = numeric_columns(model)
+    row = db.query(*(getattr(model, c) for c in columns)).filter(key_col == entity_id).first()
+    return dict(zip(columns, row)) if row is not None else {}
@@ -0,0 +1,224 @@
+"""
+Map Geo Index
+
+Server-side marker clustering so the map stays smooth with thousands of jobs:
+1. refresh_geo_points() collects coordinates for CompanyCam projects and
+   geocoded job addresses (via the persistent geocode cache) into geo_points.
+   It runs after each CRM sync and each CompanyCam sync that changed projects,
+   and on the leader when geo_points is empty (e.g. a fresh deploy)
+2. GeoIndex loads those points into NumPy arrays of Web Mercator pixel
+   coordinates and, per zoom level, buckets them into a CELL_PX grid; each
+   non-empty cell becomes one cluster (count + centroid). Grids are built
+   lazily once per zoom and reused for every viewport
+3. A viewport query returns the clusters whose centroid lies in the bbox, or
+   individual points once zoomed in past UNCLUSTER_ZOOM
+"""
+
+import math
+import threading
+import time
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.app.database import SessionLocal
+from backend.app.models import GeoPoint, CompanyCamProject, Job, Contact
+from backend.app.services.geocoding import geocode_addresses
+import logging
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+CELL_PX = 60  # Cluster cell size in screen pixels
+MAX_ZOOM = 21
+UNCLUSTER_ZOOM = 17  # At and beyond this zoom every point is returned on its own
+CHECK_SECONDS = 30  # How often to look for new points written by another worker
+
+
+def job_address(contact) -> str:
+    street = contact.address or ""
+    locality = " ".join(v for v in (contact.state, contact.zip) if v)
+    parts = [p for p in (street, contact.city, locality) if p]
+    return ", ".join(parts) if street else ""
+
+
+async def refresh_geo_points(db: Session) -> dict:
+    """Rebuild geo_points from mirrored projects and geocoded job addresses."""
+    started = time.perf_counter()
+    now = int(time.time())
+    points = []
+
+    projects = db.query(
+        CompanyCamProject.id, CompanyCamProject.name, CompanyCamProject.latitude, CompanyCamProject.longitude
+    ).filter(CompanyCamProject.latitude.isnot(None), CompanyCamProject.longitude.isnot(None))
+    for p in projects:
+        points.append({"id": f"project:{p.id}", "kind": "project", "ref_id": p.id, "label": p.name,
+                       "latitude": p.latitude, "longitude": p.longitude, "date_updated": now})
+
+    jobs = db.query(Job.lecla_id, Job.number, Job.name, Contact.address, Contact.city, Contact.state, Contact.zip).join(
+        Contact, Job.contact_id == Contact.lecla_id
+    ).filter(Contact.address.isnot(None), Contact.address != "").all()
+    addresses = {job.lecla_id: job_address(job) for job in jobs}
+    coords = await geocode_addresses(db, addresses.values())
+    for job in jobs:
+        location = coords.get(addresses[job.lecla_id])
+        if location is None:
+            continue
+        label = f"#{job.number} {job.name}" if job.number else (job.name or "Job")
+        points.append({"id": f"job:{job.lecla_id}", "kind": "job", "ref_id": job.lecla_id, "label": label,
+                       "latitude": location[0], "longitude": location[1], "date_updated": now})
+
+    try:
+        db.query(GeoPoint).delete(synchronize_session=False)
+        if points:
+            db.bulk_insert_mappings(GeoPoint, points)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    geo_index.invalidate()
+    result = {
+        "projects": sum(1 for p in points if p["kind"] == "project"),
+        "jobs": sum(1 for p in points if p["kind"] == "job"),
+        "jobs_without_location": len(jobs) - sum(1 for p in points if p["kind"] == "job"),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"Geo points rebuilt: {result}")
+    return result
+
+
+async def rebuild_geo_points():
+    """refresh_geo_points() on its own session, for sync hooks; failures are logged, not raised."""
+    db = SessionLocal()
+    try:
+        return await refresh_geo_points(db)
+    except Exception as e:
+        logger.warning(f"Geo points rebuild failed: {e}")
+    finally:
+        db.close()
+
+
+def has_geo_points() -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(GeoPoint.id).first() is not None
+    finally:
+        db.close()
+
+
+def _mercator(lat, lng):
+    """Degrees -> world pixel coordinates at zoom 0 (0..TILE_SIZE)."""
+    lat = np.clip(lat, -85.05112878, 85.05112878)
+    x = (lng + 180.0) / 360.0 * TILE_SIZE
+    sin = np.sin(np.radians(lat))
+    y = (0.5 - np.log((1 + sin) / (1 - sin)) / (4 * math.pi)) * TILE_SIZE
+    return x, y
+
+
+class GeoIndex:
+    """In-memory point arrays plus per-zoom cluster grids."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._signature = None  # (count, max date_updated) of geo_points when loaded
+        self._checked_at = 0.0
+        self._grids = {}  # zoom -> cluster arrays
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._grids = {}
+
+    def _table_signature(self, db: Session):
+        return tuple(db.query(func.count(GeoPoint.id), func.max(GeoPoint.date_updated)).one())
+
+    def _ensure_loaded(self):
+        if self._loaded and time.time() - self._checked_at < CHECK_SECONDS:
+            return
+        db = SessionLocal()
+        try:
+            signature = self._table_signature(db)
+            self._checked_at = time.time()
+            if self._loaded and signature == self._signature:
+                return
+            rows = db.query(GeoPoint.id, GeoPoint.kind, GeoPoint.ref_id, GeoPoint.label, GeoPoint.latitude, GeoPoint.longitude).all()
+        finally:
+            db.close()
+
+        self.ids = [r.id for r in rows]
+        self.kinds = [r.kind for r in rows]
+        self.ref_ids = [r.ref_id for r in rows]
+        self.labels = [r.label for r in rows]
+        self.kind_array = np.array(self.kinds, dtype=object)
+        self.lat = np.array([r.latitude for r in rows], dtype=np.float64)
+        self.lng = np.array([r.longitude for r in rows], dtype=np.float64)
+        self.x, self.y = _mercator(self.lat, self.lng)
+        self._grids = {}
+        self._signature = signature
+        self._loaded = True
+        logger.info(f"Geo index loaded: {len(rows)} points")
+
+    def _grid(self, zoom: int, kinds=None):
+        key = (zoom, kinds)
+        grid = self._grids.get(key)
+        if grid is not None:
+            return grid
+
+        mask = np.ones(len(self.lat), dtype=bool) if kinds is None else np.isin(self.kind_array, list(kinds))
+        idx = np.nonzero(mask)[0]
+        scale = (2 ** zoom) / CELL_PX
+        cell_x = np.floor(self.x[idx] * scale).astype(np.int64)
+        cell_y = np.floor(self.y[idx] * scale).astype(np.int64)
+        cells = (cell_x << 32) | cell_y
+        _, first, inverse, counts = np.unique(cells, return_index=True, return_inverse=True, return_counts=True)
+        grid = {
+            "lat": np.bincount(inverse, weights=self.lat[idx]) / counts,
+            "lng": np.bincount(inverse, weights=self.lng[idx]) / counts,
+            "count": counts,
+            "first": idx[first],  # A representative point, used when the cell holds one point
+        }
+        self._grids[key] = grid
+        return grid
+
+    def _point(self, i: int, lat: float, lng: float) -> dict:
+        return {"type": "point", "id": self.ids[i], "kind": self.kinds[i], "ref_id": self.ref_ids[i],
+                "label": self.labels[i], "lat": lat, "lng": lng, "count": 1}
+
+    def query(self, south: float, west: float, north: float, east: float, zoom: int, kinds=None):
+        """Markers (clusters or single points) inside the bounding box."""
+        zoom = int(min(max(zoom, 0), MAX_ZOOM))
+        kinds = tuple(sorted(kinds)) if kinds else None
+        with self._lock:
+            self._ensure_loaded()
+            if not self.ids:
+                return []
+
+            if zoom >= UNCLUSTER_ZOOM:
+                lat, lng = self.lat, self.lng
+                inside = (lat >= south) & (lat <= north) & self._lng_inside(lng, west, east)
+                if kinds is not None:
+                    inside &= np.isin(self.kind_array, list(kinds))
+                return [self._point(int(i), float(lat[i]), float(lng[i])) for i in np.nonzero(inside)[0]]
+
+            grid = self._grid(zoom, kinds)
+            inside = (grid["lat"] >= south) & (grid["lat"] <= north) & self._lng_inside(grid["lng"], west, east)
+            markers = []
+            for c in np.nonzero(inside)[0]:
+                lat, lng, count = float(grid["lat"][c]), float(grid["lng"][c]), int(grid["count"][c])
+                if count == 1:
+                    markers.append(self._point(int(grid["first"][c]), lat, lng))
+                else:
+                    markers.append({"type": "cluster", "lat": lat, "lng": lng, "count": count})
+            return markers
+
+    @staticmethod
+    def _lng_inside(lng, west: float, east: float):
+        if west <= east:
+            return (lng >= west) & (lng <= east)
+        # Viewport crosses the antimeridian
+        return (lng >= west) | (lng <= east)
+
+
+# Global instance
+geo_index = GeoIndex()
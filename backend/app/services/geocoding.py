@@ -0,0 +1,178 @@
+"""
+Geocoding
+
+Turns job/contact addresses into coordinates for the map, with every result
+(hits and misses) kept in the geocode_cache table so an address is never sent
+to the geocoder twice.
+
+GoogleGeocoder calls the Google Geocoding API; StubGeocoder answers locally
+with deterministic coordinates (set GEOCODER_BACKEND=stub) for development and
+testing. Cache rows are tagged with the provider that produced them and only
+that provider's rows are served, so fake coordinates never leak into the real
+map. Without an API key (and no stub) new addresses are simply not geocoded.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+import httpx
+from sqlalchemy.orm import Session
+from backend.app.config import settings
+from backend.app.models import GeocodeCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+
+
+def normalize_address(address: str) -> str:
+    """Cache key: lowercase, punctuation-free, single-spaced."""
+    text = re.sub(r"[^a-z0-9 ]", " ", address.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class GoogleGeocoder:
+    """Google Geocoding API over a shared httpx client."""
+
+    name = "google"
+
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=15.0)
+        return self._client
+
+    async def geocode(self, address: str):
+        """(lat, lng) or None if the address can't be found."""
+        resp = await self.client.get(GEOCODE_URL, params={"address": address, "key": self.api_key})
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("status") == "ZERO_RESULTS":
+            return None
+        if data.get("status") != "OK":
+            raise RuntimeError(f"Geocoding failed: {data.get('status')} {data.get('error_message', '')}".strip())
+        location = data["results"][0]["geometry"]["location"]
+        return location["lat"], location["lng"]
+
+
+class StubGeocoder:
+    """Deterministic fake: scatters addresses around central Connecticut."""
+
+    name = "stub"
+
+    def __init__(self, center=(41.65, -72.7), spread: float = 0.5):
+        self.center = center
+        self.spread = spread
+        self.calls = 0
+
+    async def geocode(self, address: str):
+        self.calls += 1
+        digest = hashlib.sha1(normalize_address(address).encode("utf-8")).digest()
+        dx = int.from_bytes(digest[:4], "big") / 2**32 - 0.5
+        dy = int.from_bytes(digest[4:8], "big") / 2**32 - 0.5
+        return self.center[0] + dy * self.spread, self.center[1] + dx * self.spread
+
+
+_geocoder = None
+
+
+def get_geocoder():
+    """Return the process-wide geocoder, creating it on first use (None if unconfigured)."""
+    global _geocoder
+    if _geocoder is None:
+        if settings.GEOCODER_BACKEND == "stub":
+            _geocoder = StubGeocoder()
+        elif settings.GOOGLE_API_KEY:
+            _geocoder = GoogleGeocoder(settings.GOOGLE_API_KEY)
+    return _geocoder
+
+
+def set_geocoder(geocoder):
+    """Swap the geocoder (e.g. a StubGeocoder in tests). Pass None to reset."""
+    global _geocoder
+    _geocoder = geocoder
+
+
+async def geocode_addresses(db: Session, addresses) -> dict:
+    """
+    Resolve many addresses at once: cached ones in a single query, the rest via
+    the geocoder (bounded concurrency), persisting every answer.
+    Returns {address: (lat, lng)} for the ones that resolved.
+    """
+    by_key = {}
+    for address in addresses:
+        if address:
+            by_key.setdefault(normalize_address(address), address)
+    by_key.pop("", None)
+
+    geocoder = get_geocoder()
+    provider = geocoder.name if geocoder is not None else settings.GEOCODER_BACKEND
+
+    resolved = {}
+    cached_keys = set()
+    keys = list(by_key)
+    for i in range(0, len(keys), 500):
+        rows = db.query(GeocodeCache).filter(
+            GeocodeCache.address_key.in_(keys[i:i + 500]),
+            GeocodeCache.provider == provider
+        )
+        for row in rows:
+            cached_keys.add(row.address_key)
+            if row.status == "ok":
+                resolved[by_key[row.address_key]] = (row.latitude, row.longitude)
+
+    missing = [key for key in keys if key not in cached_keys]
+    if not missing:
+        return resolved
+    if geocoder is None:
+        logger.warning(f"Not geocoding {len(missing)} addresses: no GOOGLE_API_KEY (set GEOCODER_BACKEND=stub for fake coordinates)")
+        return resolved
+
+    sem = asyncio.Semaphore(settings.GEOCODER_CONCURRENCY)
+
+    async def lookup(key):
+        async with sem:
+            try:
+                return key, await geocoder.geocode(by_key[key]), None
+            except Exception as e:
+                return key, None, e
+
+    started = time.perf_counter()
+    failures = 0
+    for key, coords, error in await asyncio.gather(*(lookup(k) for k in missing)):
+        if error is not None:
+            # Transient failures are not cached; the address is retried next time
+            failures += 1
+            logger.warning(f"Geocoding '{by_key[key]}' failed: {error}")
+            continue
+        # merge: the key may hold another provider's answer, which this one replaces
+        db.merge(GeocodeCache(
+            address_key=key,
+            address=by_key[key],
+            latitude=coords[0] if coords else None,
+            longitude=coords[1] if coords else None,
+            status="ok" if coords else "not_found",
+            provider=geocoder.name,
+            date_created=int(time.time()),
+        ))
+        if coords:
+            resolved[by_key[key]] = coords
+    db.commit()
+    logger.info(f"Geocoded {len(missing) - failures} new addresses ({failures} failed) in {time.perf_counter() - started:.2f}s")
+    return resolved
+
+
+def invalidate_geocode_cache(db: Session, provider: str = None) -> int:
+    """Drop cached answers (one provider's, or all) so those addresses are geocoded again."""
+    query = db.query(GeocodeCache)
+    if provider is not None:
+        query = query.filter(GeocodeCache.provider == provider)
+    deleted = query.delete(synchronize_session=False)
+    db.commit()
+    return deleted
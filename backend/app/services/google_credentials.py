@@ -0,0 +1,170 @@
+"""
+Google Credential Manager
+
+Keeps the OAuth credentials from token.pickle in memory for all Google-backed
+endpoints (Sheets, Calendar, Drive):
+1. Loaded from disk once, then served from memory
+2. Refreshed by a background thread shortly before they expire; with several
+   API workers only the leader runs it (services/leader.py)
+3. Only one refresh runs at a time; concurrent callers wait for it
+4. Refreshed tokens are written back atomically (temp file + rename), and a
+   worker whose credentials expired reloads the file first, so it normally
+   picks up the leader's refresh instead of refreshing itself
+
+The request path only pays for a refresh if the background thread fell behind
+(e.g. the machine was asleep past the expiry).
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+REFRESH_MARGIN = timedelta(minutes=5)  # Refresh this long before expiry
+MAX_SLEEP_SECONDS = 300  # Wake at least this often to pick up a new token file
+RETRY_SECONDS = 60  # Back-off after a failed background refresh
+
+
+class GoogleCredentialError(Exception):
+    """Credentials are missing, unreadable or could not be refreshed."""
+
+    def __init__(self, message: str, status_code: int = 401):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class GoogleCredentialManager:
+    """Process-wide holder for the Google OAuth user credentials."""
+
+    def __init__(self, token_path):
+        self.token_path = token_path
+        self._creds = None
+        self._loaded_mtime = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- Disk I/O ---
+
+    def _load(self):
+        if not self.token_path.exists():
+            raise GoogleCredentialError("Google Not Authorized. Server needs to re-authenticate.")
+        try:
+            mtime = self.token_path.stat().st_mtime
+            with open(self.token_path, 'rb') as token:
+                self._creds = pickle.load(token)
+            self._loaded_mtime = mtime
+            logger.info("Google credentials loaded from token file")
+        except Exception as e:
+            logger.error(f"Error loading google tokens: {e}")
+            raise GoogleCredentialError("Could not load Google tokens", status_code=500)
+
+    def _persist(self):
+        """Write the refreshed token next to the original and swap it in atomically."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.token_path.parent, prefix=".token-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                pickle.dump(self._creds, tmp)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, self.token_path)
+            self._loaded_mtime = self.token_path.stat().st_mtime
+        except Exception as e:
+            logger.error(f"Error saving refreshed google tokens: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    # --- Refresh ---
+
+    def _needs_refresh(self, creds) -> bool:
+        if not creds.valid:
+            return True
+        return creds.expiry is not None and creds.expiry - REFRESH_MARGIN <= datetime.utcnow()
+
+    def _refresh_locked(self):
+        creds = self._creds
+        if not creds.refresh_token:
+            raise GoogleCredentialError("Google Not Authorized. Server needs to re-authenticate.")
+        from google.auth.transport.requests import Request
+        try:
+            creds.refresh(Request())
+        except Exception as e:
+            logger.error(f"Error refreshing google tokens: {e}")
+            raise GoogleCredentialError(f"Google token refresh failed: {str(e)}")
+        logger.info(f"Google credentials refreshed (expires {creds.expiry})")
+        self._persist()
+
+    def get(self):
+        """Return valid credentials, loading or refreshing only if unavoidable."""
+        creds = self._creds
+        if creds is not None and creds.valid:
+            return creds
+
+        with self._lock:
+            # Another thread (or the leader worker, via the token file) may have refreshed already
+            if self._creds is None or self._file_changed():
+                self._load()
+            if not self._creds.valid:
+                self._refresh_locked()
+            return self._creds
+
+    def _file_changed(self) -> bool:
+        try:
+            return self.token_path.stat().st_mtime != self._loaded_mtime
+        except FileNotFoundError:
+            return False
+
+    def refresh_if_needed(self):
+        """Reload a replaced token file and refresh credentials close to expiry."""
+        with self._lock:
+            if self._creds is None or self._file_changed():
+                self._load()
+            if self._needs_refresh(self._creds):
+                self._refresh_locked()
+
+    # --- Background thread ---
+
+    def _seconds_until_refresh(self) -> float:
+        creds = self._creds
+        if creds is None or creds.expiry is None:
+            return MAX_SLEEP_SECONDS
+        wait = (creds.expiry - REFRESH_MARGIN - datetime.utcnow()).total_seconds()
+        return min(max(wait, 1.0), MAX_SLEEP_SECONDS)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_if_needed()
+                wait = self._seconds_until_refresh()
+            except GoogleCredentialError as e:
+                logger.warning(f"Background Google credential refresh: {e}")
+                wait = RETRY_SECONDS
+            except Exception as e:
+                logger.error(f"Background Google credential refresh crashed: {e}")
+                wait = RETRY_SECONDS
+            self._stop.wait(wait)
+
+    def start(self):
+        """Start the background refresher (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="google-creds-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global instance
+google_credentials = GoogleCredentialManager(settings.GOOGLE_TOKEN_PICKLE)
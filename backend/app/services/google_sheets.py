@@ -0,0 +1,123 @@
+"""
+Google Sheets Workbook Cache
+
+Loads every tab of a spreadsheet in a single values().batchGet call and keeps
+the parsed result in memory until the file actually changes:
+1. Tab titles and real grid sizes come from the spreadsheet metadata, so large
+   tabs are no longer truncated to A1:Z1000
+2. All tabs are fetched in one batchGet round trip
+3. The Drive file's version/modifiedTime is checked before reusing a cached
+   copy; unchanged workbooks are never downloaded again
+
+The Sheets and Drive services are passed in, so a local fake of either API can
+be used in place of googleapiclient.
+"""
+
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+REVALIDATE_SECONDS = 30  # Trust the cached copy this long before asking Drive again
+
+
+def column_letter(index: int) -> str:
+    """1 -> A, 26 -> Z, 27 -> AA."""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def sheet_range(title: str, rows: int, cols: int) -> str:
+    """A1 range covering a whole tab; quotes in titles are doubled per A1 syntax."""
+    escaped = title.replace("'", "''")
+    return f"'{escaped}'!A1:{column_letter(max(cols, 1))}{max(rows, 1)}"
+
+
+class WorkbookCache:
+    """Revision-aware cache of whole spreadsheets, keyed by spreadsheet ID."""
+
+    def __init__(self, revalidate_seconds: float = REVALIDATE_SECONDS):
+        self.revalidate_seconds = revalidate_seconds
+        self._entries = {}  # spreadsheet_id -> {"revision", "checked_at", "data"}
+        self._locks = {}
+        self._guard = threading.Lock()
+        self.downloads = 0
+        self.revalidations = 0
+
+    def _lock_for(self, spreadsheet_id: str):
+        with self._guard:
+            return self._locks.setdefault(spreadsheet_id, threading.Lock())
+
+    def get_revision(self, spreadsheet_id: str, drive) -> str:
+        """Drive's version (falls back to modifiedTime) for change detection."""
+        meta = drive.files().get(fileId=spreadsheet_id, fields="version,modifiedTime").execute()
+        return str(meta.get("version") or meta.get("modifiedTime") or "")
+
+    def download(self, spreadsheet_id: str, sheets) -> dict:
+        """Fetch all tabs over their real grid sizes in one batchGet call."""
+        metadata = sheets.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields="sheets.properties(title,gridProperties(rowCount,columnCount))"
+        ).execute()
+
+        titles, ranges = [], []
+        for sheet in metadata.get("sheets", []):
+            props = sheet["properties"]
+            grid = props.get("gridProperties", {})
+            titles.append(props["title"])
+            ranges.append(sheet_range(props["title"], grid.get("rowCount", 1000), grid.get("columnCount", 26)))
+
+        if not ranges:
+            return {}
+
+        response = sheets.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=ranges
+        ).execute()
+
+        # valueRanges come back in request order
+        value_ranges = response.get("valueRanges", [])
+        self.downloads += 1
+        return {title: vr.get("values", []) for title, vr in zip(titles, value_ranges)}
+
+    def get(self, spreadsheet_id: str, sheets, drive) -> dict:
+        """Return {tab title: rows}, downloading only if the file changed."""
+        entry = self._entries.get(spreadsheet_id)
+        if entry and time.time() - entry["checked_at"] < self.revalidate_seconds:
+            return entry["data"]
+
+        with self._lock_for(spreadsheet_id):
+            entry = self._entries.get(spreadsheet_id)
+            if entry and time.time() - entry["checked_at"] < self.revalidate_seconds:
+                return entry["data"]
+
+            revision = self.get_revision(spreadsheet_id, drive)
+            self.revalidations += 1
+            if entry and revision and entry["revision"] == revision:
+                entry["checked_at"] = time.time()
+                return entry["data"]
+
+            started = time.perf_counter()
+            data = self.download(spreadsheet_id, sheets)
+            logger.info(f"Downloaded spreadsheet {spreadsheet_id} rev {revision} ({len(data)} tabs) in {time.perf_counter() - started:.2f}s")
+            self._entries[spreadsheet_id] = {"revision": revision, "checked_at": time.time(), "data": data}
+            return data
+
+    def revision_of(self, spreadsheet_id: str):
+        """Revision of the cached copy, if any."""
+        entry = self._entries.get(spreadsheet_id)
+        return entry["revision"] if entry else None
+
+    def invalidate(self, spreadsheet_id: str = None):
+        if spreadsheet_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(spreadsheet_id, None)
+
+
+# Global instance
+workbook_cache = WorkbookCache()
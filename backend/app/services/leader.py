@@ -0,0 +1,211 @@
+"""
+Cross-Worker Coordination
+
+The API can run as several uvicorn/gunicorn worker processes sharing one
+database. Work that should happen once per deployment rather than once per
+worker is coordinated with OS file locks in LOCK_DIR. The kernel releases a
+lock when its holder exits, so a crashed worker never leaves a stale lock:
+1. Leader election: every worker tries the "leader" lock at startup and then
+   every LEADER_RETRY_SECONDS. The holder runs the periodic jobs (active-job
+   sweep, Google token refresh, scheduled CRM sync, the initial map points
+   build); if it exits, another worker takes over on its next attempt
+2. Job locks (try_lock) make syncs single-flight across processes: the CRM
+   sync scripts hold "crm_sync" while they run, and background CompanyCam /
+   calendar refreshes skip when another worker is already running one
+3. Manual sync triggers are deduplicated: a trigger while a sync is running
+   reports that one instead of spawning another process
+File locks coordinate processes on one host; with workers on several hosts,
+schedule syncs from one of them.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from backend.app.config import settings, BASE_DIR
+from backend.app.services.active_jobs import active_job_sweeper
+from backend.app.services.google_credentials import google_credentials
+from backend.app.services.geo_index import has_geo_points, rebuild_geo_points
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+CRM_SYNC_LOCK = "crm_sync"
+CRM_SYNC_MODULE = "backend.crm_sync"
+
+
+class FileLock:
+    """An exclusive lock on LOCK_DIR/<name>.lock, held until release() or process exit."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path = settings.LOCK_DIR / f"{name}.lock"
+        # The holder's pid goes in a separate file: msvcrt locks are mandatory on
+        # Windows, so the lock file itself is never written
+        self.pid_path = settings.LOCK_DIR / f"{name}.pid"
+        self._fd = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self, blocking: bool = False) -> bool:
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        try:
+            self.pid_path.write_text(str(os.getpid()))  # For whoever is debugging a lock
+        except OSError:
+            pass
+        return True
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            self.pid_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def is_locked(self) -> bool:
+        """Whether some process (this one included) holds the lock right now."""
+        if self.held:
+            return True
+        probe = FileLock(self.name)
+        if probe.acquire():
+            probe.release()
+            return False
+        return True
+
+
+@contextmanager
+def try_lock(name: str):
+    """Yields whether the lock was acquired; never waits."""
+    lock = FileLock(name)
+    acquired = lock.acquire()
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            lock.release()
+
+
+@contextmanager
+def hold_lock(name: str):
+    """Waits for the lock (e.g. so only one worker runs schema upgrades at a time)."""
+    lock = FileLock(name)
+    lock.acquire(blocking=True)
+    try:
+        yield
+    finally:
+        lock.release()
+
+
+_sync_mutex = threading.Lock()
+_sync_process = None
+
+
+def start_crm_sync() -> dict:
+    """Start crm_sync.py in the background unless a CRM sync is already running anywhere."""
+    global _sync_process
+    with _sync_mutex:
+        if _sync_process is not None and _sync_process.poll() is None:
+            return {"status": "already_running", "pid": _sync_process.pid}
+        if FileLock(CRM_SYNC_LOCK).is_locked():
+            return {"status": "already_running"}
+        # Two workers can both get here; the second script exits when it can't take the lock
+        _sync_process = subprocess.Popen([sys.executable, "-m", CRM_SYNC_MODULE], cwd=str(BASE_DIR.parent))
+        logger.info(f"Started CRM sync (pid {_sync_process.pid})")
+        return {"status": "started", "pid": _sync_process.pid}
+
+
+class LeaderElector:
+    """Background thread that competes for leadership and runs the leader-only jobs."""
+
+    def __init__(self):
+        self._lock = FileLock("leader")
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_sync = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock.held
+
+    def _become_leader(self):
+        logger.info(f"Worker {os.getpid()} is now the leader")
+        active_job_sweeper.start()
+        # Other workers pick the refreshed token up from disk (see GoogleCredentialManager.get)
+        if settings.GOOGLE_TOKEN_PICKLE.exists():
+            google_credentials.start()
+        self._last_sync = time.monotonic()
+        # Syncs rebuild the map points afterwards; a fresh deploy has none until then
+        if not has_geo_points():
+            asyncio.run(rebuild_geo_points())
+
+    def _run_scheduled(self):
+        interval = settings.CRM_SYNC_INTERVAL_SECONDS
+        if interval > 0 and time.monotonic() - self._last_sync >= interval:
+            self._last_sync = time.monotonic()
+            start_crm_sync()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if not self.is_leader and self._lock.acquire():
+                    self._become_leader()
+                if self.is_leader:
+                    self._run_scheduled()
+            except Exception as e:
+                logger.warning(f"Leader loop error: {e}")
+            self._stop.wait(settings.LEADER_RETRY_SECONDS)
+
+    def start(self):
+        """Start competing for leadership (idempotent); the first attempt is immediate."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="leader-election", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.is_leader:
+            active_job_sweeper.stop()
+            google_credentials.stop()
+            self._lock.release()
+
+
+# Global instance
+leader_elector = LeaderElector()
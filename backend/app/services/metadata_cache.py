@@ -0,0 +1,95 @@
+"""
+Definition Metadata Cache
+
+Custom field and workflow/status definitions change a few times a month but
+are read on every per-entity request, so each worker keeps them in memory:
+1. Every write through the CRUD routes calls bump_version() in the same
+   transaction, incrementing a row in metadata_versions
+2. A cached entry remembers the version it was loaded at; a worker re-reads
+   the (one-row) version stamp at most every METADATA_CHECK_SECONDS and
+   reloads only when it moved, so writes made by other processes are picked
+   up within that window
+3. The writing worker drops its own entry as soon as the transaction commits,
+   so its next request already sees the change
+Cached rows are plain snapshots (not ORM instances), safe to share between
+requests and threads.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from backend.app.config import settings
+from backend.app.models import MetadataVersion
+import logging
+
+logger = logging.getLogger(__name__)
+
+CUSTOM_FIELDS = "custom_fields"
+WORKFLOWS = "workflows"
+
+
+def snapshot(row, **extra) -> SimpleNamespace:
+    """Detached, read-only copy of an ORM row's column values."""
+    values = {column.key: getattr(row, column.key) for column in row.__table__.columns}
+    values.update(extra)
+    return SimpleNamespace(**values)
+
+
+def current_version(db: Session, name: str) -> int:
+    return db.query(MetadataVersion.version).filter(MetadataVersion.name == name).scalar() or 0
+
+
+def bump_version(db: Session, name: str):
+    """Mark `name` definitions as changed; takes effect when db commits."""
+    now = int(time.time())
+    updated = db.query(MetadataVersion).filter(MetadataVersion.name == name).update(
+        {MetadataVersion.version: MetadataVersion.version + 1, MetadataVersion.date_updated: now},
+        synchronize_session=False
+    )
+    if not updated:
+        db.add(MetadataVersion(name=name, version=1, date_updated=now))
+    event.listen(db, "after_commit", lambda session: metadata_cache.invalidate(name), once=True)
+
+
+class MetadataCache:
+    """Per-worker cache of definition sets, keyed by name and validated by version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # name -> (version, value)
+        self._checked_at = {}  # name -> monotonic time of the last version check
+
+    def get(self, db: Session, name: str, loader):
+        """Cached loader(db) result for `name`, reloaded when its version changes."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and now - self._checked_at.get(name, 0.0) < settings.METADATA_CHECK_SECONDS:
+                return entry[1]
+
+        version = current_version(db, name)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version:
+                self._checked_at[name] = now
+                return entry[1]
+
+        value = loader(db)
+        with self._lock:
+            self._entries[name] = (version, value)
+            self._checked_at[name] = now
+        logger.info(f"Loaded {name} definitions (version {version})")
+        return value
+
+    def invalidate(self, name: str = None):
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+
+# Global instance
+metadata_cache = MetadataCache()
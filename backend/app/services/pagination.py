@@ -0,0 +1,31 @@
+"""
+Keyset (cursor) pagination helpers
+
+A cursor is the sort key of the last row on a page, encoded as an opaque
+URL-safe string. The next page is "rows after this key" in the index order,
+so page N costs the same as page 1 and rows don't shift when new ones arrive.
+"""
+
+import base64
+import json
+
+
+class CursorError(ValueError):
+    """A cursor could not be decoded."""
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """The `size` key values packed into cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise CursorError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise CursorError("Invalid cursor")
+    return values
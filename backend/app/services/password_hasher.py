@@ -0,0 +1,138 @@
+"""
+Password Hashing Pool
+
+bcrypt deliberately burns ~100-300 ms of CPU per hash. Run inline in an
+async route it blocks every other request on the worker, so:
+1. Hashes and verifications run on a small executor owned by this module:
+   threads when passlib uses the bcrypt library (which releases the GIL),
+   otherwise processes, since the os_crypt fallback holds the GIL and would
+   still stall the loop (PASSWORD_HASH_EXECUTOR overrides the choice)
+2. At most PASSWORD_HASH_WORKERS run at once; PASSWORD_HASH_MAX_QUEUE more
+   may wait, and anything beyond that is rejected with HasherBusy instead of
+   piling up behind a login burst or a credential-stuffing run
+3. stats() reports queue and run times so the pool can be sized
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from backend.app.config import settings
+from backend.app.services.security import verify_password, get_password_hash, pwd_context
+import logging
+
+logger = logging.getLogger(__name__)
+
+RECENT_SAMPLES = 256  # Window for the percentile figures in stats()
+
+
+class HasherBusy(Exception):
+    """Too many hashing requests are already queued."""
+
+
+def _timed(fn, submitted: float, *args):
+    started = time.monotonic()
+    return fn(*args), started - submitted, time.monotonic() - started
+
+
+def _auto_executor_kind() -> str:
+    try:
+        backend = pwd_context.handler("bcrypt").get_backend()
+    except Exception:
+        return "process"
+    return "thread" if backend == "bcrypt" else "process"
+
+
+def _percentile(values, fraction: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] * 1000, 1)
+
+
+class PasswordHasher:
+    """Bounded executor for bcrypt hashing and verification."""
+
+    def __init__(self, workers: int, max_queue: int, executor_kind: str = "auto"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.executor_kind = executor_kind
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0  # Submitted and not yet finished (running + queued)
+        self.completed = 0
+        self.rejected = 0
+        self.queue_seconds_total = 0.0
+        self.queue_seconds_max = 0.0
+        self._recent_queue = deque(maxlen=RECENT_SAMPLES)
+        self._recent_run = deque(maxlen=RECENT_SAMPLES)
+
+    def _get_executor(self):
+        # Created on first use so importing the app doesn't start threads or processes
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == "auto":
+                    self.executor_kind = _auto_executor_kind()
+                if self.executor_kind == "process":
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusy()
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result, queued, ran = await loop.run_in_executor(self._get_executor(), _timed, fn, time.monotonic(), *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self.completed += 1
+            self.queue_seconds_total += queued
+            self.queue_seconds_max = max(self.queue_seconds_max, queued)
+            self._recent_queue.append(queued)
+            self._recent_run.append(ran)
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queue, run = list(self._recent_queue), list(self._recent_run)
+            return {
+                "executor": self.executor_kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_ms_avg": round(self.queue_seconds_total / self.completed * 1000, 1) if self.completed else None,
+                "queue_ms_max": round(self.queue_seconds_max * 1000, 1),
+                "queue_ms_p95_recent": _percentile(queue, 0.95),
+                "run_ms_p50_recent": _percentile(run, 0.5),
+                "run_ms_p95_recent": _percentile(run, 0.95),
+            }
+
+
+# Global instance
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    executor_kind=settings.PASSWORD_HASH_EXECUTOR,
+)
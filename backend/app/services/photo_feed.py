@@ -0,0 +1,123 @@
+"""
+CompanyCam Photo Feed
+
+Latest photos across the most recently updated projects, built in one server
+call instead of one request per project from the browser:
+1. Recent photos for the top N projects are fetched concurrently on the shared
+   CompanyCam client, at most PHOTO_FEED_CONCURRENCY at a time
+2. Per-project lists (already newest first) are merged by captured_at with a heap
+3. The merged feed is cached with stale-while-revalidate: fresh for FRESH_SECONDS,
+   then served stale while one background refresh rebuilds it
+4. Fetched photos are written to the local mirror so their thumbnails resolve
+"""
+
+import asyncio
+import heapq
+import time
+from backend.app.database import SessionLocal
+from backend.app.services.companycam import cc_client
+from backend.app.services.companycam_sync import companycam_mirror, thumbnail_path
+import logging
+
+logger = logging.getLogger(__name__)
+
+PHOTO_FEED_CONCURRENCY = 6
+FRESH_SECONDS = 60
+STALE_SECONDS = 600  # Past this the feed is rebuilt before responding
+MAX_FEED_ENTRIES = 32  # Distinct (projects, per_project, limit) feeds kept
+
+
+def _captured(photo: dict) -> int:
+    return photo.get("captured_at") or photo.get("created_at") or 0
+
+
+class PhotoFeed:
+    """Stale-while-revalidate cache of merged multi-project photo feeds."""
+
+    def __init__(self, concurrency: int = PHOTO_FEED_CONCURRENCY):
+        self.concurrency = concurrency
+        self._entries = {}  # (projects, per_project, limit) -> {"built_at", "feed"}
+        self._refreshing = {}  # key -> task
+        self.builds = 0
+
+    async def _fetch_all(self, project_ids, per_project: int):
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(project_id):
+            async with sem:
+                photos = await cc_client.get_project_photos(project_id, per_page=per_project)
+                return photos if isinstance(photos, list) else []
+
+        return await asyncio.gather(*(fetch(pid) for pid in project_ids))
+
+    async def build(self, projects: int, per_project: int, limit: int) -> dict:
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            project_rows = companycam_mirror.list_projects(db, limit=projects)
+            project_ids = [str(p["id"]) for p in project_rows]
+            results = await self._fetch_all(project_ids, per_project)
+
+            # Keep the mirror current so /photos/{id}/thumbnail can find these
+            for project_id, photos in zip(project_ids, results):
+                companycam_mirror.upsert_photos(db, project_id, photos)
+            db.commit()
+        finally:
+            db.close()
+
+        streams = []
+        for project_id, photos in zip(project_ids, results):
+            ordered = sorted(photos, key=_captured, reverse=True)
+            streams.append([dict(p, project_id=project_id, thumbnail_path=thumbnail_path(p["id"])) for p in ordered])
+
+        merged = list(heapq.merge(*streams, key=_captured, reverse=True))[:limit]
+        self.builds += 1
+        logger.info(f"Photo feed: {len(project_ids)} projects, {len(merged)} photos in {time.perf_counter() - started:.2f}s")
+        return {"projects": project_rows, "photos": merged}
+
+    def _refresh_in_background(self, key):
+        if key in self._refreshing:
+            return
+
+        async def run():
+            try:
+                feed = await self.build(*key)
+                self._entries[key] = {"built_at": time.time(), "feed": feed}
+                while len(self._entries) > MAX_FEED_ENTRIES:
+                    oldest = min(self._entries, key=lambda k: self._entries[k]["built_at"])
+                    del self._entries[oldest]
+            except Exception as e:
+                logger.error(f"Photo feed refresh failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.ensure_future(run())
+
+    async def get(self, projects: int = 8, per_project: int = 4, limit: int = 32) -> dict:
+        # A feed never holds more than projects * per_project photos, so larger limits share its entry
+        limit = min(max(limit, 1), projects * per_project)
+        key = (projects, per_project, limit)
+        entry = self._entries.get(key)
+        age = time.time() - entry["built_at"] if entry else None
+
+        if entry is not None and age < FRESH_SECONDS:
+            return dict(entry["feed"], generated_at=int(entry["built_at"]), stale=False)
+
+        if entry is not None and age < STALE_SECONDS:
+            self._refresh_in_background(key)
+            return dict(entry["feed"], generated_at=int(entry["built_at"]), stale=True)
+
+        # Nothing usable: build now, sharing any refresh already in flight
+        self._refresh_in_background(key)
+        await asyncio.shield(self._refreshing[key])
+        entry = self._entries.get(key)
+        if entry is None:
+            return {"projects": [], "photos": [], "generated_at": None, "stale": True}
+        return dict(entry["feed"], generated_at=int(entry["built_at"]), stale=False)
+
+    def invalidate(self):
+        self._entries.clear()
+
+
+# Global instance
+photo_feed = PhotoFeed()
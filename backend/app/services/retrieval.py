@@ -0,0 +1,342 @@
+"""
+CRM Retrieval Index
+
+In-process BM25 index over jobs, contacts, budgets and tasks, used to ground
+AI answers about specific records without putting the database in the prompt:
+1. Each record becomes a short text document plus a one-line summary
+2. An inverted index (term -> {doc: term frequency}) is scored with BM25,
+   vectorized with NumPy so common terms cost the same as rare ones
+3. The top-k hits are packed into the prompt under a token budget
+
+The index is built on first use and then updated incrementally: rows whose
+date_updated reached the last watermark are re-indexed when a sync finishes
+(sync stamp) or after INDEX_REFRESH_SECONDS (rows already indexed at exactly
+the watermark are skipped, so rows sharing that second aren't lost). Deleted
+rows and the tombstones replaced documents leave behind are only dropped by a
+full rebuild, which runs every INDEX_REBUILD_SECONDS or once tombstones
+outnumber live documents, and is swapped in whole so searches never see a
+half-built index.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter
+import numpy as np
+from backend.app.config import settings
+from backend.app.database import SessionLocal
+from backend.app.models import Job, Contact, Budget, Task
+import logging
+
+logger = logging.getLogger(__name__)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+INDEX_REFRESH_SECONDS = 60
+INDEX_REBUILD_SECONDS = 6 * 3600
+MIN_TOMBSTONES_FOR_REBUILD = 1000
+CHARS_PER_TOKEN = 4  # Rough estimate for prompt budgeting
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "how",
+    "i", "in", "is", "it", "me", "my", "of", "on", "or", "our", "show", "tell", "that",
+    "the", "this", "to", "was", "what", "when", "where", "which", "who", "with", "about",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str):
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _money(value) -> str:
+    return f"${value:,.0f}" if value else "$0"
+
+
+def _job_doc(job):
+    summary = f"[Job #{job.number or '?'}] {job.name or 'Unnamed'} | Status: {job.status_name or 'n/a'} | Rep: {job.sales_rep or 'n/a'} | Total: {_money(job.total)}"
+    text = " ".join(str(v) for v in (job.number, job.name, job.type, job.service_type, job.status_name, job.sales_rep, job.primary_contact) if v)
+    return f"job:{job.lecla_id}", text, summary
+
+
+def _contact_doc(contact):
+    name = f"{contact.first_name or ''} {contact.last_name or ''}".strip() or "Unnamed"
+    location = ", ".join(v for v in (contact.address, contact.city, contact.state) if v)
+    summary = f"[Contact] {name} | {location or 'no address'} | {contact.email or ''} {contact.phone or ''}".rstrip()
+    text = " ".join(v for v in (contact.first_name, contact.last_name, contact.address, contact.city, contact.state, contact.zip, contact.email, contact.phone) if v)
+    return f"contact:{contact.lecla_id}", text, summary
+
+
+def _budget_doc(budget):
+    summary = f"[Budget #{budget.number or '?'}] Rep: {budget.sales_rep or 'n/a'} | Revenue: {_money(budget.revenue)} | Job: {budget.related_job_id or 'n/a'}"
+    text = " ".join(str(v) for v in (budget.number, budget.sales_rep, budget.related_job_id) if v)
+    return f"budget:{budget.jnid}", text, summary
+
+
+def _task_doc(task):
+    due = time.strftime("%Y-%m-%d", time.localtime(task.due_date)) if task.due_date else "no due date"
+    summary = f"[Task] {task.title} | {task.status} | {task.priority} priority | Due {due}"
+    text = " ".join(v for v in (task.title, task.description, task.status, task.priority, task.related_to_type) if v)
+    return f"task:{task.lecla_id}", text, summary
+
+
+# (model, updated column, document builder)
+SOURCES = [
+    (Job, Job.date_updated, _job_doc),
+    (Contact, Contact.date_updated, _contact_doc),
+    (Budget, Budget.date_updated, _budget_doc),
+    (Task, Task.date_updated, _task_doc),
+]
+
+# Everything a rebuild replaces (watermarks included, since they describe what's indexed)
+_INDEX_FIELDS = (
+    "_postings", "_arrays", "_lengths_array", "_doc_idx", "_summaries", "_lengths", "_terms",
+    "_total_length", "_live_docs", "_watermarks",
+)
+
+
+class RetrievalIndex:
+    """BM25 inverted index over CRM records, shared by all requests in a worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()  # Guards the index structures
+        self._refresh_lock = threading.Lock()  # Serializes refreshes
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}  # term -> {doc_idx: tf}
+        self._arrays = {}  # term -> (doc_idx array, tf array), compiled lazily from _postings
+        self._lengths_array = None
+        self._doc_idx = {}  # doc_id -> doc_idx
+        self._summaries = []  # doc_idx -> summary line (None once removed)
+        self._lengths = []  # doc_idx -> document length in tokens
+        self._terms = []  # doc_idx -> distinct terms (for removal)
+        self._total_length = 0
+        self._live_docs = 0
+        self._watermarks = {}  # model name -> (max date_updated indexed, doc ids indexed at exactly that value)
+        self._stamp_seen = 0.0
+        self._refreshed_at = 0.0
+        self._built_at = 0.0
+        self.version = 0  # Bumped whenever a refresh changes the indexed data
+
+    def __len__(self):
+        return self._live_docs
+
+    # --- Maintenance ---
+
+    def upsert(self, doc_id: str, text: str, summary: str):
+        """Add or replace a document."""
+        with self._lock:
+            self._upsert(doc_id, text, summary)
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _apply(self, docs):
+        # Applied in batches so searches can interleave with a large rebuild
+        with self._lock:
+            for doc in docs:
+                self._upsert(*doc)
+
+    def _upsert(self, doc_id: str, text: str, summary: str):
+        self._remove(doc_id)
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+
+        idx = len(self._summaries)
+        self._doc_idx[doc_id] = idx
+        self._summaries.append(summary)
+        self._lengths.append(len(tokens))
+        self._lengths_array = None
+        self._terms.append(tuple(counts))
+        self._total_length += len(tokens)
+        self._live_docs += 1
+
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[idx] = tf
+            self._arrays.pop(term, None)
+
+    def _remove(self, doc_id: str):
+        idx = self._doc_idx.pop(doc_id, None)
+        if idx is None:
+            return
+        for term in self._terms[idx]:
+            self._arrays.pop(term, None)
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(idx, None)
+                if not posting:
+                    del self._postings[term]
+        self._total_length -= self._lengths[idx]
+        self._live_docs -= 1
+        self._summaries[idx] = None
+        self._terms[idx] = ()
+
+    def is_stale(self) -> bool:
+        try:
+            stamp = settings.SYNC_STAMP_FILE.stat().st_mtime
+        except FileNotFoundError:
+            stamp = 0.0
+        return stamp > self._stamp_seen or time.time() - self._refreshed_at > INDEX_REFRESH_SECONDS
+
+    def _needs_rebuild(self) -> bool:
+        tombstones = len(self._summaries) - self._live_docs
+        return (
+            not self._built_at
+            or time.time() - self._built_at > INDEX_REBUILD_SECONDS
+            or tombstones > max(self._live_docs, MIN_TOMBSTONES_FOR_REBUILD)
+        )
+
+    def _index_changes(self, db) -> int:
+        """Upsert rows changed since the watermarks; returns how many were (re)indexed."""
+        indexed = 0
+        for model, updated_col, build_doc in SOURCES:
+            watermark, at_watermark = self._watermarks.get(model.__name__, (None, frozenset()))
+            query = db.query(model)
+            if watermark is not None:
+                query = query.filter(updated_col >= watermark)
+            newest, at_newest = watermark, set(at_watermark)
+            batch = []
+            for row in query.yield_per(1000):
+                doc = build_doc(row)
+                updated = getattr(row, updated_col.key)
+                if watermark is not None and updated == watermark and doc[0] in at_watermark:
+                    continue  # Already indexed by the previous refresh
+                batch.append(doc)
+                if updated is not None:
+                    if newest is None or updated > newest:
+                        newest, at_newest = updated, {doc[0]}
+                    elif updated == newest:
+                        at_newest.add(doc[0])
+                if len(batch) >= 1000:
+                    self._apply(batch)
+                    indexed += len(batch)
+                    batch = []
+            self._apply(batch)
+            indexed += len(batch)
+            if newest is not None:
+                self._watermarks[model.__name__] = (newest, frozenset(at_newest))
+        return indexed
+
+    def _rebuild(self) -> int:
+        # Built off to the side, then swapped in, so searches keep using the old index meanwhile
+        fresh = RetrievalIndex()
+        db = SessionLocal()
+        try:
+            indexed = fresh._index_changes(db)
+        finally:
+            db.close()
+        with self._lock:
+            for name in _INDEX_FIELDS:
+                setattr(self, name, getattr(fresh, name))
+        self._built_at = time.time()
+        return indexed
+
+    def _mark_refreshed(self):
+        try:
+            self._stamp_seen = settings.SYNC_STAMP_FILE.stat().st_mtime
+        except FileNotFoundError:
+            self._stamp_seen = 0.0
+
+    def refresh(self):
+        """Index rows changed since the last refresh; rebuild from scratch when due (or on first run)."""
+        with self._refresh_lock:
+            if not self.is_stale():
+                return
+            self._mark_refreshed()
+            started = time.perf_counter()
+            rebuilt = self._needs_rebuild()
+            if rebuilt:
+                indexed = self._rebuild()
+            else:
+                db = SessionLocal()
+                try:
+                    indexed = self._index_changes(db)
+                finally:
+                    db.close()
+
+            self._refreshed_at = time.time()
+            if indexed or rebuilt:
+                self.version += 1
+                action = "rebuilt with" if rebuilt else "(re)indexed"
+                logger.info(f"Retrieval index {action} {indexed} records in {time.perf_counter() - started:.2f}s, {self._live_docs} total")
+
+    def rebuild(self):
+        """Drop everything and index from scratch now (picks up deleted rows, compacts storage)."""
+        with self._refresh_lock:
+            self._mark_refreshed()
+            indexed = self._rebuild()
+            self._refreshed_at = time.time()
+            self.version += 1
+            logger.info(f"Retrieval index rebuilt with {indexed} records, {self._live_docs} total")
+
+    # --- Queries ---
+
+    def search(self, query: str, k: int = 8):
+        """Return [(score, summary)] for the k best BM25 matches."""
+        terms = set(tokenize(query))
+        with self._lock:
+            return self._search(terms, k)
+
+    def _compiled(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            posting = self._postings.get(term)
+            if not posting:
+                return None
+            arrays = (
+                np.fromiter(posting.keys(), dtype=np.int64, count=len(posting)),
+                np.fromiter(posting.values(), dtype=np.float64, count=len(posting)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def _search(self, terms, k: int):
+        if not terms or not self._live_docs:
+            return []
+
+        if self._lengths_array is None:
+            self._lengths_array = np.array(self._lengths, dtype=np.float64)
+        lengths = self._lengths_array
+        n = self._live_docs
+        avgdl = (self._total_length / n) or 1.0
+        scores = np.zeros(len(lengths))
+
+        for term in terms:
+            compiled = self._compiled(term)
+            if compiled is None:
+                continue
+            idx, tf = compiled
+            df = len(idx)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[idx] / avgdl)
+            scores[idx] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if k < len(scores):
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self._summaries[i]) for i in top if scores[i] > 0]
+
+    def context_for(self, message: str, k: int = 8, token_budget: int = 600) -> str:
+        """Pack the top-k matches into a prompt block no larger than token_budget."""
+        lines = []
+        used = 0
+        for _, summary in self.search(message, k=k):
+            cost = len(summary) // CHARS_PER_TOKEN + 1
+            if used + cost > token_budget:
+                break
+            lines.append(f"        - {summary}")
+            used += cost
+
+        if not lines:
+            return ""
+        return "\n        RELEVANT RECORDS:\n" + "\n".join(lines) + "\n"
+
+
+# Global instance
+retrieval_index = RetrievalIndex()
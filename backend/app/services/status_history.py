@@ -0,0 +1,162 @@
+"""
+Job Status History
+
+Keeps a record of when jobs move between statuses, which the sync used to
+overwrite:
+1. The sync writers call record_status_changes() for every job whose
+   status_name differs from what is stored (or that is new); each transition
+   also records how long the job sat in its previous status
+2. refresh_status_stats() rolls new transitions into job_status_daily_stats
+   (per day, status and sales rep), resuming from the last processed id, so
+   each transition is aggregated exactly once
+3. status_analytics() answers time-in-status and funnel questions for a
+   workflow from the daily rollup, so queries over years of history read a
+   few thousand small rows instead of the raw log
+"""
+
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.app.models import JobStatusChange, JobStatusDailyStat, JobStatusStatsState
+import logging
+
+logger = logging.getLogger(__name__)
+
+REFRESH_BATCH = 50000
+IN_CHUNK = 900  # Stay under SQLite's bound-parameter limit
+
+
+def _day(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def record_status_changes(db: Session, changes) -> int:
+    """
+    Stage transition rows (no commit).
+    changes: iterable of (job_id, from_status, to_status, changed_at, sales_rep).
+    """
+    changes = [c for c in changes if c[0] and c[1] != c[2]]
+    if not changes:
+        return 0
+
+    # When each job entered its current status = its latest recorded transition
+    job_ids = list({c[0] for c in changes})
+    entered_at = {}
+    for i in range(0, len(job_ids), IN_CHUNK):
+        entered_at.update(db.query(JobStatusChange.job_id, func.max(JobStatusChange.changed_at)).filter(
+            JobStatusChange.job_id.in_(job_ids[i:i + IN_CHUNK])
+        ).group_by(JobStatusChange.job_id).all())
+
+    rows = []
+    for job_id, from_status, to_status, changed_at, sales_rep in changes:
+        started = entered_at.get(job_id)
+        rows.append({
+            "job_id": job_id,
+            "from_status": from_status,
+            "to_status": to_status,
+            "sales_rep": sales_rep,
+            "changed_at": changed_at,
+            "seconds_in_previous": changed_at - started if from_status and started is not None and changed_at >= started else None,
+        })
+        entered_at[job_id] = changed_at
+    db.bulk_insert_mappings(JobStatusChange, rows)
+    return len(rows)
+
+
+def refresh_status_stats(db: Session) -> int:
+    """Roll transitions added since the last refresh into the daily stats; returns how many."""
+    processed = 0
+    while True:
+        state = db.get(JobStatusStatsState, 1)
+        if state is None:
+            state = JobStatusStatsState(id=1, last_change_id=0)
+            db.add(state)
+            db.flush()
+        last_id = state.last_change_id or 0
+
+        changes = db.query(
+            JobStatusChange.id, JobStatusChange.from_status, JobStatusChange.to_status,
+            JobStatusChange.sales_rep, JobStatusChange.changed_at, JobStatusChange.seconds_in_previous
+        ).filter(JobStatusChange.id > last_id).order_by(JobStatusChange.id).limit(REFRESH_BATCH).all()
+        if not changes:
+            db.commit()
+            return processed
+
+        deltas = defaultdict(lambda: [0, 0, 0])  # (day, status, rep) -> [entered, exited, exited_seconds]
+        for change in changes:
+            day = _day(change.changed_at or 0)
+            rep = change.sales_rep or ""
+            if change.to_status:
+                deltas[(day, change.to_status, rep)][0] += 1
+            if change.from_status and change.seconds_in_previous is not None:
+                delta = deltas[(day, change.from_status, rep)]
+                delta[1] += 1
+                delta[2] += change.seconds_in_previous
+
+        existing = {}
+        days = list({key[0] for key in deltas})
+        for i in range(0, len(days), IN_CHUNK):
+            for stat in db.query(JobStatusDailyStat).filter(JobStatusDailyStat.day.in_(days[i:i + IN_CHUNK])):
+                existing[(stat.day, stat.status_name, stat.sales_rep)] = stat
+
+        new_rows = []
+        for key, (entered, exited, seconds) in deltas.items():
+            stat = existing.get(key)
+            if stat is None:
+                new_rows.append({"day": key[0], "status_name": key[1], "sales_rep": key[2],
+                                 "entered": entered, "exited": exited, "exited_seconds": seconds})
+            else:
+                stat.entered += entered
+                stat.exited += exited
+                stat.exited_seconds += seconds
+        if new_rows:
+            db.bulk_insert_mappings(JobStatusDailyStat, new_rows)
+
+        # Claim the batch; if another worker got here first, drop ours
+        claimed = db.query(JobStatusStatsState).filter(
+            JobStatusStatsState.id == 1, JobStatusStatsState.last_change_id == last_id
+        ).update({JobStatusStatsState.last_change_id: changes[-1].id, JobStatusStatsState.refreshed_at: int(time.time())},
+                 synchronize_session=False)
+        if not claimed:
+            db.rollback()
+            return processed
+        db.commit()
+        processed += len(changes)
+        logger.info(f"Rolled up {len(changes)} status changes (through id {changes[-1].id})")
+
+
+def status_analytics(db: Session, status_names: list, start: str = None, end: str = None, sales_rep: str = None) -> list:
+    """
+    Per status, in the given (workflow) order: jobs entered/exited in the date
+    range, average days in status, and conversion from the previous status.
+    start/end are inclusive "YYYY-MM-DD" days.
+    """
+    query = db.query(
+        JobStatusDailyStat.status_name,
+        func.sum(JobStatusDailyStat.entered),
+        func.sum(JobStatusDailyStat.exited),
+        func.sum(JobStatusDailyStat.exited_seconds),
+    ).filter(JobStatusDailyStat.status_name.in_(status_names))
+    if start:
+        query = query.filter(JobStatusDailyStat.day >= start)
+    if end:
+        query = query.filter(JobStatusDailyStat.day <= end)
+    if sales_rep is not None:
+        query = query.filter(JobStatusDailyStat.sales_rep == sales_rep)
+    totals = {row[0]: row[1:] for row in query.group_by(JobStatusDailyStat.status_name)}
+
+    result = []
+    previous_entered = None
+    for name in status_names:
+        entered, exited, seconds = (int(v or 0) for v in totals.get(name, (0, 0, 0)))
+        result.append({
+            "status_name": name,
+            "entered": entered,
+            "exited": exited,
+            "avg_days_in_status": round(seconds / exited / 86400, 2) if exited else None,
+            "conversion_from_previous": round(entered / previous_entered, 4) if previous_entered else None,
+        })
+        previous_entered = entered
+    return result
@@ -0,0 +1,126 @@
+"""
+Thumbnail Disk Cache
+
+Size-bounded LRU cache of photo thumbnails on local disk:
+1. Each image is stored once under a hash of its key (photo ID + variant)
+2. Reads bump the file's mtime, so recency survives restarts
+3. Writes go to a temp file and are renamed into place (no torn reads)
+4. When the total size passes the limit, least recently used files are evicted
+
+Photos never change once captured, so cached files can be served with
+long-lived immutable cache headers.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from backend.app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailCache:
+    """On-disk LRU keyed by string, bounded by total bytes."""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # filename -> size, least recent first
+        self._size = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _filename(self, key: str) -> str:
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".img"
+
+    def _load(self):
+        # Rebuild the LRU order from file mtimes (only on first use)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".img"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+        self._loaded = True
+        logger.info(f"Thumbnail cache: {len(self._entries)} files, {self._size / 1e6:.1f} MB")
+
+    def get(self, key: str):
+        """Path of the cached file, or None."""
+        name = self._filename(key)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if name not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+        path = self.directory / name
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._size -= self._entries.pop(name, 0)
+            return None
+        return path
+
+    def put(self, key: str, content: bytes) -> Path:
+        """Store content under key and evict old entries beyond the size limit."""
+        name = self._filename(key)
+        path = self.directory / name
+        with self._lock:
+            if not self._loaded:
+                self._load()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".thumb-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._lock:
+            self._size -= self._entries.pop(name, 0)
+            self._entries[name] = len(content)
+            self._size += len(content)
+            self._evict_locked()
+        return path
+
+    def _evict_locked(self):
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.evictions += 1
+            try:
+                os.unlink(self.directory / name)
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "files": len(self._entries),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Global instance
+thumbnail_cache = ThumbnailCache(settings.THUMBNAIL_CACHE_DIR, settings.THUMBNAIL_CACHE_MAX_MB * 1024 * 1024)
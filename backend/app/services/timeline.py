@@ -0,0 +1,276 @@
+"""
+Job Timeline Milestones
+
+Server-side port of the frontend timeline engine (frontend/src/utils/timeline.js)
+so milestones can be queried across jobs instead of computed per job in the
+browser:
+1. Every active job with an anchor date gets a template: the one a user
+   pinned, otherwise one picked from its type/service type
+2. refresh_milestones() computes due dates for all changed jobs at once
+   (numpy business-day offsets per template) and stores them in job_milestones,
+   indexed by due date
+3. Each job remembers a signature of its template and anchor/related field
+   values; only jobs whose signature moved are recomputed, and jobs that stop
+   being active (or lose their anchor) have their milestones removed
+Milestone status (completed / overdue / today / pending) depends on the
+current day, so it is derived when reading rather than stored.
+"""
+
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.app.config import settings
+from backend.app.models import Job, JobMilestone, JobTimeline
+import logging
+
+logger = logging.getLogger(__name__)
+
+IN_CHUNK = 900  # Stay under SQLite's bound-parameter limit
+
+# Keep in step with TIMELINE_TEMPLATES in frontend/src/utils/timeline.js
+TIMELINE_TEMPLATES = {
+    "roofing_standard": {
+        "id": "roofing_standard",
+        "name": "Standard Roof Replacement",
+        "description": "Typical timeline for residential roof replacement",
+        "anchorField": "first_estimate_signed_date",
+        "anchorLabel": "Estimate Signed",
+        "steps": [
+            {"name": "Estimate Signed", "offsetDays": 0, "relatedField": "first_estimate_signed_date", "isAnchor": True},
+            {"name": "Permits Filed", "offsetDays": 2, "relatedField": "file_date", "description": "Submit permit application"},
+            {"name": "Deposit Received", "offsetDays": 5, "relatedField": None, "description": "Customer deposit payment due"},
+            {"name": "Materials Ordered", "offsetDays": 7, "relatedField": None, "description": "Order roofing materials"},
+            {"name": "Permit Approved", "offsetDays": 10, "relatedField": None, "description": "Permit approval expected"},
+            {"name": "Job Start", "offsetDays": 14, "relatedField": None, "description": "Crew arrives on site"},
+            {"name": "Job Complete", "offsetDays": 17, "relatedField": None, "description": "Work finished"},
+            {"name": "Final Inspection", "offsetDays": 20, "relatedField": "warranty_and_permit_closed", "description": "City/county inspection"},
+            {"name": "Final Payment", "offsetDays": 22, "relatedField": "paid_in_full_date", "description": "Customer final payment due"},
+        ],
+    },
+    "roofing_repair": {
+        "id": "roofing_repair",
+        "name": "Roof Repair",
+        "description": "Expedited timeline for repairs",
+        "anchorField": "first_estimate_signed_date",
+        "anchorLabel": "Estimate Signed",
+        "steps": [
+            {"name": "Estimate Signed", "offsetDays": 0, "relatedField": "first_estimate_signed_date", "isAnchor": True},
+            {"name": "Materials Ordered", "offsetDays": 1, "relatedField": None},
+            {"name": "Repair Scheduled", "offsetDays": 3, "relatedField": None},
+            {"name": "Repair Complete", "offsetDays": 5, "relatedField": None},
+            {"name": "Payment Received", "offsetDays": 7, "relatedField": "paid_in_full_date"},
+        ],
+    },
+    "storm_restoration": {
+        "id": "storm_restoration",
+        "name": "Storm Restoration",
+        "description": "Insurance claim timeline",
+        "anchorField": "first_estimate_signed_date",
+        "anchorLabel": "Estimate Signed",
+        "steps": [
+            {"name": "Estimate Signed", "offsetDays": 0, "relatedField": "first_estimate_signed_date", "isAnchor": True},
+            {"name": "Insurance Claim Filed", "offsetDays": 1, "relatedField": None},
+            {"name": "Adjuster Meeting", "offsetDays": 7, "relatedField": None},
+            {"name": "Insurance Approval", "offsetDays": 14, "relatedField": None},
+            {"name": "Permits Filed", "offsetDays": 16, "relatedField": "file_date"},
+            {"name": "Deductible Paid", "offsetDays": 18, "relatedField": None},
+            {"name": "Materials Ordered", "offsetDays": 20, "relatedField": None},
+            {"name": "Job Start", "offsetDays": 25, "relatedField": None},
+            {"name": "Job Complete", "offsetDays": 30, "relatedField": None},
+            {"name": "Final Inspection", "offsetDays": 33, "relatedField": "warranty_and_permit_closed"},
+            {"name": "Insurance Payment", "offsetDays": 40, "relatedField": "paid_in_full_date"},
+        ],
+    },
+}
+
+DEFAULT_TEMPLATE = "roofing_standard"
+
+# Job columns any template reads (anchor + related fields)
+TIMELINE_FIELDS = sorted({
+    field
+    for template in TIMELINE_TEMPLATES.values()
+    for field in [template["anchorField"]] + [step["relatedField"] for step in template["steps"]]
+    if field
+})
+
+
+def default_template(job_type, service_type) -> str:
+    """Template for a job nobody picked one for."""
+    text = f"{job_type or ''} {service_type or ''}".lower()
+    if "storm" in text or "insurance" in text:
+        return "storm_restoration"
+    if "repair" in text:
+        return "roofing_repair"
+    return DEFAULT_TEMPLATE
+
+
+def today() -> str:
+    return datetime.now(ZoneInfo(settings.TIMELINE_TIMEZONE)).strftime("%Y-%m-%d")
+
+
+def milestone_status(due_date: str, completed, current_day: str) -> str:
+    if completed:
+        return "completed"
+    if due_date < current_day:
+        return "overdue"
+    if due_date == current_day:
+        return "today"
+    return "pending"
+
+
+def _signature(template_id: str, row) -> str:
+    return "|".join([template_id] + [str(getattr(row, field) or "") for field in TIMELINE_FIELDS])
+
+
+def _anchor_days(timestamps) -> np.ndarray:
+    """Unix timestamps -> calendar days (datetime64[D]) in TIMELINE_TIMEZONE."""
+    zone = ZoneInfo(settings.TIMELINE_TIMEZONE)
+    return np.array([datetime.fromtimestamp(ts, zone).date() for ts in timestamps], dtype="datetime64[D]")
+
+
+def compute_milestones(template_id: str, jobs: list) -> list:
+    """
+    Milestone rows for `jobs` (rows carrying jnid and the TIMELINE_FIELDS) on
+    one template. Due dates match addBusinessDays() in timeline.js: offsets
+    count weekdays after the anchor, and the anchor step is the anchor day.
+    """
+    template = TIMELINE_TEMPLATES[template_id]
+    steps = template["steps"]
+    anchors = _anchor_days([getattr(job, template["anchorField"]) for job in jobs])
+    offsets = np.array([step["offsetDays"] for step in steps])
+    is_anchor = np.array([bool(step.get("isAnchor")) or step["offsetDays"] == 0 for step in steps])
+
+    # A weekend anchor rolls back to Friday first, so +1 business day lands on Monday
+    due = np.busday_offset(anchors[:, None], offsets[None, :], roll="backward")
+    due = np.where(is_anchor[None, :], anchors[:, None], due)
+    due_days = np.datetime_as_string(due, unit="D")
+
+    rows = []
+    for j, job in enumerate(jobs):
+        for s, step in enumerate(steps):
+            field = step["relatedField"]
+            value = getattr(job, field) if field else None
+            rows.append({
+                "job_id": job.jnid,
+                "template_id": template_id,
+                "step_index": s,
+                "name": step["name"],
+                "due_date": str(due_days[j, s]),
+                "related_field": field,
+                # Flags such as warranty_and_permit_closed mark completion without a date
+                "actual_date": value if value and value > 1 else None,
+                "completed": 1 if value else 0,
+                "is_anchor": 1 if step.get("isAnchor") else 0,
+            })
+    return rows
+
+
+def _active_jobs(db: Session, job_ids=None) -> list:
+    now = int(time.time())
+    columns = [Job.jnid, Job.type, Job.service_type] + [getattr(Job, field) for field in TIMELINE_FIELDS]
+    query = db.query(*columns).filter(
+        Job.is_active == 1,
+        or_(Job.active_until.is_(None), Job.active_until >= now),
+        Job.jnid.isnot(None),
+    )
+    if job_ids is None:
+        return query.all()
+    rows = []
+    for i in range(0, len(job_ids), IN_CHUNK):
+        rows.extend(query.filter(Job.jnid.in_(job_ids[i:i + IN_CHUNK])).all())
+    return rows
+
+
+def _delete_milestones(db: Session, job_ids: list):
+    for i in range(0, len(job_ids), IN_CHUNK):
+        db.query(JobMilestone).filter(JobMilestone.job_id.in_(job_ids[i:i + IN_CHUNK])).delete(synchronize_session=False)
+
+
+def refresh_milestones(db: Session, job_ids=None, force: bool = False) -> dict:
+    """
+    Bring job_milestones up to date for all jobs (or only `job_ids`),
+    recomputing just the jobs whose template or timeline fields changed.
+    Commits; returns counts of recomputed and removed job timelines.
+    """
+    job_ids = list(job_ids) if job_ids is not None else None
+    jobs = {row.jnid: row for row in _active_jobs(db, job_ids)}
+
+    timelines = {}
+    query = db.query(JobTimeline.job_id, JobTimeline.template_id, JobTimeline.pinned, JobTimeline.signature)
+    if job_ids is None:
+        timelines = {t.job_id: t for t in query}
+    else:
+        for i in range(0, len(job_ids), IN_CHUNK):
+            timelines.update((t.job_id, t) for t in query.filter(JobTimeline.job_id.in_(job_ids[i:i + IN_CHUNK])))
+
+    changed = {}  # template_id -> [job rows]
+    timeline_rows, new_timelines = [], []
+    current = set()  # Jobs that should have milestones
+    now = int(time.time())
+    for jnid, job in jobs.items():
+        timeline = timelines.get(jnid)
+        if timeline is not None and timeline.pinned and timeline.template_id in TIMELINE_TEMPLATES:
+            template_id = timeline.template_id
+        else:
+            template_id = default_template(job.type, job.service_type)
+        if not getattr(job, TIMELINE_TEMPLATES[template_id]["anchorField"]):
+            continue
+        current.add(jnid)
+        signature = _signature(template_id, job)
+        if not force and timeline is not None and timeline.signature == signature:
+            continue
+        changed.setdefault(template_id, []).append(job)
+        values = {"job_id": jnid, "template_id": template_id, "signature": signature, "computed_at": now}
+        if timeline is None:
+            new_timelines.append(dict(values, pinned=0))
+        else:
+            timeline_rows.append(values)
+
+    # Jobs that are no longer active or lost their anchor
+    computed = [job.jnid for rows in changed.values() for job in rows]
+    stale = [jnid for jnid, timeline in timelines.items() if jnid not in current and timeline.signature is not None]
+
+    milestones = []
+    for template_id, rows in changed.items():
+        milestones.extend(compute_milestones(template_id, rows))
+
+    _delete_milestones(db, computed + stale)
+    if milestones:
+        db.bulk_insert_mappings(JobMilestone, milestones)
+    if timeline_rows:
+        db.bulk_update_mappings(JobTimeline, timeline_rows)
+    if new_timelines:
+        db.bulk_insert_mappings(JobTimeline, new_timelines)
+    if stale:
+        # Keep a pinned template choice for when the job becomes active again
+        stale_timelines = [timelines[jnid] for jnid in stale]
+        db.bulk_update_mappings(JobTimeline, [{"job_id": t.job_id, "signature": None} for t in stale_timelines if t.pinned])
+        unpinned = [t.job_id for t in stale_timelines if not t.pinned]
+        for i in range(0, len(unpinned), IN_CHUNK):
+            db.query(JobTimeline).filter(JobTimeline.job_id.in_(unpinned[i:i + IN_CHUNK])).delete(synchronize_session=False)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker refreshed the same jobs concurrently; its result stands
+        db.rollback()
+        logger.info("Milestone refresh raced another worker; skipped")
+        return {"recomputed": 0, "removed": 0}
+
+    if computed or stale:
+        logger.info(f"Recomputed milestones for {len(computed)} jobs, removed {len(stale)}")
+    return {"recomputed": len(computed), "removed": len(stale)}
+
+
+def pin_template(db: Session, job_id: str, template_id: str):
+    """Use `template_id` for this job from now on (no commit; refresh afterwards)."""
+    timeline = db.get(JobTimeline, job_id)
+    if timeline is None:
+        db.add(JobTimeline(job_id=job_id, template_id=template_id, pinned=1))
+    else:
+        timeline.template_id = template_id
+        timeline.pinned = 1
+        timeline.signature = None  # Forces a recompute
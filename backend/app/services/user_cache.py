@@ -0,0 +1,112 @@
+"""
+Authenticated User Cache
+
+Every protected request used to look its user up by email. Now:
+1. Access tokens carry the user's id, role and token_version as signed claims
+2. Each worker keeps a small LRU of user records (id, email, name, role,
+   token_version) that expire after AUTH_USER_CACHE_TTL_SECONDS, so a request
+   from a recently seen user needs no query at all
+3. Role and password changes bump User.token_version and drop the cached
+   record when the transaction commits; tokens minted before the change no
+   longer match and are rejected (immediately on the writing worker, within
+   the TTL on the others)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from backend.app.config import settings
+from backend.app.database import SessionLocal
+from backend.app.models import User
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def user_record(user: User) -> dict:
+    return {
+        "id": user.id,
+        "email": user.email,
+        "full_name": user.full_name,
+        "role": user.role,
+        "token_version": user.token_version or 0,
+    }
+
+
+def token_claims(user: User) -> dict:
+    """Claims for a user's access token."""
+    return {"sub": user.email, "id": user.id, "role": user.role, "ver": user.token_version or 0}
+
+
+def load_user(user_id: str):
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        return user_record(user) if user is not None else None
+    finally:
+        db.close()
+
+
+class UserCache:
+    """Per-worker LRU of user records with a TTL."""
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user id -> (expires_at, record)
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(self, user_id: str, now: float):
+        # Caller holds self._lock
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+        return None
+
+    def peek(self, user_id: str):
+        """Cached record for user_id, or None on a miss; never touches the database."""
+        with self._lock:
+            return self._cached(user_id, time.monotonic())
+
+    def get(self, user_id: str, loader=load_user):
+        """Cached record for user_id, or loader(user_id) (None if the user doesn't exist)."""
+        now = time.monotonic()
+        with self._lock:
+            record = self._cached(user_id, now)
+            if record is not None:
+                return record
+            self.misses += 1
+
+        record = loader(user_id)
+        if record is None:
+            return None
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, record)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return record
+
+    def invalidate(self, user_id: str = None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+def revoke_tokens(db: Session, user: User):
+    """Invalidate a user's existing tokens and cached record; takes effect when db commits."""
+    user_id = user.id
+    user.token_version = (user.token_version or 0) + 1
+    event.listen(db, "after_commit", lambda session: user_cache.invalidate(user_id), once=True)
+
+
+# Global instance
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL_SECONDS)
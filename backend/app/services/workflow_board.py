@@ -0,0 +1,94 @@
+"""
+Workflow Kanban Board
+
+Builds a job board for a workflow in two queries, however many jobs there are:
+1. Column counts: one GROUP BY status_name over the (status_name, date_updated,
+   lecla_id) index
+2. First page of every column: one UNION ALL of per-status LIMIT queries, each
+   an index range scan newest first
+Further cards are fetched per column with keyset cursors on
+(date_updated, lecla_id), so deep pages cost the same as the first one.
+"""
+
+from sqlalchemy import func, or_, and_, select, union_all
+from sqlalchemy.orm import Session
+from backend.app.models import Job
+from backend.app.services.pagination import encode_cursor, decode_cursor
+
+CARD_COLUMNS = (
+    Job.lecla_id, Job.jnid, Job.number, Job.name, Job.type,
+    Job.total, Job.status_name, Job.sales_rep, Job.date_updated,
+)
+
+
+def _newest_first():
+    # NULLS LAST keeps the order identical across SQLite and Postgres
+    return (Job.date_updated.desc().nulls_last(), Job.lecla_id.desc())
+
+
+def _card(row) -> dict:
+    return {column.key: getattr(row, column.key) for column in CARD_COLUMNS}
+
+
+def _next_cursor(cards: list, limit: int):
+    if len(cards) <= limit:
+        return None
+    last = cards[limit - 1]
+    return encode_cursor(last["date_updated"], last["lecla_id"])
+
+
+def _after(cursor: str):
+    """Rows that sort after the cursor in _newest_first() order."""
+    date_updated, lecla_id = decode_cursor(cursor, 2)
+    if date_updated is None:
+        return and_(Job.date_updated.is_(None), Job.lecla_id < lecla_id)
+    return or_(
+        Job.date_updated < date_updated,
+        and_(Job.date_updated == date_updated, Job.lecla_id < lecla_id),
+        Job.date_updated.is_(None),
+    )
+
+
+def build_board(db: Session, statuses, limit: int) -> list:
+    """One column per status: count, first `limit` cards and a cursor for the rest."""
+    names = [status.name for status in statuses]
+    counts = dict(
+        db.query(Job.status_name, func.count()).filter(Job.status_name.in_(names)).group_by(Job.status_name).all()
+    )
+
+    # One index range scan per column, each stopping after limit + 1 rows
+    pages = {}
+    if names:
+        per_column = [
+            select(*CARD_COLUMNS).where(Job.status_name == name).order_by(*_newest_first()).limit(limit + 1).subquery()
+            for name in names
+        ]
+        for row in db.execute(union_all(*(select(page) for page in per_column))):
+            pages.setdefault(row.status_name, []).append(_card(row))
+        # UNION ALL doesn't promise to keep each branch's order, so restore it
+        for cards in pages.values():
+            cards.sort(key=lambda card: card["lecla_id"], reverse=True)
+            cards.sort(key=lambda card: (card["date_updated"] is None, -(card["date_updated"] or 0)))
+
+    columns = []
+    for status in statuses:
+        cards = pages.get(status.name, [])
+        columns.append({
+            "status_id": status.id,
+            "name": status.name,
+            "color": status.color,
+            "is_closed": status.is_closed,
+            "count": counts.get(status.name, 0),
+            "jobs": cards[:limit],
+            "next_cursor": _next_cursor(cards, limit),
+        })
+    return columns
+
+
+def column_page(db: Session, status_name: str, cursor: str, limit: int) -> dict:
+    """The next page of one column; raises CursorError on a malformed cursor."""
+    query = db.query(*CARD_COLUMNS).filter(Job.status_name == status_name)
+    if cursor:
+        query = query.filter(_after(cursor))
+    cards = [_card(row) for row in query.order_by(*_newest_first()).limit(limit + 1)]
+    return {"jobs": cards[:limit], "next_cursor": _next_cursor(cards, limit)}
@@ -0,0 +1,79 @@
+"""
+Query-latency benchmark for the AI retrieval index (services/retrieval.py).
+
+    python backend/benchmark_retrieval.py                # 50k synthetic records
+    python backend/benchmark_retrieval.py --docs 200000 --repeat 50
+
+Builds an in-memory index of synthetic job/contact records shaped like the
+real documents (no database needed), then times search() for rare, mixed and
+very common query terms. The first query per term also compiles its posting
+arrays, so cold and warm timings are reported separately.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app.services.retrieval import RetrievalIndex
+
+STREETS = ["maple", "oak", "ridge", "hill", "main", "elm", "pine", "lake", "river", "park"]
+REPS = ["Evan Katz", "Jonah Smith", "Alex Ray", "Luis Vega"]
+CITIES = ["Waterbury", "Danbury", "Newtown", "Hartford"]
+STATUSES = ["Lead", "Job Prep", "In Progress", "Paid & Closed"]
+
+QUERIES = {
+    "rare": "what's the status of job 4356",
+    "mixed": "Evan Katz roof jobs in job prep",
+    "common": "roof",
+    "contact": "Mary Smith42 in Waterbury",
+}
+
+
+def build(docs: int) -> RetrievalIndex:
+    rng = random.Random(1)
+    index = RetrievalIndex()
+    batch = []
+    for i in range(docs):
+        if i % 2:
+            name = f"{rng.choice(['John', 'Mary', 'Ann', 'Bob'])} Smith{i % 500}"
+            text = f"{name} {i} {rng.choice(STREETS)} st {rng.choice(CITIES)} CT"
+            batch.append((f"contact:{i}", text, f"[Contact] {name}"))
+        else:
+            name = f"{rng.choice(STREETS).title()} Roof {i}"
+            text = f"{4000 + i} {name} Roofing {rng.choice(STATUSES)} {rng.choice(REPS)}"
+            batch.append((f"job:{i}", text, f"[Job #{4000 + i}] {name}"))
+        if len(batch) >= 1000:
+            index._apply(batch)
+            batch = []
+    index._apply(batch)
+    return index
+
+
+def benchmark(docs: int, repeat: int):
+    started = time.perf_counter()
+    index = build(docs)
+    print(f"Indexed {len(index)} records in {time.perf_counter() - started:.2f}s")
+    print(f"{'query':<10}{'cold ms':>9}{'median ms':>11}{'max ms':>9}")
+    for label, query in QUERIES.items():
+        started = time.perf_counter()
+        index.search(query)
+        cold = (time.perf_counter() - started) * 1000
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            index.search(query)
+            samples.append((time.perf_counter() - started) * 1000)
+        print(f"{label:<10}{cold:>9.2f}{statistics.median(samples):>11.2f}{max(samples):>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    benchmark(args.docs, args.repeat)
@@ -0,0 +1,95 @@
+"""
+Cold-start benchmark and import-time profile for the API.
+
+    python backend/benchmark_startup.py            # 5 cold starts, timings per phase
+    python backend/benchmark_startup.py --runs 10
+    python backend/benchmark_startup.py --profile  # heaviest imports (python -X importtime)
+
+Each run is a fresh interpreter, so nothing is cached between runs except the
+OS file cache and .pyc files. Phases: importing backend.app.main, then the
+lifespan startup (schema check, background services), then the first request.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import asyncio, json, time
+started = time.perf_counter()
+from backend.app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        import httpx
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await client.get("/health")
+        return ready, time.perf_counter()
+
+ready, first_response = asyncio.run(boot())
+print("BENCH " + json.dumps({
+    "import_s": imported - started,
+    "lifespan_s": ready - imported,
+    "first_request_s": first_response - ready,
+    "total_s": first_response - started,
+}))
+"""
+
+
+def cold_start() -> dict:
+    result = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith("BENCH "):
+            return json.loads(line[len("BENCH "):])
+    raise RuntimeError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+
+def benchmark(runs: int):
+    samples = [cold_start() for _ in range(runs)]
+    print(f"Cold start over {runs} runs (seconds):")
+    print(f"{'phase':<16}{'median':>9}{'min':>9}{'max':>9}")
+    for phase in ("import_s", "lifespan_s", "first_request_s", "total_s"):
+        values = [sample[phase] for sample in samples]
+        print(f"{phase[:-2]:<16}{statistics.median(values):>9.3f}{min(values):>9.3f}{max(values):>9.3f}")
+
+
+def profile(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.app.main"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header row
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative_us), int(self_us), depth, name.strip()))
+
+    total = max((row[0] for row in rows if row[3] == "backend.app.main"), default=0)
+    print(f"import backend.app.main: {total / 1e6:.3f}s")
+    print(f"\nHeaviest imports (cumulative, top {top}):")
+    print(f"{'cumulative':>11}{'self':>9}  module")
+    for cumulative, own, depth, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1e6:>10.3f}s{own / 1e6:>8.3f}s  {'  ' * min(depth, 8)}{name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--profile", action="store_true", help="show the import-time breakdown instead")
+    parser.add_argument("--top", type=int, default=30)
+    args = parser.parse_args()
+    if args.profile:
+        profile(args.top)
+    else:
+        benchmark(args.runs)
@@ -5,12 +5,19 @@ import uuid
 from datetime import datetime
 import httpx
 from backend.app.services.jobnimbus import jn_client
-from backend.app.database import SessionLocal, engine
+from backend.app.database import SessionLocal, ensure_schema
 from backend.app.models import Contact, Job, Base
 from backend.app.services.jobnimbus import jn_client
+from backend.app.services.business_context import mark_sync_complete
+from backend.app.services.status_history import record_status_changes, refresh_status_stats
+from backend.app.services.active_jobs import load_rules, apply_active_flags
+from backend.app.services.timeline import refresh_milestones
+from backend.app.services.geo_index import rebuild_geo_points
+from backend.app.services.leader import try_lock, hold_lock, CRM_SYNC_LOCK
 
-# Create tables if not exists
-Base.metadata.create_all(bind=engine)
+# Create tables if not exists (one process at a time; API workers do the same on startup)
+with hold_lock("schema"):
+    ensure_schema(Base.metadata)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -67,6 +74,8 @@ async def sync_jobs():
     db = SessionLocal()
     try:
         count = 0
+        status_changes = []
+        active_rules = load_rules(db)
         for i, jn_job in enumerate(jobs):
             jn_id = jn_job.get('jnid')
             
@@ -86,29 +95,51 @@ async def sync_jobs():
                             break
             
             now = int(datetime.now().timestamp())
+            new_status = jn_job.get('status_name')
+            if new_status != job.status_name:
+                changed_at = jn_job.get('date_status_change') or now
+                sales_rep = jn_job.get('sales_rep_name') or job.sales_rep
+                status_changes.append((jn_id, job.status_name, new_status, changed_at, sales_rep))
+            
             job.number = jn_job.get('number')
             job.name = jn_job.get('name')
             job.type = jn_job.get('type')
-            job.status_name = jn_job.get('status_name')
+            job.status_name = new_status
             job.total = jn_job.get('total', 0)
             job.contact_id = contact_lecla_id
             job.date_created = jn_job.get('date_created', now)
             job.date_updated = now
             job.data = jn_job
+            apply_active_flags(job, active_rules, now)
             
             count += 1
             if count % 100 == 0:
+                record_status_changes(db, status_changes)
+                status_changes = []
                 db.commit()
                 logger.info(f"Committed {count} jobs...")
+        record_status_changes(db, status_changes)
         db.commit()
         logger.info(f"Synced {count} jobs.")
+        
+        rolled_up = refresh_status_stats(db)
+        logger.info(f"Rolled {rolled_up} status changes into daily stats.")
+        
+        milestones = refresh_milestones(db)
+        logger.info(f"Recomputed milestones for {milestones['recomputed']} jobs.")
     finally:
         db.close()
 
 async def full_sync():
     await sync_contacts()
     await sync_jobs()
+    await rebuild_geo_points()
+    mark_sync_complete()
     logger.info("Full CRM Sync completed.")
 
 if __name__ == "__main__":
-    asyncio.run(full_sync())
+    with try_lock(CRM_SYNC_LOCK) as acquired:
+        if acquired:
+            asyncio.run(full_sync())
+        else:
+            logger.info("Another CRM sync is already running; exiting.")
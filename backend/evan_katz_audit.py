@@ -1,5 +1,4 @@
 import sqlite3
-import pandas as pd
 import sys
 import os
 from datetime import datetime
@@ -9,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.db import get_db
 
 def run_audit():
+    import pandas as pd
     with get_db() as conn:
         start_2025 = 1735689600
         
@@ -1,5 +1,4 @@
 import sqlite3
-import pandas as pd
 import sys
 import os
 import json
@@ -10,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.db import get_db
 
 def inspect_waterbury():
+    import pandas as pd
     with get_db() as conn:
         # Search for Waterbury in Jobs
         query = """
@@ -1,5 +1,4 @@
 import sqlite3
-import pandas as pd
 import sys
 import os
 
@@ -9,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.db import get_db
 
 def generate_report():
+    import pandas as pd
     query = """
     SELECT 
         datetime(b.date_updated, 'unixepoch') as 'Budget Updated',
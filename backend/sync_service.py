@@ -11,6 +11,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.jobnimbus import jn_client
 from app.db import get_db, init_db
+from app.services.business_context import mark_sync_complete
+from app.services.status_history import record_status_changes, refresh_status_stats
+from app.services.active_jobs import refresh_active_flags
+from app.services.timeline import refresh_milestones
+from app.database import SessionLocal
+from app.services.leader import try_lock, CRM_SYNC_LOCK
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -52,8 +58,13 @@ async def sync_jobs_targeted(job_ids):
             results = await asyncio.gather(*tasks)
             
             # Save chunk
+            status_changes = []
             with get_db() as conn:
                 c = conn.cursor()
+                fetched = [j['jnid'] for j in results if j and j.get('jnid')]
+                placeholders = ",".join("?" * len(fetched))
+                current = dict(c.execute(f"SELECT jnid, status_name FROM jobs WHERE jnid IN ({placeholders})", fetched).fetchall()) if fetched else {}
+                
                 count = 0
                 for j in results:
                     if not j: continue
@@ -64,6 +75,10 @@ async def sync_jobs_targeted(job_ids):
                     total_val = j.get('total', 0)
                     date_up = j.get('date_updated', 0)
                     
+                    if status != current.get(jnid):
+                        changed_at = j.get('date_status_change') or int(time.time())
+                        status_changes.append((jnid, current.get(jnid), status, changed_at, j.get('sales_rep_name')))
+                    
                     c.execute('''INSERT OR REPLACE INTO jobs 
                                  (jnid, number, name, type, status_name, total, date_updated, data) 
                                  VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
@@ -71,6 +86,15 @@ async def sync_jobs_targeted(job_ids):
                     count += 1
                 conn.commit()
             logger.info(f"Synced {count} jobs (Chunk {i}-{i+chunk_size})")
+            
+            db = SessionLocal()
+            try:
+                record_status_changes(db, status_changes)
+                db.commit()
+                # INSERT OR REPLACE resets the active flags; classify the chunk again
+                refresh_active_flags(db, fetched)
+            finally:
+                db.close()
 
 async def run_smart_sync():
     init_db()
@@ -216,6 +240,21 @@ async def run_smart_sync():
         await sync_jobs_targeted(needed_job_ids)
     else:
         logger.info("No related jobs found to sync.")
+    
+    # 7. Roll status transitions into the time-in-status stats, recompute changed milestones
+    db = SessionLocal()
+    try:
+        logger.info(f"Rolled {refresh_status_stats(db)} status changes into daily stats.")
+        logger.info(f"Recomputed milestones for {refresh_milestones(db)['recomputed']} jobs.")
+    finally:
+        db.close()
+
+    mark_sync_complete()
 
 if __name__ == "__main__":
-    asyncio.run(run_smart_sync())
+    # Shares the lock with crm_sync.py: both write the same tables
+    with try_lock(CRM_SYNC_LOCK) as acquired:
+        if acquired:
+            asyncio.run(run_smart_sync())
+        else:
+            logger.info("Another CRM sync is already running; exiting.")
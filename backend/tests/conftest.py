@@ -0,0 +1,30 @@
+"""
+Shared test setup: a throwaway SQLite database and the local fakes
+(AI_MODEL_BACKEND=fake, GEOCODER_BACKEND=stub) instead of external services.
+The environment is set before anything imports backend.app.config.
+"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="lecla-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmp}/test.db"
+os.environ["LOCK_DIR"] = os.path.join(_tmp, "locks")
+os.environ["AI_MODEL_BACKEND"] = "fake"
+os.environ["GEOCODER_BACKEND"] = "stub"
+os.environ["GOOGLE_MAPS_PLATFORM_API_KEY"] = ""
+
+import pytest
+from backend.app.database import engine, SessionLocal
+from backend.app.models import Base
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
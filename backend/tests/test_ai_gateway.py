@@ -0,0 +1,151 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from backend.app.services import ai_models
+from backend.app.services.ai_gateway import AIGateway, GatewayTimeout, normalize_prompt
+
+
+class RecordingModel:
+    """Fake chat model that records calls and can be held open."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+
+    async def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        return f"r:{prompt}"
+
+    async def stream(self, prompt: str):
+        for word in ("one ", "two"):
+            await asyncio.sleep(self.delay)
+            yield word
+
+
+@pytest.fixture
+def model():
+    fake = RecordingModel(delay=0.05)
+    ai_models.set_chat_model(fake)
+    yield fake
+    ai_models.set_chat_model(None)
+
+
+def gateway(**overrides):
+    options = dict(max_concurrency=1, max_queue_per_user=3, deadline_seconds=5, cache_size=16, cache_ttl_seconds=60)
+    options.update(overrides)
+    return AIGateway(**options)
+
+
+def test_identical_questions_share_one_model_call(model):
+    gw = gateway(max_concurrency=4)
+
+    async def run():
+        return await asyncio.gather(*(gw.generate(f"u{i}", ("same",), "same") for i in range(5)))
+
+    assert asyncio.run(run()) == ["r:same"] * 5
+    assert model.prompts == ["same"]
+    assert gw.stats()["inflight_keys"] == 0
+
+
+def test_answers_are_cached(model):
+    gw = gateway()
+
+    async def run():
+        await gw.generate("u1", ("q",), "q")
+        return await gw.generate("u2", ("q",), "q")
+
+    assert asyncio.run(run()) == "r:q"
+    assert model.prompts == ["q"]
+    assert gw.cache.hits == 1
+
+
+def test_concurrency_is_bounded(model):
+    gw = gateway(max_concurrency=2, max_queue_per_user=10)
+
+    async def run():
+        await asyncio.gather(*(gw.generate("u1", (i,), f"p{i}") for i in range(6)))
+
+    asyncio.run(run())
+    assert model.max_active == 2
+    assert gw.stats()["active"] == 0
+
+
+def test_waiting_users_are_served_round_robin(model):
+    gw = gateway(max_concurrency=1, max_queue_per_user=5)
+
+    async def run():
+        first = asyncio.ensure_future(gw.generate("busy", ("b0",), "b0"))
+        await asyncio.sleep(0.01)  # b0 holds the only slot; everything else queues
+        tasks = [asyncio.ensure_future(gw.generate("busy", (f"b{i}",), f"b{i}")) for i in range(1, 4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.ensure_future(gw.generate("quiet", ("q1",), "q1")))
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(run())
+    # The quiet user's single question is served right after the first queued one, not behind all of them
+    assert model.prompts == ["b0", "b1", "q1", "b2", "b3"]
+
+
+def test_per_user_queue_limit(model):
+    gw = gateway(max_concurrency=1, max_queue_per_user=1)
+
+    async def run():
+        return await asyncio.gather(*(gw.generate("u1", (i,), f"p{i}") for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(r).__name__ for r in results] == ["str", "str", "GatewayBusy"]
+    assert gw.rejected == 1
+
+
+def test_deadline_applies_while_queued(model):
+    model.delay = 0.3
+    gw = gateway(max_concurrency=1, deadline_seconds=0.1)
+
+    async def run():
+        return await asyncio.gather(gw.generate("u1", ("a",), "a"), gw.generate("u2", ("b",), "b"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, GatewayTimeout) for r in results)
+    assert gw.stats()["active"] == 0 and gw.stats()["queued"] == 0
+
+
+def test_streams_are_cached_after_completion(model):
+    gw = gateway()
+
+    async def collect():
+        return [chunk async for chunk in gw.stream("u1", ("s",), "s")]
+
+    assert asyncio.run(collect()) == ["one ", "two"]
+    assert asyncio.run(collect()) == ["one two"]
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  What's   the STATUS?? ") == normalize_prompt("what's the status")
+
+
+def test_chat_stream_endpoint_with_fake_backend(db):
+    from backend.app.main import app
+    from backend.app.routers.auth import get_current_user
+
+    ai_models.set_chat_model(ai_models.FakeChatModel())
+    app.dependency_overrides[get_current_user] = lambda: {"id": "u1", "email": "a@x", "full_name": "A", "role": "sales"}
+    try:
+        client = TestClient(app)
+        response = client.post("/api/ai/chat/stream", json={"message": "hello there"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "You asked: hello there" in "".join(
+            line for line in response.text.splitlines() if line.startswith("data:")
+        ).replace('data: {"text": "', "").replace('"}', "")
+        assert "event: done" in response.text
+    finally:
+        app.dependency_overrides.clear()
+        ai_models.set_chat_model(None)
@@ -0,0 +1,147 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from backend.app.services.formulas import CompiledFormula, FieldGraph, FormulaError, validate_field_graph
+
+SAMPLES = [
+    {"a": 3.0, "b": 1.0, "c": 2.0},
+    {"a": -4.5, "b": 10.0, "c": 0.0},
+    {"a": 0.0, "b": 0.0, "c": 7.25},
+]
+
+PARITY_FORMULAS = [
+    "a - b - c",
+    "a * 0.1 + b / 4",
+    "a ** 2 + 2 ** -1",
+    "a % 3",
+    "min(a, b, c)",
+    "max(a, b, c) - min(a, b)",
+    "abs(a - c)",
+    "round(a / 3, 2)",
+    "if_(a > b, a, b)",
+    "if_(0 <= a < 5, 1, 0)",
+    "div(a, b)",
+    "-a + +b",
+]
+
+
+def vector(formula: CompiledFormula):
+    columns = {name: np.array([row[name] for row in SAMPLES]) for name in "abc"}
+    return formula.evaluate_many(columns, len(SAMPLES))
+
+
+@pytest.mark.parametrize("source", PARITY_FORMULAS)
+def test_scalar_and_vector_evaluation_agree(source):
+    formula = CompiledFormula(source)
+    scalar = [formula.evaluate(row) for row in SAMPLES]
+    np.testing.assert_allclose(vector(formula), np.array(scalar, dtype=np.float64))
+
+
+def test_min_max_use_every_argument():
+    formula = CompiledFormula("min(a, b, c) + max(a, b, c)")
+    assert formula.evaluate(SAMPLES[0]) == 4.0
+    assert vector(formula)[0] == 4.0
+
+
+def test_chained_comparison_works_on_arrays():
+    formula = CompiledFormula("if_(0 < a < 2, 1, 0)")
+    result = formula.evaluate_many({"a": np.array([-1.0, 1.0, 3.0])}, 3)
+    assert result.tolist() == [0.0, 1.0, 0.0]
+
+
+def test_missing_inputs_count_as_zero():
+    formula = CompiledFormula("total - permit_fee")
+    assert formula.names == {"total", "permit_fee"}
+    assert formula.evaluate({"total": "$1,200", "permit_fee": None}) == 1200.0
+    assert formula.evaluate_many({"total": np.array([5.0, np.nan])}, 2).tolist() == [5.0, 0.0]
+
+
+def test_division_by_zero_degrades_instead_of_raising():
+    formula = CompiledFormula("a / b")
+    assert formula.evaluate({"a": 1.0, "b": 0.0}) is None
+    assert np.isnan(formula.evaluate_many({"a": np.array([1.0]), "b": np.array([0.0])}, 1)[0])
+
+
+@pytest.mark.parametrize("source", [
+    "__import__('os')",
+    "a.real",
+    "a[0]",
+    "[a, b]",
+    "lambda: 1",
+    "'text'",
+    "a if b else c",
+    "a and b",
+    "open('x')",
+    "min(a, b, key=abs)",
+    "min(a)",
+    "if_(a, b)",
+    "round(a, b)",
+    "9 ** 9 ** 9 ** 9",
+    "a ** b",
+    "a ** 11",
+    "a +",
+])
+def test_rejected_formulas(source):
+    with pytest.raises(FormulaError):
+        CompiledFormula(source)
+
+
+def test_huge_powers_overflow_quickly():
+    formula = CompiledFormula("((((10 ** 10) ** 10) ** 10) ** 10) ** 10")
+    assert formula.evaluate({}) is None
+
+
+def field(field_id, formula=None, key=None, depends=None):
+    return SimpleNamespace(
+        id=field_id,
+        field_name=field_id.title(),
+        jn_field_key=key,
+        is_calculated=formula is not None,
+        calculation_formula=formula,
+        depends_on_fields=depends,
+        date_updated=1,
+    )
+
+
+def test_field_graph_orders_and_chains_dependents():
+    graph = FieldGraph([
+        field("total", "subtotal * 1.0635", key="cf_total"),
+        field("subtotal", "materials + labor"),
+        field("margin", "cf_total - cost"),
+        field("materials"),
+    ])
+    assert graph.order.index("subtotal") < graph.order.index("total") < graph.order.index("margin")
+    assert graph.downstream(["materials"]) == ["subtotal", "total", "margin"]
+    values = {"materials": 100.0}
+    results = graph.evaluate(graph.downstream(["materials"]), values, {"labor": 100.0, "cost": 150.0})
+    assert results["margin"] == pytest.approx(62.7)
+
+
+def test_field_graph_cycles_are_rejected():
+    fields = [field("a", "b + 1"), field("b", "c + 1"), field("c", "1", depends='["a"]')]
+    assert FieldGraph(fields).cyclic == {"a", "b", "c"}
+    with pytest.raises(FormulaError, match="cycle: A, B, C"):
+        validate_field_graph(fields)
+
+
+def test_field_graph_skips_invalid_formulas():
+    graph = FieldGraph([field("bad", "import os"), field("ok", "1 + 1")])
+    assert graph.order == ["ok"]
+    with pytest.raises(FormulaError):
+        validate_field_graph([field("bad", "import os")])
+
+
+def test_compiled_formula_cache_is_thread_safe(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from backend.app.services import formulas
+
+    monkeypatch.setattr(formulas, "COMPILED_CACHE_SIZE", 8)
+    fields = [field(f"f{i}", f"a + {i}") for i in range(32)]
+
+    def work(offset):
+        for i in range(500):
+            formulas.compiled_formula(fields[(i * 7 + offset) % len(fields)])
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(work, range(8)))
+    assert len(formulas._compiled_cache) <= 8
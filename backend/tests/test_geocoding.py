@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from backend.app.config import settings
+from backend.app.models import GeocodeCache
+from backend.app.services import geocoding
+from backend.app.services.geocoding import StubGeocoder, geocode_addresses, invalidate_geocode_cache, set_geocoder
+
+
+class FakeGoogle(StubGeocoder):
+    """Stands in for GoogleGeocoder; can fail or miss specific addresses."""
+
+    name = "google"
+
+    def __init__(self, fail=(), missing=()):
+        super().__init__(center=(0.0, 0.0))
+        self.fail = set(fail)
+        self.missing = set(missing)
+
+    async def geocode(self, address: str):
+        if address in self.fail:
+            raise RuntimeError("OVER_QUERY_LIMIT")
+        if address in self.missing:
+            self.calls += 1
+            return None
+        return await super().geocode(address)
+
+
+@pytest.fixture(autouse=True)
+def reset_geocoder():
+    yield
+    set_geocoder(None)
+
+
+def geocode(db, addresses):
+    return asyncio.run(geocode_addresses(db, addresses))
+
+
+def test_addresses_are_geocoded_once(db):
+    stub = StubGeocoder()
+    set_geocoder(stub)
+    first = geocode(db, ["12 Main St, Hartford CT", "12 main st hartford, ct", "9 Elm St", "", None])
+    assert stub.calls == 2
+    assert set(first) == {"12 Main St, Hartford CT", "9 Elm St"}
+
+    second = geocode(db, ["12 Main St, Hartford CT", "9 Elm St"])
+    assert stub.calls == 2
+    assert second == first
+    assert db.query(GeocodeCache).count() == 2
+
+
+def test_stub_is_deterministic(db):
+    set_geocoder(StubGeocoder())
+    coords = geocode(db, ["1 Oak Rd"])["1 Oak Rd"]
+    assert coords == asyncio.run(StubGeocoder().geocode("1 oak rd."))
+    assert 41.4 <= coords[0] <= 41.9 and -72.95 <= coords[1] <= -72.45
+
+
+def test_providers_do_not_share_answers(db):
+    set_geocoder(StubGeocoder())
+    stub_answer = geocode(db, ["1 Oak Rd"])["1 Oak Rd"]
+
+    google = FakeGoogle()
+    set_geocoder(google)
+    google_answer = geocode(db, ["1 Oak Rd"])["1 Oak Rd"]
+    assert google.calls == 1
+    assert google_answer != stub_answer
+    row = db.query(GeocodeCache).one()
+    assert row.provider == "google"
+
+
+def test_failures_are_retried_and_misses_are_cached(db):
+    google = FakeGoogle(fail={"1 Oak Rd"}, missing={"Nowhere"})
+    set_geocoder(google)
+    assert geocode(db, ["1 Oak Rd", "Nowhere"]) == {}
+    assert [(r.address, r.status) for r in db.query(GeocodeCache)] == [("Nowhere", "not_found")]
+
+    google.fail.clear()
+    assert set(geocode(db, ["1 Oak Rd", "Nowhere"])) == {"1 Oak Rd"}
+    assert google.calls == 2  # "Nowhere" was not asked again
+
+
+def test_unconfigured_geocoder_serves_cache_only(db, monkeypatch):
+    set_geocoder(StubGeocoder())
+    geocode(db, ["1 Oak Rd"])
+
+    monkeypatch.setattr(settings, "GEOCODER_BACKEND", "google")
+    monkeypatch.setattr(settings, "GOOGLE_API_KEY", "")
+    set_geocoder(None)
+    assert geocoding.get_geocoder() is None
+    # The stub's answers are not served as real ones, and nothing new is written
+    assert geocode(db, ["1 Oak Rd", "2 Oak Rd"]) == {}
+    assert db.query(GeocodeCache).count() == 1
+
+
+def test_invalidate_by_provider(db):
+    set_geocoder(StubGeocoder())
+    geocode(db, ["1 Oak Rd", "2 Oak Rd"])
+    set_geocoder(FakeGoogle())
+    geocode(db, ["3 Oak Rd"])
+
+    assert invalidate_geocode_cache(db, provider="stub") == 2
+    assert [r.provider for r in db.query(GeocodeCache)] == ["google"]
+    assert invalidate_geocode_cache(db) == 1
+    assert db.query(GeocodeCache).count() == 0
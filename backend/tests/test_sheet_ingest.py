@@ -0,0 +1,181 @@
+import math
+import pytest
+from backend.app.services.google_sheets import WorkbookCache, column_letter, sheet_range
+from backend.app.models import ReportingRow
+from backend.app.services.sheet_ingest import ingest_reporting_data, parse_reporting_rows
+
+
+def row(status="Signed", created="", signed="", budget="", invoice=""):
+    return ["", "", status, "", "", "", "", created, signed, budget, invoice]
+
+
+def test_parses_mixed_date_formats_and_currency():
+    typed, errors = parse_reporting_rows([
+        row(created="June 2, 2025", budget="$1,200.50"),
+        row(created="6/2/2025", signed="2025-06-03", budget="100", invoice="$250"),
+        row(created="2025-06-02"),
+    ])
+    assert errors == []
+    assert typed["row_number"].tolist() == [2, 3, 4]
+    june_2 = 1748822400.0
+    assert typed["date_created"].tolist() == [june_2] * 3
+    assert typed["budget_amount"].tolist() == [1200.5, 100.0, 0.0]
+    # Revenue is the larger of budget and invoice
+    assert typed["revenue"].tolist() == [1200.5, 250.0, 0.0]
+    # Signed date wins over created date
+    assert typed["effective_date"].tolist() == [june_2, june_2 + 86400, june_2]
+    assert typed["effective_year"].tolist() == [2025.0] * 3
+
+
+def test_ragged_rows_are_padded():
+    typed, errors = parse_reporting_rows([["", "", "Lead"], row(created="1/5/2024")])
+    assert errors == []
+    assert typed["status"].tolist() == ["Lead", "Signed"]
+    assert math.isnan(typed["date_created"].iloc[0])
+    assert math.isnan(typed["effective_year"].iloc[0])
+    assert typed["raw"].iloc[0] == ["", "", "Lead"]
+    assert typed["cell_count"].tolist() == [3, 11]
+
+
+def test_bad_values_are_reported_with_their_cell():
+    typed, errors = parse_reporting_rows([
+        row(created="sometime", budget="TBD"),
+        row(signed="13/45/2025", invoice="$5"),
+    ])
+    assert sorted((e["row_number"], e["column"], e["raw_value"]) for e in errors) == [
+        (2, "budget_amount", "TBD"),
+        (2, "date_created", "sometime"),
+        (3, "date_signed", "13/45/2025"),
+    ]
+    assert math.isnan(typed["budget_amount"].iloc[0])
+    assert typed["revenue"].tolist() == [0.0, 5.0]
+
+
+def test_row_hash_tracks_content():
+    first, _ = parse_reporting_rows([row(budget="1"), row(budget="1")])
+    second, _ = parse_reporting_rows([row(budget="2")])
+    assert first["row_hash"].iloc[0] == first["row_hash"].iloc[1]
+    assert first["row_hash"].iloc[0] != second["row_hash"].iloc[0]
+
+
+def test_ranges():
+    assert column_letter(1) == "A"
+    assert column_letter(26) == "Z"
+    assert column_letter(27) == "AA"
+    assert column_letter(703) == "AAA"
+    assert sheet_range("Bob's Jobs", 500, 11) == "'Bob''s Jobs'!A1:K500"
+    assert sheet_range("Empty", 0, 0) == "'Empty'!A1:A1"
+
+
+class _Request:
+    def __init__(self, result):
+        self.result = result
+
+    def execute(self):
+        return self.result
+
+
+class FakeDrive:
+    def __init__(self):
+        self.version = "1"
+        self.calls = 0
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields):
+        self.calls += 1
+        return _Request({"version": self.version})
+
+
+class FakeSheets:
+    def __init__(self, tabs):
+        self.tabs = tabs
+        self.ranges = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, fields):
+        return _Request({"sheets": [
+            {"properties": {"title": title, "gridProperties": {"rowCount": len(rows), "columnCount": 3}}}
+            for title, rows in self.tabs.items()
+        ]})
+
+    def batchGet(self, spreadsheetId, ranges):
+        self.ranges.append(ranges)
+        return _Request({"valueRanges": [{"values": rows} for rows in self.tabs.values()]})
+
+
+@pytest.fixture
+def google():
+    return FakeSheets({"Jobs": [["a", "b"]], "Notes": [["c"]]}), FakeDrive()
+
+
+def test_workbook_downloads_once_per_revision(google):
+    sheets, drive = google
+    cache = WorkbookCache(revalidate_seconds=60)
+    assert cache.get("sheet", sheets, drive) == {"Jobs": [["a", "b"]], "Notes": [["c"]]}
+    cache.get("sheet", sheets, drive)
+    assert cache.downloads == 1
+    assert drive.calls == 1
+    # All tabs come back from one batchGet over their grid sizes
+    assert sheets.ranges == [["'Jobs'!A1:C1", "'Notes'!A1:C1"]]
+
+
+def test_workbook_revalidates_without_redownloading(google):
+    sheets, drive = google
+    cache = WorkbookCache(revalidate_seconds=0)
+    cache.get("sheet", sheets, drive)
+    cache.get("sheet", sheets, drive)
+    assert cache.revalidations == 2
+    assert cache.downloads == 1
+
+    drive.version = "2"
+    sheets.tabs["Jobs"] = [["changed"]]
+    assert cache.get("sheet", sheets, drive)["Jobs"] == [["changed"]]
+    assert cache.downloads == 2
+    assert cache.revision_of("sheet") == "2"
+
+
+def test_workbook_invalidate(google):
+    sheets, drive = google
+    cache = WorkbookCache(revalidate_seconds=60)
+    cache.get("sheet", sheets, drive)
+    cache.invalidate("sheet")
+    cache.get("sheet", sheets, drive)
+    assert cache.downloads == 2
+
+
+class FakeValues:
+    """sheets.spreadsheets().values().get() for the reporting range."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.reads = 0
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, range):
+        self.reads += 1
+        return _Request({"values": self.rows})
+
+
+def test_ingest_skips_unchanged_revisions_and_backfills_cell_counts(db):
+    sheets, drive = FakeValues([row(created="1/5/2025", budget="10"), ["", "", "Lead"]]), FakeDrive()
+    assert ingest_reporting_data("sheet", sheets, drive, db)["changed"] == 2
+    assert ingest_reporting_data("sheet", sheets, drive, db)["status"] == "unchanged"
+    assert sorted(c for (c,) in db.query(ReportingRow.cell_count)) == [3, 11]
+
+    db.query(ReportingRow).update({"cell_count": None})
+    db.commit()
+    assert ingest_reporting_data("sheet", sheets, drive, db)["changed"] == 2
+    assert sheets.reads == 2
+    assert sorted(c for (c,) in db.query(ReportingRow.cell_count)) == [3, 11]
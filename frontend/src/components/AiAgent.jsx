@@ -37,21 +37,57 @@ const AiAgent = () => {
         setInput('');
         setIsLoading(true);
 
+        // Append text to the assistant message currently being streamed
+        const appendToReply = (text) => {
+            setMessages(prev => {
+                const next = [...prev];
+                const last = next[next.length - 1];
+                next[next.length - 1] = { ...last, content: last.content + text };
+                return next;
+            });
+        };
+
         try {
-            // Placeholder for real API call
-            const response = await fetch('http://127.0.0.1:8000/api/ai/chat', {
+            const response = await fetch('http://127.0.0.1:8000/api/ai/chat/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream',
                     'Authorization': `Bearer ${localStorage.getItem('lecla_token')}`
                 },
                 body: JSON.stringify({ message: input })
             });
 
-            if (!response.ok) throw new Error('Failed to chat');
+            if (!response.ok || !response.body) throw new Error('Failed to chat');
+
+            setMessages(prev => [...prev, { role: 'assistant', content: '' }]);
+
+            // Parse Server-Sent Events frames as they arrive
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let finished = false;
+
+            while (!finished) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                const frames = buffer.split('\n\n');
+                buffer = frames.pop();
 
-            const data = await response.json();
-            setMessages(prev => [...prev, { role: 'assistant', content: data.response }]);
+                for (const frame of frames) {
+                    let event = 'message';
+                    let data = '';
+                    for (const line of frame.split('\n')) {
+                        if (line.startsWith('event:')) event = line.slice(6).trim();
+                        else if (line.startsWith('data:')) data += line.slice(5).trim();
+                    }
+                    const payload = data ? JSON.parse(data) : {};
+                    if (payload.text) appendToReply(payload.text);
+                    if (event === 'done' || event === 'error') finished = true;
+                }
+            }
         } catch (err) {
             console.error(err);
             setMessages(prev => [...prev, { role: 'assistant', content: "Sorry, I'm having trouble connecting right now." }]);
@@ -87,7 +123,7 @@ const AiAgent = () => {
                                 <div className="message-content">{msg.content}</div>
                             </div>
                         ))}
-                        {isLoading && (
+                        {isLoading && messages[messages.length - 1]?.role !== 'assistant' && (
                             <div className="message assistant loading">
                                 <div className="dots"><span>.</span><span>.</span><span>.</span></div>
                             </div>
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { fetchCRMJobs } from '../services/api';
+import { fetchCRMJobs, fetchFieldValuesBulk, fetchWorkflows, fetchWorkflowBoard, fetchWorkflowBoardColumn } from '../services/api';
 import { JobNimbusIcon } from '../utils/jobnimbus';
 
 // Default JobNimbus statuses (14 as requested)
@@ -26,6 +26,10 @@ function KanbanBoard() {
     const [loading, setLoading] = useState(true);
     const [statuses, setStatuses] = useState(DEFAULT_STATUSES);
     const [draggedJob, setDraggedJob] = useState(null);
+    const [cardFields, setCardFields] = useState({ fields: [], byJob: {} });
+    // Server-side board: per-column totals and cursors for the next page
+    const [board, setBoard] = useState({ workflowId: null, counts: {}, cursors: {}, statusIds: {} });
+    const [loadingMore, setLoadingMore] = useState(null);
 
     useEffect(() => {
         loadJobs();
@@ -34,8 +38,26 @@ function KanbanBoard() {
     const loadJobs = async () => {
         setLoading(true);
         try {
-            const data = await fetchCRMJobs();
-            setJobs(Array.isArray(data) ? data : (data?.results || []));
+            const workflows = await fetchWorkflows({ entity_type: 'job', is_active: true });
+            if (workflows.length > 0) {
+                const data = await fetchWorkflowBoard(workflows[0].id);
+                const loaded = data.columns.flatMap(col => col.jobs);
+                setStatuses(data.columns.map(col => ({ name: col.name, color: col.color || '#3b82f6' })));
+                setBoard({
+                    workflowId: data.workflow_id,
+                    counts: Object.fromEntries(data.columns.map(col => [col.name, col.count])),
+                    cursors: Object.fromEntries(data.columns.map(col => [col.name, col.next_cursor])),
+                    statusIds: Object.fromEntries(data.columns.map(col => [col.name, col.status_id]))
+                });
+                setJobs(loaded);
+                loadCardFields(loaded);
+            } else {
+                // No job workflow configured yet: group recent jobs client-side
+                const data = await fetchCRMJobs();
+                const loaded = Array.isArray(data) ? data : (data?.results || []);
+                setJobs(loaded);
+                loadCardFields(loaded);
+            }
         } catch (err) {
             console.error('Failed to load jobs', err);
         } finally {
@@ -43,6 +65,39 @@ function KanbanBoard() {
         }
     };
 
+    const loadMore = async (statusName) => {
+        const cursor = board.cursors[statusName];
+        if (!cursor) return;
+        setLoadingMore(statusName);
+        try {
+            const page = await fetchWorkflowBoardColumn(board.workflowId, board.statusIds[statusName], cursor);
+            setJobs(prev => {
+                const seen = new Set(prev.map(job => job.lecla_id));
+                return [...prev, ...page.jobs.filter(job => !seen.has(job.lecla_id))];
+            });
+            setBoard(prev => ({ ...prev, cursors: { ...prev.cursors, [statusName]: page.next_cursor } }));
+            loadCardFields(page.jobs);
+        } catch (err) {
+            console.error('Failed to load more jobs', err);
+        } finally {
+            setLoadingMore(null);
+        }
+    };
+
+    // Kanban custom fields for every card in one request
+    const loadCardFields = async (loaded) => {
+        const ids = loaded.map(job => job.jnid).filter(Boolean);
+        if (ids.length === 0) return;
+        try {
+            const matrix = await fetchFieldValuesBulk('job', { entity_ids: ids, display: 'kanban' });
+            const byJob = {};
+            matrix.entity_ids.forEach((id, i) => { byJob[id] = matrix.values[i]; });
+            setCardFields(prev => ({ fields: matrix.fields, byJob: { ...prev.byJob, ...byJob } }));
+        } catch (err) {
+            console.error('Failed to load kanban fields', err);
+        }
+    };
+
     const getJobsByStatus = (statusName) => {
         return jobs.filter(job => {
             const jobStatus = job.status_name || job.status || 'Lead';
@@ -75,6 +130,18 @@ function KanbanBoard() {
         setJobs(updatedJobs);
         setDraggedJob(null);
 
+        const oldStatus = draggedJob.status_name || draggedJob.status || 'Lead';
+        if (board.workflowId && oldStatus !== newStatus) {
+            setBoard(prev => ({
+                ...prev,
+                counts: {
+                    ...prev.counts,
+                    [oldStatus]: Math.max((prev.counts[oldStatus] || 1) - 1, 0),
+                    [newStatus]: (prev.counts[newStatus] || 0) + 1
+                }
+            }));
+        }
+
         // TODO: Make API call to update job status in backend
         console.log(`Updated job ${draggedJob.lecla_id} to status: ${newStatus}`);
     };
@@ -136,7 +203,7 @@ function KanbanBoard() {
                                         fontSize: '0.75rem',
                                         fontWeight: '600'
                                     }}>
-                                        {statusJobs.length}
+                                        {board.counts[status.name] ?? statusJobs.length}
                                     </span>
                                 </div>
                             </div>
@@ -192,6 +259,20 @@ function KanbanBoard() {
                                                 {job.type}
                                             </div>
                                         )}
+
+                                        {cardFields.fields.map((field, i) => {
+                                            const value = cardFields.byJob[job.jnid]?.[i];
+                                            if (value === null || value === undefined || value === '') return null;
+                                            return (
+                                                <div key={field.field_id} style={{
+                                                    fontSize: '0.7rem',
+                                                    color: 'var(--color-text-muted)',
+                                                    marginTop: '4px'
+                                                }}>
+                                                    {field.field_name}: {field.field_type === 'currency' ? formatCurrency(value) : value}
+                                                </div>
+                                            );
+                                        })}
                                     </div>
                                 ))}
 
@@ -205,6 +286,25 @@ function KanbanBoard() {
                                         No jobs
                                     </div>
                                 )}
+
+                                {board.cursors[status.name] && (
+                                    <button
+                                        onClick={() => loadMore(status.name)}
+                                        disabled={loadingMore === status.name}
+                                        style={{
+                                            width: '100%',
+                                            padding: '8px',
+                                            background: 'transparent',
+                                            border: '1px dashed rgba(255,255,255,0.2)',
+                                            borderRadius: '6px',
+                                            color: 'var(--color-text-muted)',
+                                            fontSize: '0.75rem',
+                                            cursor: 'pointer'
+                                        }}
+                                    >
+                                        {loadingMore === status.name ? 'Loading...' : 'Load more'}
+                                    </button>
+                                )}
                             </div>
                         </div>
                     );
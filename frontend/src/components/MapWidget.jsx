@@ -47,6 +47,8 @@ function MapContent({ apiKey, projects }) {
     });
 
     const [map, setMap] = useState(null);
+    const [serverMarkers, setServerMarkers] = useState(null);
+    const requestId = React.useRef(0);
 
     const onLoad = React.useCallback(function callback(map) {
         setMap(map);
@@ -56,15 +58,53 @@ function MapContent({ apiKey, projects }) {
         setMap(null);
     }, []);
 
-    const markers = projects?.filter(p => p.coordinates?.latitude && p.coordinates?.longitude).map(p => ({
+    // Ask the backend for pre-clustered markers whenever the viewport settles
+    const onIdle = React.useCallback(async () => {
+        if (!map) return;
+        const bounds = map.getBounds();
+        if (!bounds) return;
+        const sw = bounds.getSouthWest();
+        const ne = bounds.getNorthEast();
+        const id = ++requestId.current;
+        try {
+            const resp = await api.get('/geo/markers', {
+                params: { bbox: [sw.lng(), sw.lat(), ne.lng(), ne.lat()].join(','), zoom: map.getZoom() }
+            });
+            if (id === requestId.current) {
+                setServerMarkers(resp.data.markers || []);
+            }
+        } catch (err) {
+            console.error("Failed to load map markers", err);
+        }
+    }, [map]);
+
+    const projectMarkers = projects?.filter(p => p.coordinates?.latitude && p.coordinates?.longitude).map(p => ({
         id: p.id,
         name: p.name,
+        count: 1,
         position: {
             lat: parseFloat(p.coordinates.latitude),
             lng: parseFloat(p.coordinates.longitude)
         }
     })) || [];
 
+    // Fall back to the raw project list until the geo index has points
+    const markers = serverMarkers && serverMarkers.length > 0
+        ? serverMarkers.map(m => ({
+            id: m.id || `cluster:${m.lat},${m.lng}`,
+            name: m.type === 'cluster' ? `${m.count} locations` : m.label,
+            count: m.count,
+            position: { lat: m.lat, lng: m.lng }
+        }))
+        : projectMarkers;
+
+    const zoomInto = (marker) => {
+        if (map && marker.count > 1) {
+            map.panTo(marker.position);
+            map.setZoom(Math.min(map.getZoom() + 2, 21));
+        }
+    };
+
     if (loadError) return <div className="card" style={{ height: '400px', display: 'flex', alignItems: 'center', justifyContent: 'center' }}>Error loading maps</div>;
     if (!isLoaded) return <div className="card" style={{ height: '400px', display: 'flex', alignItems: 'center', justifyContent: 'center' }}>Initializing Maps...</div>;
 
@@ -72,10 +112,11 @@ function MapContent({ apiKey, projects }) {
         <div className="card map-card" style={{ padding: '0', overflow: 'hidden' }}>
             <GoogleMap
                 mapContainerStyle={containerStyle}
-                center={markers.length > 0 ? markers[0].position : center}
+                center={projectMarkers.length > 0 ? projectMarkers[0].position : center}
                 zoom={9}
                 onLoad={onLoad}
                 onUnmount={onUnmount}
+                onIdle={onIdle}
                 options={{
                     styles: [
                         { elementType: "geometry", stylers: [{ color: "#242f3e" }] },
@@ -114,6 +155,8 @@ function MapContent({ apiKey, projects }) {
                         key={marker.id}
                         position={marker.position}
                         title={marker.name}
+                        label={marker.count > 1 ? { text: String(marker.count), color: 'white', fontWeight: '700' } : undefined}
+                        onClick={() => zoomInto(marker)}
                     />
                 ))}
             </GoogleMap>
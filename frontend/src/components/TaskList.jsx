@@ -1,8 +1,9 @@
 import React, { useState, useEffect } from 'react';
-import { fetchTasks, createTask, updateTask, deleteTask } from '../services/tasks';
+import { fetchTasksPage, createTask, updateTask, deleteTask } from '../services/tasks';
 
 function TaskList({ relatedToType = null, relatedToId = null }) {
     const [tasks, setTasks] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [loading, setLoading] = useState(true);
     const [showAddForm, setShowAddForm] = useState(false);
     const [newTask, setNewTask] = useState({
@@ -12,15 +13,19 @@ function TaskList({ relatedToType = null, relatedToId = null }) {
         priority: 'medium'
     });
 
+    const taskParams = () => {
+        const params = {};
+        if (relatedToType) params.related_to_type = relatedToType;
+        if (relatedToId) params.related_to_id = relatedToId;
+        return params;
+    };
+
     const loadTasks = async () => {
         setLoading(true);
         try {
-            const params = {};
-            if (relatedToType) params.related_to_type = relatedToType;
-            if (relatedToId) params.related_to_id = relatedToId;
-
-            const data = await fetchTasks(params);
-            setTasks(data);
+            const page = await fetchTasksPage(taskParams());
+            setTasks(page.tasks);
+            setNextCursor(page.nextCursor);
         } catch (err) {
             console.error('Failed to load tasks', err);
         } finally {
@@ -28,6 +33,16 @@ function TaskList({ relatedToType = null, relatedToId = null }) {
         }
     };
 
+    const loadMoreTasks = async () => {
+        try {
+            const page = await fetchTasksPage({ ...taskParams(), cursor: nextCursor });
+            setTasks(prev => [...prev, ...page.tasks]);
+            setNextCursor(page.nextCursor);
+        } catch (err) {
+            console.error('Failed to load more tasks', err);
+        }
+    };
+
     useEffect(() => {
         loadTasks();
     }, [relatedToType, relatedToId]);
@@ -206,6 +221,11 @@ function TaskList({ relatedToType = null, relatedToId = null }) {
                         No tasks yet. Click "+ Add Task" to create one.
                     </div>
                 )}
+                {nextCursor && (
+                    <button onClick={loadMoreTasks} style={{ width: '100%', marginTop: '10px', padding: '8px', background: 'transparent', color: 'var(--color-text-muted)', border: '1px dashed rgba(255,255,255,0.2)', borderRadius: '6px', cursor: 'pointer' }}>
+                        Load more
+                    </button>
+                )}
             </div>
         </div>
     );
@@ -37,8 +37,10 @@ function CRMJobs() {
     const handleSync = async () => {
         setSyncing(true);
         try {
-            await triggerSync();
-            alert("Sync started in background. Please refresh in a few moments.");
+            const result = await triggerSync();
+            alert(result.status === "already_running"
+                ? "A sync is already running. Please refresh in a few moments."
+                : "Sync started in background. Please refresh in a few moments.");
         } catch (err) {
             alert("Failed to start sync");
         } finally {
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import api, { fetchProjects } from '../services/api';
+import api from '../services/api';
 
 function Photos() {
     const [projects, setProjects] = useState([]);
@@ -10,24 +10,18 @@ function Photos() {
         const loadPhotos = async () => {
             setLoading(true);
             try {
-                // 1. Get recent projects
-                const projectData = await fetchProjects();
-                setProjects(Array.isArray(projectData) ? projectData : []);
+                // One call: recent photos across the latest projects, merged server-side
+                const resp = await api.get('/photos/feed', { params: { projects: 8, per_project: 4 } });
+                const feed = resp.data || {};
+                setProjects(Array.isArray(feed.projects) ? feed.projects : []);
 
-                // 2. Fetch photos for each project (first 4)
                 const photoMap = {};
-
-                if (Array.isArray(projectData)) {
-                    // Concurrent fetches for photos using the central api instance
-                    await Promise.all(projectData.slice(0, 8).map(async (p) => {
-                        try {
-                            const resp = await api.get(`/photos?project_id=${p.id}&limit=4`);
-                            photoMap[p.id] = resp.data;
-                        } catch (e) {
-                            console.error(`Failed to fetch photos for project ${p.id}`, e);
-                        }
-                    }));
-                }
+                (feed.photos || []).forEach(photo => {
+                    photoMap[photo.project_id] = photoMap[photo.project_id] || [];
+                    if (photoMap[photo.project_id].length < 4) {
+                        photoMap[photo.project_id].push(photo);
+                    }
+                });
 
                 setPhotos(photoMap);
             } catch (err) {
@@ -78,7 +72,7 @@ function Photos() {
                                         position: 'relative'
                                     }}>
                                         <img
-                                            src={photo.thumbnails?.medium || photo.uri}
+                                            src={photo.thumbnail_path || photo.thumbnails?.medium || photo.uri}
                                             alt="Project"
                                             style={{
                                                 width: '100%',
@@ -1,16 +1,38 @@
 import React, { useEffect, useState } from 'react';
-import { fetchCalendar } from '../services/api';
+import { fetchCalendar, fetchMilestones } from '../services/api';
+
+const toDateInput = (date) => date.toISOString().slice(0, 10);
+
+// The calendar endpoint's end is exclusive, so ask for up to the day after "To"
+const dayAfter = (dateStr) => toDateInput(new Date(new Date(`${dateStr}T00:00:00Z`).getTime() + 24 * 60 * 60 * 1000));
+
+const MILESTONE_COLORS = {
+    completed: '#10b981',
+    today: '#f59e0b',
+    overdue: '#ef4444',
+    pending: '#60a5fa'
+};
 
 function Schedule() {
     const [events, setEvents] = useState([]);
+    const [milestones, setMilestones] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [range, setRange] = useState(() => {
+        const today = new Date();
+        const monthOut = new Date(today.getTime() + 30 * 24 * 60 * 60 * 1000);
+        return { start: toDateInput(today), end: toDateInput(monthOut) };
+    });
 
     useEffect(() => {
         const loadCalendar = async () => {
             setLoading(true);
             try {
-                const data = await fetchCalendar();
+                const [data, milestoneData] = await Promise.all([
+                    fetchCalendar({ start: range.start, end: dayAfter(range.end), limit: 500 }),
+                    fetchMilestones({ start: range.start, end: range.end, limit: 500 }).catch(() => null)
+                ]);
                 setEvents(Array.isArray(data) ? data : []);
+                setMilestones(milestoneData?.milestones || []);
             } catch (err) {
                 console.error("Failed to load calendar", err);
             } finally {
@@ -18,7 +40,7 @@ function Schedule() {
             }
         };
         loadCalendar();
-    }, []);
+    }, [range]);
 
     const formatDateTime = (dateTimeStr, dateStr) => {
         const dt = dateTimeStr || dateStr;
@@ -39,6 +61,25 @@ function Schedule() {
             <header style={{ marginBottom: '2rem' }}>
                 <h1>Team Schedule</h1>
                 <p style={{ color: 'var(--color-text-muted)' }}>Upcoming appointments and project milestones</p>
+                <div style={{ display: 'flex', gap: '12px', alignItems: 'center', marginTop: '12px' }}>
+                    <label style={{ fontSize: '0.85rem', color: 'var(--color-text-muted)' }}>
+                        From{' '}
+                        <input
+                            type="date"
+                            value={range.start}
+                            onChange={(e) => e.target.value && setRange(prev => ({ ...prev, start: e.target.value }))}
+                        />
+                    </label>
+                    <label style={{ fontSize: '0.85rem', color: 'var(--color-text-muted)' }}>
+                        To{' '}
+                        <input
+                            type="date"
+                            value={range.end}
+                            min={range.start}
+                            onChange={(e) => e.target.value && setRange(prev => ({ ...prev, end: e.target.value }))}
+                        />
+                    </label>
+                </div>
             </header>
 
             {loading ? (
@@ -136,7 +177,47 @@ function Schedule() {
                         <div className="card" style={{ textAlign: 'center', padding: '80px 40px', background: 'rgba(255,255,255,0.02)' }}>
                             <div style={{ fontSize: '4rem', marginBottom: '24px', opacity: 0.5 }}>📅</div>
                             <h3 style={{ fontSize: '1.5rem', marginBottom: '12px' }}>Clear Schedule</h3>
-                            <p style={{ color: 'var(--color-text-muted)', fontSize: '1.05rem' }}>No upcoming events found for the next period.</p>
+                            <p style={{ color: 'var(--color-text-muted)', fontSize: '1.05rem' }}>No events found in this date range.</p>
+                        </div>
+                    )}
+
+                    {milestones.length > 0 && (
+                        <div className="card" style={{ marginTop: '30px', padding: '24px' }}>
+                            <h3 style={{ marginTop: 0, marginBottom: '16px' }}>Project Milestones</h3>
+                            <div style={{ display: 'flex', flexDirection: 'column', gap: '8px' }}>
+                                {milestones.map((milestone) => (
+                                    <div key={milestone.id} style={{
+                                        display: 'flex',
+                                        alignItems: 'center',
+                                        gap: '16px',
+                                        padding: '10px 12px',
+                                        background: 'rgba(255,255,255,0.03)',
+                                        border: '1px solid rgba(255,255,255,0.08)',
+                                        borderRadius: '8px'
+                                    }}>
+                                        <div style={{ minWidth: '110px', fontSize: '0.85rem', color: '#60a5fa', fontWeight: '600' }}>
+                                            {new Date(`${milestone.due_date}T00:00:00`).toLocaleDateString('en-US', { weekday: 'short', month: 'short', day: 'numeric' })}
+                                        </div>
+                                        <div style={{ flex: 1 }}>
+                                            <div style={{ fontSize: '0.95rem', fontWeight: '600' }}>{milestone.name}</div>
+                                            <div style={{ fontSize: '0.8rem', color: 'var(--color-text-muted)' }}>
+                                                {milestone.job_name || `#${milestone.job_number || milestone.job_id}`}
+                                                {milestone.sales_rep ? ` • ${milestone.sales_rep}` : ''}
+                                            </div>
+                                        </div>
+                                        <span style={{
+                                            padding: '2px 8px',
+                                            borderRadius: '4px',
+                                            fontSize: '0.7rem',
+                                            textTransform: 'capitalize',
+                                            color: MILESTONE_COLORS[milestone.status],
+                                            border: `1px solid ${MILESTONE_COLORS[milestone.status]}`
+                                        }}>
+                                            {milestone.status}
+                                        </span>
+                                    </div>
+                                ))}
+                            </div>
                         </div>
                     )}
                 </div>
@@ -39,9 +39,10 @@ export const fetchProjects = async () => {
     }
 };
 
-export const fetchCalendar = async () => {
+export const fetchCalendar = async (params = {}) => {
     try {
-        const response = await api.get('/calendar/events');
+        // params: { start, end, limit } as ISO dates; served from the local event store
+        const response = await api.get('/calendar/events', { params });
         return response.data;
     } catch (error) {
         console.error("API Error fetching calendar:", error);
@@ -101,6 +102,59 @@ export const fetchCRMJobs = async () => {
     }
 };
 
+export const fetchFieldValuesBulk = async (entityType, body) => {
+    try {
+        // body: { entity_ids | filter, display, field_ids }; returns { fields, entity_ids, values }
+        const response = await api.post(`/custom-fields/fields/${entityType}/bulk`, body);
+        return response.data;
+    } catch (error) {
+        console.error("API Error fetching custom field values:", error);
+        throw error;
+    }
+};
+
+export const fetchWorkflows = async (params = {}) => {
+    try {
+        const response = await api.get('/workflows/workflows', { params });
+        return response.data;
+    } catch (error) {
+        console.error("API Error fetching workflows:", error);
+        throw error;
+    }
+};
+
+export const fetchWorkflowBoard = async (workflowId, limit = 20) => {
+    try {
+        // { columns: [{ status_id, name, color, count, jobs, next_cursor }] }
+        const response = await api.get(`/workflows/${workflowId}/board`, { params: { limit } });
+        return response.data;
+    } catch (error) {
+        console.error("API Error fetching workflow board:", error);
+        throw error;
+    }
+};
+
+export const fetchWorkflowBoardColumn = async (workflowId, statusId, cursor, limit = 20) => {
+    try {
+        const response = await api.get(`/workflows/${workflowId}/board/${statusId}`, { params: { cursor, limit } });
+        return response.data;
+    } catch (error) {
+        console.error("API Error fetching workflow board column:", error);
+        throw error;
+    }
+};
+
+export const fetchMilestones = async (params = {}) => {
+    try {
+        // params: { start, end, status, sales_rep, cursor, limit }; returns { today, milestones, next_cursor }
+        const response = await api.get('/timeline/milestones', { params });
+        return response.data;
+    } catch (error) {
+        console.error("API Error fetching milestones:", error);
+        throw error;
+    }
+};
+
 export const triggerSync = async () => {
     try {
         const response = await api.post('/crm/sync');
@@ -16,30 +16,62 @@ api.interceptors.request.use((config) => {
     return config;
 });
 
-// Tasks API
+// Tasks API (router mounted at /api/tasks, routes under /tasks)
 export const fetchTasks = async (params = {}) => {
-    const { data } = await api.get('/tasks', { params });
+    const { data } = await api.get('/tasks/tasks', { params });
+    return data;
+};
+
+// One page of tasks plus the cursor for the next page (null on the last page)
+export const fetchTasksPage = async (params = {}) => {
+    const response = await api.get('/tasks/tasks', { params });
+    return { tasks: response.data, nextCursor: response.headers['x-next-cursor'] || null };
+};
+
+export const fetchDueTasks = async (params = {}) => {
+    const { data } = await api.get('/tasks/tasks/due', { params });
     return data;
 };
 
 export const createTask = async (taskData) => {
-    const { data } = await api.post('/tasks', taskData);
+    const { data } = await api.post('/tasks/tasks', taskData);
     return data;
 };
 
 export const updateTask = async (taskId, taskData) => {
-    const { data } = await api.put(`/tasks/${taskId}`, taskData);
+    const { data } = await api.put(`/tasks/tasks/${taskId}`, taskData);
     return data;
 };
 
 export const deleteTask = async (taskId) => {
-    const { data } = await api.delete(`/tasks/${taskId}`);
+    const { data } = await api.delete(`/tasks/tasks/${taskId}`);
+    return data;
+};
+
+// Bulk operations: each call is a single request and a single transaction
+export const createTasks = async (tasks) => {
+    const { data } = await api.post('/tasks/tasks/bulk', { tasks });
+    return data;
+};
+
+export const updateTasks = async (updates) => {
+    const { data } = await api.patch('/tasks/tasks/bulk', { updates });
+    return data;
+};
+
+export const completeTasks = async (taskIds) => {
+    const { data } = await api.post('/tasks/tasks/bulk/complete', { task_ids: taskIds });
     return data;
 };
 
 export default {
     fetchTasks,
+    fetchTasksPage,
+    fetchDueTasks,
     createTask,
     updateTask,
-    deleteTask
+    deleteTask,
+    createTasks,
+    updateTasks,
+    completeTasks
 };
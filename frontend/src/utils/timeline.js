@@ -4,7 +4,7 @@
  * Similar to Folio by Amitree
  */
 
-// Built-in Timeline Templates
+// Built-in Timeline Templates (mirrored in backend/app/services/timeline.py for milestone queries)
 export const TIMELINE_TEMPLATES = {
     roofing_standard: {
         id: 'roofing_standard',